@@ -0,0 +1,66 @@
+#@brief Compare the per-step reader I/O of the raw downloaded files and of the analysis store
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_analysis_store <raw current or wind file> [nb_steps] [box_degrees]
+
+import os
+import sys
+import time
+import tempfile
+from datetime import timedelta
+import numpy as np
+import psutil
+from opendrift.readers import reader_netCDF_CF_generic
+
+from src.AnalysisStore import AnalysisStore
+
+
+def read_steps(reader, nb_steps, box_degrees, seed=0):
+    """
+    Reads `nb_steps` consecutive hours of the reader variables over a small box, as a simulation does.
+
+    Returns:
+        tuple: The mean time (s) and the mean number of bytes read per step.
+    """
+    rng = np.random.default_rng(seed)
+    center_lon = rng.uniform(reader.xmin + box_degrees, reader.xmax - box_degrees)
+    center_lat = rng.uniform(reader.ymin + box_degrees, reader.ymax - box_degrees)
+    x = center_lon + rng.uniform(-box_degrees/2, box_degrees/2, 100)
+    y = center_lat + rng.uniform(-box_degrees/2, box_degrees/2, 100)
+    variables = [v for v in reader.variables if "velocity" in v or "wind" in v][:2]
+
+    process = psutil.Process()
+    bytes_before = process.io_counters().read_chars
+    start = time.perf_counter()
+    for step in range(nb_steps):
+        reader.get_variables(variables, reader.start_time + timedelta(hours=step), x, y, np.zeros(x.shape))
+    elapsed = time.perf_counter() - start
+    bytes_read = process.io_counters().read_chars - bytes_before
+    return elapsed / nb_steps, bytes_read / nb_steps
+
+
+def main():
+    raw_fname = sys.argv[1]
+    nb_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+    box_degrees = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = AnalysisStore(tmpdir)
+        start = time.perf_counter()
+        store_fname = store.convert(raw_fname)
+        conversion_time = time.perf_counter() - start
+
+        results = {}
+        for label, reader in [("raw", reader_netCDF_CF_generic.Reader(raw_fname)), ("analysis store", AnalysisStore.Reader(store_fname))]:
+            results[label] = read_steps(reader, nb_steps, box_degrees)
+
+        print(f"Conversão em {conversion_time:.1f} s: {os.path.getsize(raw_fname)/1024**2:.1f} MB -> {os.path.getsize(store_fname)/1024**2:.1f} MB")
+        print(f"{'Fonte':>15} | {'ms/passo':>10} | {'KB lidos/passo':>15}")
+        for label, (step_time, step_bytes) in results.items():
+            print(f"{label:>15} | {step_time*1000:>10.2f} | {step_bytes/1024:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
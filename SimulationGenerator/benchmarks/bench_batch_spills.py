@@ -0,0 +1,85 @@
+#@brief Compare running each spill in its own Opendrift run with running all spills in a single batched run
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_batch_spills <current file> <wind file> [nb_spills] [duration_days] [num_seed_elements]
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+from omegaconf import OmegaConf
+from opendrift.models.openoil import OpenOil
+from opendrift.readers import reader_netCDF_CF_generic
+
+from src.RunASimulation import RunASimulation
+
+
+def make_spills(reader, nb_spills, duration_days, num_seed_elements, seed=0):
+    """
+    Returns `nb_spills` simulation configurations sharing their dates and domain, with random spill centers.
+    """
+    rng = np.random.default_rng(seed)
+    start_date = reader.start_time + timedelta(days=1)
+    bbox = (reader.xmin, reader.xmax, reader.ymin, reader.ymax)
+    return [OmegaConf.create({
+        "simulation_id"    : idx,
+        "start_date"       : start_date.strftime("%Y-%m-%d"),
+        "end_date"         : (start_date + timedelta(days=duration_days)).strftime("%Y-%m-%d"),
+        "min_lon"          : float(bbox[0]),
+        "max_lon"          : float(bbox[1]),
+        "min_lat"          : float(bbox[2]),
+        "max_lat"          : float(bbox[3]),
+        "spill_lon"        : float(rng.uniform(bbox[0] + (bbox[1]-bbox[0])/4, bbox[1] - (bbox[1]-bbox[0])/4)),
+        "spill_lat"        : float(rng.uniform(bbox[2] + (bbox[3]-bbox[2])/4, bbox[3] - (bbox[3]-bbox[2])/4)),
+        "spill_radius"     : 4000.0,
+        "num_seed_elements": num_seed_elements,
+        "time_step"        : 3600,
+        "output_time_step" : 21600,
+    }) for idx in range(nb_spills)]
+
+
+def run(sim_cfgs, current_fname, wind_fname, outfile, batched):
+    """
+    Runs the spills in a single OpenOil run when `batched`, each spill with its own model and readers otherwise.
+    """
+    groups = [sim_cfgs] if batched else [[sim_cfg] for sim_cfg in sim_cfgs]
+    for group in groups:
+        o = OpenOil(loglevel=50)
+        o.add_reader([reader_netCDF_CF_generic.Reader(current_fname), reader_netCDF_CF_generic.Reader(wind_fname)])
+        RunASimulation.configure_model(o, group[0], True)
+        for origin_marker, sim_cfg in enumerate(group):
+            RunASimulation.seed_spill(o, sim_cfg, origin_marker if batched else None)
+        o.run(time_step=group[0].time_step, time_step_output=group[0].output_time_step,
+              end_time=datetime.strptime(group[0].end_date, "%Y-%m-%d"), outfile=outfile, stop_on_error=True)
+        if batched:
+            RunASimulation.split_batch_result(outfile, [outfile.replace(".nc", f"_{sim_cfg.simulation_id:04d}.nc") for sim_cfg in group])
+
+
+def main():
+    current_fname, wind_fname = sys.argv[1], sys.argv[2]
+    nb_spills = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    duration_days = int(sys.argv[4]) if len(sys.argv) > 4 else 2
+    num_seed_elements = int(sys.argv[5]) if len(sys.argv) > 5 else 100
+
+    sim_cfgs = make_spills(reader_netCDF_CF_generic.Reader(current_fname), nb_spills, duration_days, num_seed_elements)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, batched in [("um run por derramamento", False), ("run único em batch", True)]:
+            start = time.perf_counter()
+            run(sim_cfgs, current_fname, wind_fname, os.path.join(tmpdir, "result.nc"), batched)
+            results[label] = time.perf_counter() - start
+
+    print(f"{nb_spills} derramamentos de {num_seed_elements} partículas durante {duration_days} dias (sem animação):")
+    print(f"{'Modo':>25} | {'tempo (s)':>10} | {'derramamentos/s':>15}")
+    for label, elapsed in results.items():
+        print(f"{label:>25} | {elapsed:>10.2f} | {nb_spills/elapsed:>15.2f}")
+    times = list(results.values())
+    print(f"Ganho do batch: x{times[0]/times[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#@brief Measure the load time and memory of the configuration list, YAML versus columnar table, as a function of the sweep size
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_config_list [sizes...]
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from omegaconf import OmegaConf
+
+from src.ConfigList import ConfigList
+
+
+def make_sim_cfgs(nb_sims):
+    return [{
+        "simulation_id": idx, "start_date": "2024-01-02", "end_date": "2024-01-07", "min_lon": -46.0, "max_lon": -37.0,
+        "min_lat": -27.0, "max_lat": -21.0, "duration_days": 5, "nb_time_slots": 5, "spill_lon": -39.0 + idx*1e-4,
+        "spill_lat": -25.0 - idx*1e-5, "spill_radius": 4000.0, "n_diff_center_spill_pos": 2, "constrain_rate": 0.5,
+        "num_seed_elements": 1000, "time_step": 180, "output_time_step": 86400,
+    } for idx in range(nb_sims)]
+
+
+def measure(function):
+    """
+    Returns the time (s) of a call of `function`, and the peak of the memory it allocates (MB), measured in a second call.
+    """
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024**2
+
+
+def stream(fname):
+    # Consome a lista sem guardá-la, como o planejamento dos downloads
+    for _ in ConfigList.iterate(fname):
+        pass
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+
+    print(f"{'sims':>8} | {'YAML MB':>8} {'load s':>8} {'mem MB':>8} | {'CSV MB':>8} {'load s':>8} {'mem MB':>8} | {'stream s':>8} {'mem MB':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        for nb_sims in sizes:
+            sim_cfgs = make_sim_cfgs(nb_sims)
+            yaml_fname = os.path.join(folder, f"list_{nb_sims}.yaml")
+            csv_fname = os.path.join(folder, f"list_{nb_sims}.csv")
+            OmegaConf.save(config=OmegaConf.create(sim_cfgs), f=yaml_fname)
+            ConfigList.save(sim_cfgs, csv_fname)
+            assert [sim._asdict() for sim in ConfigList.load(csv_fname)] == sim_cfgs
+            del sim_cfgs
+
+            yaml_s, yaml_mb = measure(lambda: ConfigList.load(yaml_fname))
+            csv_s, csv_mb = measure(lambda: ConfigList.load(csv_fname))
+            stream_s, stream_mb = measure(lambda: stream(csv_fname))
+            print(f"{nb_sims:>8} | {os.path.getsize(yaml_fname)/1024**2:>8.2f} {yaml_s:>8.2f} {yaml_mb:>8.1f} | "
+                  f"{os.path.getsize(csv_fname)/1024**2:>8.2f} {csv_s:>8.2f} {csv_mb:>8.1f} | {stream_s:>8.2f} {stream_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#@brief Measure the time and memory of the convergence error statistics, over whole arrays and by chunks of particles
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_error_statistics [nb_particles] [workers]
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+from multiprocessing import Pool
+import numpy as np
+
+from src.ErrorStatistics import ErrorStatistics
+
+NB_TIMES = 11
+
+
+def measure_distance(lat1, lon1, lat2, lon2):
+    # Como TimestepEstimator.measure_distance
+    R = 6378.137
+    dLat = np.radians(lat2 - lat1)
+    dLon = np.radians(lon2 - lon1)
+    a = (np.sin(dLat / 2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dLon / 2)**2)
+    return 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)) * R * 1000
+
+
+def make_cache(folder, nb_particles):
+    """
+    Writes the lat and lon arrays of a TrajectoryCache of two simulations whose particles differ by about 100 m.
+    """
+    rng = np.random.default_rng(0)
+    fnames = []
+    for name, origin in (("lat", -25.0), ("lon", -40.0)):
+        array = np.lib.format.open_memmap(os.path.join(folder, f"{name}.npy"), mode="w+", dtype=np.float32, shape=(2, nb_particles, NB_TIMES))
+        for start in range(0, nb_particles, 1000000):
+            stop = min(start + 1000000, nb_particles)
+            array[0, start:stop] = origin + rng.random((stop - start, NB_TIMES), dtype=np.float32)
+            array[1, start:stop] = array[0, start:stop] + rng.normal(0, 1e-3, (stop - start, NB_TIMES)).astype(np.float32)
+        array.flush()
+        fnames.append(array.filename)
+    return fnames
+
+
+def measure(function):
+    """
+    Returns the result and time (s) of a call of `function`, and the peak of the memory it allocates in this process (MB).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024**2
+
+
+def main():
+    nb_particles = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as folder:
+        lat_fname, lon_fname = make_cache(folder, nb_particles)
+        lat, lon = np.load(lat_fname, mmap_mode="r"), np.load(lon_fname, mmap_mode="r")
+
+        whole, whole_s, whole_mb = measure(lambda: measure_distance(lat[0], lon[0], lat[1], lon[1]).mean(axis=0))
+        serial, serial_s, serial_mb = measure(lambda: ErrorStatistics.compute(lat_fname, lon_fname, 0, 1))
+        with Pool(workers) as pool:
+            ErrorStatistics.compute(lat_fname, lon_fname, 0, 1, pool) # Aquecimento dos workers
+            pooled, pooled_s, pooled_mb = measure(lambda: ErrorStatistics.compute(lat_fname, lon_fname, 0, 1, pool))
+
+    print(f"{nb_particles} partículas x {NB_TIMES} saídas:")
+    print(f"     Arrays inteiros             : {whole_s:6.2f} s, {whole_mb:8.1f} MB (só a média)")
+    print(f"     Por blocos, neste processo  : {serial_s:6.2f} s, {serial_mb:8.1f} MB (média, P50, P95, máximo)")
+    print(f"     Por blocos, {workers:>2} workers     : {pooled_s:6.2f} s, {pooled_mb:8.1f} MB no processo principal")
+    print(f"     Maior diferença relativa das médias: {np.max(np.abs(serial['mean'] - whole) / whole):.2e} (soma em float64 contra float32)")
+
+
+if __name__ == "__main__":
+    main()
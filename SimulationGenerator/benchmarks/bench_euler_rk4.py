@@ -0,0 +1,126 @@
+#@brief Cost versus accuracy of the Euler and Runge-Kutta 4 advection schemes along the time step ladder
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_euler_rk4 <current file> <wind file> [nb_levels] [duration_days] [num_seed_elements]
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+import xarray as xr
+from omegaconf import OmegaConf
+from opendrift.models.openoil import OpenOil
+from opendrift.readers import reader_netCDF_CF_generic
+
+from src.RunASimulation import RunASimulation
+from src.ErrorStatistics import ErrorStatistics
+
+OUTPUT_TIME_STEP = 21600
+SCHEMES = {"Euler": False, "RK4": True}
+
+
+def largest_divisor(value: int, limit: int) -> int:
+    # O Opendrift exige que o time step divida o time step de saída
+    return max(dt for dt in range(1, min(limit, value) + 1) if value % dt == 0)
+
+def make_ladder(nb_levels: int) -> list:
+    """
+    Returns the time steps of the ladder, halved from OUTPUT_TIME_STEP / 2 as in TimestepEstimator.generate_sim_configs.
+    """
+    return [largest_divisor(OUTPUT_TIME_STEP, max(OUTPUT_TIME_STEP // 2**level, 1)) for level in range(1, nb_levels + 1)]
+
+def make_spill(reader, duration_days, num_seed_elements):
+    start_date = reader.start_time + timedelta(days=1)
+    return OmegaConf.create({
+        "simulation_id"    : 0,
+        "start_date"       : start_date.strftime("%Y-%m-%d"),
+        "end_date"         : (start_date + timedelta(days=duration_days)).strftime("%Y-%m-%d"),
+        "min_lon"          : float(reader.xmin),
+        "max_lon"          : float(reader.xmax),
+        "min_lat"          : float(reader.ymin),
+        "max_lat"          : float(reader.ymax),
+        "spill_lon"        : float((reader.xmin + reader.xmax) / 2),
+        "spill_lat"        : float((reader.ymin + reader.ymax) / 2),
+        "spill_radius"     : 4000.0,
+        "num_seed_elements": num_seed_elements,
+        "output_time_step" : OUTPUT_TIME_STEP,
+    })
+
+
+def run(sim_cfg, readers, rk4, time_step, outfile) -> dict:
+    """
+    Runs the spill with one scheme and time step, and returns its CPU time (s), wall time (s), number of
+    calculation steps and final positions.
+    """
+    o = OpenOil(loglevel=50)
+    o.add_reader(readers)
+    RunASimulation.configure_model(o, sim_cfg, rk4)
+    np.random.seed(0) # Mesmas partículas semeadas em todos os runs
+    RunASimulation.seed_spill(o, sim_cfg)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    o.run(time_step=time_step, time_step_output=sim_cfg.output_time_step,
+          end_time=datetime.strptime(sim_cfg.end_date, "%Y-%m-%d"), outfile=outfile, stop_on_error=True)
+    cpu_s, wall_s = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    with xr.open_dataset(outfile) as ds:
+        lat, lon = ds["lat"][:, -1].values.astype(np.float64), ds["lon"][:, -1].values.astype(np.float64)
+    return {"cpu_s": cpu_s, "wall_s": wall_s, "steps": o.steps_calculation, "lat": lat, "lon": lon}
+
+
+def pareto_front(points: list) -> list:
+    """
+    Returns the points that no other point beats on both CPU time and error, by increasing CPU time.
+    """
+    front, best_error = [], np.inf
+    for point in sorted(points, key=lambda point: (point["cpu_s"], point["error_m"])):
+        if point["error_m"] < best_error:
+            front.append(point)
+            best_error = point["error_m"]
+    return front
+
+
+def main():
+    current_fname, wind_fname = sys.argv[1], sys.argv[2]
+    nb_levels = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+    duration_days = int(sys.argv[4]) if len(sys.argv) > 4 else 2
+    num_seed_elements = int(sys.argv[5]) if len(sys.argv) > 5 else 100
+
+    readers = [reader_netCDF_CF_generic.Reader(current_fname), reader_netCDF_CF_generic.Reader(wind_fname)]
+    sim_cfg = make_spill(readers[0], duration_days, num_seed_elements)
+    ladder = make_ladder(nb_levels)
+    # Referência: RK4 com a metade do menor time step da escada
+    reference_time_step = largest_divisor(OUTPUT_TIME_STEP, max(ladder[-1] // 2, 1))
+
+    points = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        outfile = os.path.join(tmpdir, "result.nc")
+        reference = run(sim_cfg, readers, True, reference_time_step, outfile)
+        for scheme, rk4 in SCHEMES.items():
+            for time_step in ladder:
+                result = run(sim_cfg, readers, rk4, time_step, outfile)
+                distances = ErrorStatistics.haversine(reference["lat"], reference["lon"], result["lat"], result["lon"])
+                points.append({"scheme": scheme, "time_step": time_step, "cpu_s": result["cpu_s"], "wall_s": result["wall_s"],
+                               "steps": result["steps"], "error_m": float(np.nanmean(distances))})
+
+    print(f"{num_seed_elements} partículas durante {duration_days} dias, erro médio na última saída contra RK4 com Δt = {reference_time_step} s "
+          f"({reference['cpu_s']:.2f} s de CPU):")
+    print(f"{'Esquema':>8} | {'Δt (s)':>7} | {'passos':>7} | {'CPU (s)':>8} | {'parede (s)':>10} | {'erro (m)':>10}")
+    for point in points:
+        print(f"{point['scheme']:>8} | {point['time_step']:>7} | {point['steps']:>7} | {point['cpu_s']:>8.2f} | {point['wall_s']:>10.2f} | {point['error_m']:>10.1f}")
+
+    print("Frente de Pareto (menor erro para cada custo de CPU):")
+    for point in pareto_front(points):
+        print(f"     {point['scheme']:>5} Δt = {point['time_step']:>5} s: {point['error_m']:>10.1f} m em {point['cpu_s']:.2f} s de CPU")
+    # Para cada run de Euler, o run de RK4 mais barato que é ao menos tão preciso
+    for point in (point for point in points if point["scheme"] == "Euler"):
+        rival = min((other for other in points if other["scheme"] == "RK4" and other["error_m"] <= point["error_m"]),
+                    key=lambda other: other["cpu_s"], default=None)
+        if rival is not None and rival["cpu_s"] < point["cpu_s"]:
+            print(f"     RK4 com Δt = {rival['time_step']} s é mais preciso que Euler com Δt = {point['time_step']} s, com x{point['cpu_s']/rival['cpu_s']:.1f} menos CPU.")
+
+
+if __name__ == "__main__":
+    main()
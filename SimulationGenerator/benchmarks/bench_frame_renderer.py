@@ -0,0 +1,65 @@
+#@brief Compare the frames/second of the Opendrift animation and of the NumPy frame renderer
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_frame_renderer <result file> <current file> [nb_renders] [gif|webp]
+
+import os
+import sys
+import time
+import tempfile
+from omegaconf import OmegaConf
+from opendrift.models.openoil import OpenOil
+from opendrift.readers import reader_netCDF_CF_generic
+
+from src.FrameRenderer import FrameRenderer
+
+
+def render_opendrift(result_fname, reader, gif_config, animation_fname):
+    o = OpenOil(loglevel=50)
+    o.io_import_file(result_fname)
+    o.add_reader([reader])
+    o.animation(filename=animation_fname, corners=[gif_config.min_lon, gif_config.max_lon, gif_config.min_lat, gif_config.max_lat],
+                background=['x_sea_water_velocity', 'y_sea_water_velocity'], vmin=-1, vmax=1, fast=True, fps=6)
+
+
+def main():
+    result_fname, current_fname = sys.argv[1], sys.argv[2]
+    nb_renders = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    extension = sys.argv[4] if len(sys.argv) > 4 else "gif"
+
+    gif_config = OmegaConf.load("conf/gif_frame_config.yaml")
+    reader = reader_netCDF_CF_generic.Reader(current_fname)
+    renderer = FrameRenderer((gif_config.min_lon, gif_config.max_lon, gif_config.min_lat, gif_config.max_lat))
+    nb_frames = len(FrameRenderer.load_positions(result_fname)[0])
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        for idx in range(nb_renders):
+            render_opendrift(result_fname, reader, gif_config, os.path.join(tmpdir, f"opendrift_{idx}.gif"))
+        results["Opendrift (matplotlib)"] = (time.perf_counter() - start) / nb_renders
+
+        FrameRenderer.background_cache.clear()
+        start = time.perf_counter()
+        renderer.render(result_fname, reader, os.path.join(tmpdir, f"fast_cold.{extension}"))
+        results["FrameRenderer, fundo novo"] = time.perf_counter() - start
+
+        # As simulações seguintes da mesma janela reaproveitam os fundos em cache
+        start = time.perf_counter()
+        for idx in range(nb_renders):
+            renderer.render(result_fname, reader, os.path.join(tmpdir, f"fast_{idx}.{extension}"))
+        results["FrameRenderer, fundo em cache"] = (time.perf_counter() - start) / nb_renders
+        size = os.path.getsize(os.path.join(tmpdir, f"fast_0.{extension}"))
+
+    print(f"Animação de {nb_frames} frames ({renderer.width}x{renderer.height} px, {extension}: {size/1024:.0f} kB):")
+    print(f"{'Renderizador':>30} | {'s/animação':>10} | {'frames/s':>10}")
+    for label, elapsed in results.items():
+        print(f"{label:>30} | {elapsed:>10.3f} | {nb_frames/elapsed:>10.1f}")
+    reference = results["Opendrift (matplotlib)"]
+    print(f"Ganho com o fundo em cache: x{reference/results['FrameRenderer, fundo em cache']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#@brief Compare the coverage of the spill area by the Cartesian product of random positions and by the sampling designs
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_sampling_designs [nb_positions...]
+
+import sys
+import warnings
+import numpy as np
+
+from src.SamplingDesign import SamplingDesign
+
+# Área de derramamento do quadro padrão (gif_frame_config.yaml) com constrain_rate 0.5
+SPILL_AREA = (-43.75, -39.25, -25.5, -22.5)
+NB_SEEDS = 5
+
+
+def product_coverage(nb_positions: int, seed: int) -> dict:
+    # Como SimulationGenerator: longitudes e latitudes sorteadas independentemente, depois cruzadas
+    rng = np.random.default_rng(seed)
+    min_lon, max_lon, min_lat, max_lat = SPILL_AREA
+    lons, lats = np.meshgrid(rng.uniform(min_lon, max_lon, nb_positions), rng.uniform(min_lat, max_lat, nb_positions))
+    return SamplingDesign.coverage(lons.ravel(), lats.ravel(), SPILL_AREA)
+
+def design_coverage(design: str, nb_runs: int, seed: int) -> dict:
+    min_lon, max_lon, min_lat, max_lat = SPILL_AREA
+    _, unit_lons, unit_lats, _ = SamplingDesign.sample(design, nb_runs, 1, 1, seed)
+    return SamplingDesign.coverage(min_lon + unit_lons * (max_lon - min_lon), min_lat + unit_lats * (max_lat - min_lat), SPILL_AREA)
+
+def mean_coverage(function, *args) -> dict:
+    coverages = [function(*args, seed) for seed in range(NB_SEEDS)]
+    return {key: float(np.mean([coverage[key] for coverage in coverages])) for key in coverages[0]}
+
+
+def main():
+    warnings.filterwarnings("ignore", category=UserWarning) # Sobol fora de potências de 2
+    positions = [int(arg) for arg in sys.argv[1:]] or [4, 8, 12, 16]
+    designs = SamplingDesign.DESIGNS[1:]
+    budgets = sorted({int(round(n)) for n in np.geomspace(4, max(positions)**2, 40)})
+
+    print(f"Cobertura da área {SPILL_AREA}, média de {NB_SEEDS} sorteios (distância média ao centro mais próximo, km):")
+    print(f"{'produto':>10} {'runs':>6} {'dist. km':>9} {'discrep.':>9} | " + " | ".join(f"{design:>16}" for design in designs))
+    for nb_positions in positions:
+        reference = mean_coverage(product_coverage, nb_positions)
+        # Menor orçamento de cada plano que alcança a distância média do produto
+        matches = []
+        for design in designs:
+            match = next((nb_runs for nb_runs in budgets
+                          if mean_coverage(design_coverage, design, nb_runs)["mean_distance_km"] <= reference["mean_distance_km"]), None)
+            matches.append(f"{match:>5} runs ({100*match/nb_positions**2:3.0f}%)" if match else f"{'-':>16}")
+        print(f"{nb_positions:>4} x {nb_positions:<3} {nb_positions**2:>6} {reference['mean_distance_km']:>9.2f} {reference['discrepancy']:>9.4f} | " + " | ".join(matches))
+
+
+if __name__ == "__main__":
+    main()
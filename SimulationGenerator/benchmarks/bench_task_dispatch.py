@@ -0,0 +1,89 @@
+#@brief Measure the dispatch overhead per task of the simulation pool, with the old and the compact task payloads
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m benchmarks.bench_task_dispatch [nb_tasks] [workers]
+
+import sys
+import time
+import pickle
+from multiprocessing import Pool
+from hydra import initialize, compose
+from omegaconf import OmegaConf
+
+from src.RunASimulation import RunASimulation
+from src.SimTask import SimTask
+
+
+def make_simulator():
+    """
+    Builds a RunASimulation holding the composed configurations of the `conf/` folder, as generate_simulations does.
+    """
+    Simulator = RunASimulation.__new__(RunASimulation)
+    with initialize(config_path="../conf", version_base=None):
+        Simulator.cm_data = compose(config_name="cm_data_config")
+        Simulator.gif_config = compose(config_name="gif_frame_config")
+        Simulator.credentials = compose(config_name="cm_credentials_example")
+    Simulator.result_path = "results/"
+    return Simulator
+
+
+def make_sim_cfgs(nb_tasks):
+    return [OmegaConf.create({
+        "simulation_id": idx, "start_date": "2024-01-02", "end_date": "2024-01-07", "min_lon": -46.0, "max_lon": -37.0,
+        "min_lat": -27.0, "max_lat": -21.0, "duration_days": 5, "nb_time_slots": 5, "spill_lon": -39.0 + idx*1e-4,
+        "spill_lat": -25.0, "spill_radius": 4000.0, "n_diff_center_spill_pos": 2, "constrain_rate": 0.5,
+        "num_seed_elements": 1000, "time_step": 180, "output_time_step": 86400,
+    }) for idx in range(nb_tasks)]
+
+
+def old_task(args):
+    Simulator, cfg, verbose, rk4 = args
+    return cfg.simulation_id
+
+def new_task(task):
+    Simulator, verbose, rk4 = RunASimulation.worker_context
+    return task.simulation_id
+
+
+def dispatch(function, params, workers, initargs=None):
+    """
+    Returns the time (s) to send all tasks to the pool and collect their results, as generate_simulations does.
+    """
+    with Pool(processes=workers, initializer=RunASimulation.init_worker if initargs else None, initargs=initargs or ()) as pool:
+        start = time.perf_counter()
+        for _ in pool.imap(function, params):
+            pass
+        return time.perf_counter() - start
+
+
+def main():
+    nb_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    Simulator = make_simulator()
+    sim_cfgs = make_sim_cfgs(nb_tasks)
+    Simulator.sim_cfg_file = sim_cfgs[0]
+
+    start = time.perf_counter()
+    old_params = [(Simulator, cfg, False, True) for cfg in sim_cfgs]
+    old_bytes = sum(len(pickle.dumps(params)) for params in old_params)
+    old_pickle_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_params = [SimTask.from_cfg(cfg) for cfg in sim_cfgs]
+    new_bytes = sum(len(pickle.dumps(task)) for task in new_params)
+    new_pickle_time = time.perf_counter() - start
+
+    old_dispatch_time = dispatch(old_task, old_params, workers)
+    new_dispatch_time = dispatch(new_task, new_params, workers, initargs=([], [], (Simulator, False, True)))
+
+    print(f"{nb_tasks} tarefas, {workers} workers:")
+    print(f"{'Payload':>30} | {'bytes/tarefa':>12} | {'preparo+pickle (us/tarefa)':>26} | {'despacho (us/tarefa)':>20}")
+    print(f"{'(Simulator, DictConfig, ...)':>30} | {old_bytes/nb_tasks:>12.0f} | {old_pickle_time/nb_tasks*1e6:>26.1f} | {old_dispatch_time/nb_tasks*1e6:>20.1f}")
+    print(f"{'SimTask + contexto do worker':>30} | {new_bytes/nb_tasks:>12.0f} | {new_pickle_time/nb_tasks*1e6:>26.1f} | {new_dispatch_time/nb_tasks*1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,4 +32,7 @@ class TimestepOverOutputTimestep(Exception):
     pass
 
 class CopernicusDateRangeError(Exception):
+    pass
+
+class SimulationTimeoutError(Exception):
     pass
\ No newline at end of file
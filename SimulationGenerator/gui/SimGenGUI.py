@@ -8,6 +8,7 @@ import tkinter as tk
 
 from src.SimulationGenerator import SimulationGenerator
 from gui.DisplayActions import DisplayActions
+from src.Tracer import Tracer
 from exceptions.CustomExceptions import DownloadEnvironmentDataError, ConfigFileNotFound, TimestepOverOutputTimestep, CopernicusDateRangeError
 
 class SimGenGUI(DisplayActions):
@@ -23,11 +24,16 @@ class SimGenGUI(DisplayActions):
             reference_simconfig = OmegaConf.create(parameters[0])
             OmegaConf.save(config=reference_simconfig, f=output_yaml)
 
+            if outros_params["trace"]:
+                Tracer.activate()
             SG = SimulationGenerator(config_folder, ref_config_name, outros_params["config_fname"])
-            SG.generate_sim_configs(outros_params["overwrite"])
+            if outros_params["resume"] and SG.configlist_exists():
+                print("Retomada: a lista de configurações existente é reaproveitada.")
+            else:
+                SG.generate_sim_configs(outros_params["overwrite"])
             if outros_params["run_simulations"]:
                 SG.set_result_folder(outros_params["resultfolder"])
-                SG.generate_simulations(outros_params["workers"], outros_params["verbose"], outros_params["rk4flag"], outros_params["overwrite"])
+                SG.generate_simulations(outros_params["workers"], outros_params["verbose"], outros_params["rk4flag"], outros_params["overwrite"], outros_params["resume"])
             else:
                 print("Execução das simulações não foi ativada")
             print("Programa terminado!")
@@ -95,14 +101,18 @@ class SimGenGUI(DisplayActions):
         var_runsims = tk.BooleanVar(value=False)
         var_verbose = tk.BooleanVar(value=False)
         var_overwrite = tk.BooleanVar(value=False)
+        var_resume = tk.BooleanVar(value=False)
         var_rk4 = tk.BooleanVar(value=True)
+        var_trace = tk.BooleanVar(value=False)
         cb_runsims = tk.Checkbutton(root, text="Rodar simulações", variable=var_runsims)
         cb_overwrite = tk.Checkbutton(root, text="Overwrite already existing config/result files", variable=var_overwrite)
+        cb_resume    = tk.Checkbutton(root, text="Retomar simulações interrompidas (só as ausentes, com falha ou corrompidas)", variable=var_resume)
         cb_verbose   = tk.Checkbutton(root, text="Verbose da simulação", variable=var_verbose)
         cb_rk4     = tk.Checkbutton(root, text="Usar Runge-Kutta 4", variable=var_rk4)
+        cb_trace   = tk.Checkbutton(root, text="Capturar o trace das etapas (trace.json na pasta de resultados)", variable=var_trace)
 
 
-        lbl_outputconfig = tk.Label(frame, text="Output config file (.yaml):")
+        lbl_outputconfig = tk.Label(frame, text="Output config file (.csv, or .yaml):")
         lbl_outputconfig.pack(fill="x")
         entry_configlist = tk.Entry(frame)
         entry_configlist.pack(fill="x", pady=3)
@@ -114,7 +124,7 @@ class SimGenGUI(DisplayActions):
 
 
         entry_configlist.delete(0, tk.END)
-        entry_configlist.insert(0, "default_simulations_configs_list.yaml")
+        entry_configlist.insert(0, "default_simulations_configs_list.csv")
         entry_resultfolder.delete(0, tk.END)
         entry_resultfolder.insert(0, "default_generation_folder/")
 
@@ -140,8 +150,10 @@ class SimGenGUI(DisplayActions):
 
         cb_runsims.pack(pady=20)
         cb_overwrite.pack(pady=20)
+        cb_resume.pack(anchor="w", padx=20)
         cb_verbose.pack(anchor="w", padx=20)
         cb_rk4.pack(anchor="w", padx=20)
+        cb_trace.pack(anchor="w", padx=20)
 
 
 
@@ -187,6 +199,8 @@ class SimGenGUI(DisplayActions):
                         "resultfolder": entry_resultfolder.get().strip(),
                         "config_fname": entry_configlist.get().strip(),
                         "overwrite": bool(var_overwrite.get()),
+                        "resume": bool(var_resume.get()),
+                        "trace": bool(var_trace.get()),
                     },
                 ]
             )
@@ -13,6 +13,7 @@ matplotlib.use("TkAgg")
 
 from src.TimestepEstimator import TimestepEstimator
 from gui.DisplayActions import DisplayActions
+from src.Tracer import Tracer
 from exceptions.CustomExceptions import DownloadEnvironmentDataError, ConfigFileNotFound, TimestepOverOutputTimestep, CopernicusDateRangeError
 
 
@@ -34,14 +35,32 @@ class TimestepEstimatorGUI(DisplayActions):
             reference_simconfig = OmegaConf.create(parameters[0])
             OmegaConf.save(config=reference_simconfig, f=output_yaml)
 
+            if outros_params["trace"]:
+                Tracer.activate()
             TE = TimestepEstimator(config_folder, ref_config_name, outros_params["config_fname"])
-            TE.generate_sim_configs(outros_params["number_of_simulations"], outros_params["overwrite"])
+            if outros_params["a_priori"]:
+                # Só a recomendação pelos campos baixados, sem a varredura de time steps
+                TE.recommend_timestep()
+                Tracer.save(os.path.join("results", outros_params["result_folder"]))
+                print("Programa terminado!")
+                return
+            if outros_params["resume"] and TE.configlist_exists():
+                print("Retomada: a lista de configurações existente é reaproveitada.")
+            else:
+                TE.generate_sim_configs(outros_params["number_of_simulations"], outros_params["overwrite"])
+            number_of_simulations = outros_params["number_of_simulations"]
+            richardson = None
             if outros_params["run_simulations"]:
                 TE.set_result_folder(outros_params["result_folder"])
-                TE.generate_simulations(outros_params["workers"], outros_params["verbose"], outros_params["rk4flag"], outros_params["overwrite"])
+                if outros_params["adaptive"]:
+                    # Os níveis são executados um a um, até a tolerância: só eles são analisados
+                    number_of_simulations, richardson = TE.adaptive_search(outros_params["workers"], outros_params["verbose"], outros_params["rk4flag"], outros_params["overwrite"], outros_params["resume"], outros_params["tolerancia"], outros_params["days_lookahead"])
+                else:
+                    TE.generate_simulations(outros_params["workers"], outros_params["verbose"], outros_params["rk4flag"], outros_params["overwrite"], outros_params["resume"])
             else:
                 print("Execução das simulações não foi ativada")
-            TE.estimate_timestep(outros_params["number_of_simulations"], outros_params["tolerancia"], outros_params["days_lookahead"], outros_params["particle_number"], outros_params["simulation_number"], outros_params["rk4flag"],  outros_params["connect_final_points"], outros_params["compare_euler_rk4"], outros_params["result_folder"] , outros_params["comparison_result_folder"])
+            TE.estimate_timestep(number_of_simulations, outros_params["tolerancia"], outros_params["days_lookahead"], outros_params["particle_number"], outros_params["simulation_number"], outros_params["rk4flag"],  outros_params["connect_final_points"], outros_params["compare_euler_rk4"], outros_params["result_folder"] , outros_params["comparison_result_folder"], richardson)
+            Tracer.save(os.path.join("results", outros_params["result_folder"]))
             print("Programa terminado!")
 
         except FileExistsError as e:
@@ -115,25 +134,37 @@ class TimestepEstimatorGUI(DisplayActions):
         var_verbose = tk.BooleanVar(value=False)
         var_compare = tk.BooleanVar(value=False)
         var_overwrite = tk.BooleanVar(value=False)
+        var_resume = tk.BooleanVar(value=False)
         var_rk4 = tk.BooleanVar(value=False)
+        var_adaptive = tk.BooleanVar(value=False)
         var_connect = tk.BooleanVar(value=False)
+        var_trace = tk.BooleanVar(value=False)
+        var_apriori = tk.BooleanVar(value=False)
 
         cb_runsims   = tk.Checkbutton(root, text="Rodar simulações", variable=var_runsims)
         #cb_rerunall   = tk.Checkbutton(root, text="Reexecutar todas (obrigatório quando nada existe)", variable=var_rerunall)
         cb_verbose   = tk.Checkbutton(root, text="Verbose da simulação", variable=var_verbose)
         cb_compare = tk.Checkbutton(root, text="Comparar Euler vs RK4", variable=var_compare)
         cb_overwrite = tk.Checkbutton(root, text="Overwrite already existing config/result files", variable=var_overwrite)
+        cb_resume    = tk.Checkbutton(root, text="Retomar simulações interrompidas (só as ausentes, com falha ou corrompidas)", variable=var_resume)
         cb_rk4     = tk.Checkbutton(root, text="Usar Runge-Kutta 4", variable=var_rk4)
+        cb_adaptive = tk.Checkbutton(root, text="Busca adaptativa (executa os níveis um a um e para na tolerância estimada por Richardson)", variable=var_adaptive)
         cb_connect     = tk.Checkbutton(root, text="Conectar os pontos finais", variable=var_connect)
+        cb_trace     = tk.Checkbutton(root, text="Capturar o trace das etapas (trace.json na pasta de resultados)", variable=var_trace)
+        cb_apriori   = tk.Checkbutton(root, text="Só recomendar o time step a priori (Courant dos campos baixados, sem simulações)", variable=var_apriori)
 
         cb_runsims.pack(anchor="w", padx=20)
         cb_overwrite.pack(anchor="w", padx=20)
+        cb_resume.pack(anchor="w", padx=20)
         cb_verbose.pack(anchor="w", padx=20)
         cb_compare.pack(anchor="w", padx=20)
         cb_rk4.pack(anchor="w", padx=20)
+        cb_adaptive.pack(anchor="w", padx=20)
         cb_connect.pack(anchor="w", padx=20)
+        cb_trace.pack(anchor="w", padx=20)
+        cb_apriori.pack(anchor="w", padx=20)
 
-        lbl_outputconfig = tk.Label(frame, text="YAML filename in which the configs of simulation are stored")
+        lbl_outputconfig = tk.Label(frame, text="Filename (.csv, or .yaml) in which the configs of simulation are stored")
         lbl_outputconfig.pack(fill="x")
         entry_configlist = tk.Entry(frame)
         entry_configlist.pack(fill="x", pady=3)
@@ -154,18 +185,21 @@ class TimestepEstimatorGUI(DisplayActions):
         entry_folder2.delete(0, tk.END)
         entry_folder2.insert(0, "default_timesteps_euler/")
         entry_configlist.delete(0, tk.END)
-        entry_configlist.insert(0, "default_timesteps_sim_configs_list.yaml")
+        entry_configlist.insert(0, "default_timesteps_sim_configs_list.csv")
 
 
         def update_runsims_state(*args):
             if var_runsims.get():
                 cb_rk4.config(state="normal")
+                cb_adaptive.config(state="normal")
                 cb_verbose.config(state="normal")
                 entry_workers.config(state="normal")
                 entry_time_step.config(state="normal")
             else:
                 cb_rk4.config(state="disabled")
                 var_rk4.set(False)
+                cb_adaptive.config(state="disabled")
+                var_adaptive.set(False)
                 cb_verbose.config(state="disabled")
                 var_verbose.set(False)
                 entry_workers.config(state="disabled")
@@ -223,6 +257,7 @@ class TimestepEstimatorGUI(DisplayActions):
                         "simulation_number": int(entry_sid.get()), 
                         "verbose": bool(var_verbose.get()),
                         "rk4flag": bool(var_rk4.get()),
+                        "adaptive": bool(var_adaptive.get()),
                         "workers": int(entry_workers.get()),
                         "result_folder": entry_folder1.get().strip(),
                         "comparison_result_folder": entry_folder2.get().strip(),
@@ -230,6 +265,9 @@ class TimestepEstimatorGUI(DisplayActions):
                         "connect_final_points": bool(var_connect.get()),
                         "compare_euler_rk4": bool(var_compare.get()),
                         "overwrite": bool(var_overwrite.get()),
+                        "resume": bool(var_resume.get()),
+                        "trace": bool(var_trace.get()),
+                        "a_priori": bool(var_apriori.get()),
                     },
                 ]
             )
@@ -0,0 +1,21 @@
+#@brief Script to run the simulations of a job queue file, on this machine or on any machine sharing the file system
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python queue_worker.py <queue file> [sweep]
+#
+# The sweep (its results folder, as printed when the queue is filled) can be left out when the file holds a single one.
+
+import sys
+from src.JobQueue import JobQueue
+from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+from src.Tracer import Tracer
+
+
+if __name__ == "__main__":
+    queue = JobQueue.open(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    context = queue.get_context()
+    G = GeneralSimulationGeneration.from_context(context)
+    Tracer.start_worker(context.get("profiling", {}), context["result_path"])
+    G.work_queue(queue, context["verbose"], context["rk4"])
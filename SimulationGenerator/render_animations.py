@@ -0,0 +1,28 @@
+#@brief Script to render the animations of the simulations of a results folder, after its sweep
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python render_animations.py <results folder> [simulation_id ...]
+# Without simulation ids, the animations of all the completed simulations of the folder are rendered.
+
+import os
+import sys
+import json
+from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+from src.CompletionJournal import CompletionJournal
+from src.Tracer import Tracer
+
+
+if __name__ == "__main__":
+    result_path = sys.argv[1]
+    with open(os.path.join(result_path, GeneralSimulationGeneration.SWEEP_CONTEXT_FNAME), "r") as f:
+        context = json.load(f)
+    G = GeneralSimulationGeneration.from_context(context)
+    sim_list = G.load_configlist()
+    simulation_ids = {int(simulation_id) for simulation_id in sys.argv[2:]}
+    if simulation_ids:
+        sim_list = [sim_cfg for sim_cfg in sim_list if sim_cfg.simulation_id in simulation_ids]
+    G.render_animations(sim_list, G.principal_cfg.get("animation", {}).get("workers", 0) or os.cpu_count(), context["verbose"])
+    G.report_metrics(CompletionJournal(result_path), sim_list)
+    Tracer.save(result_path)
@@ -0,0 +1,100 @@
+#@brief Rewrite downloaded environment data into a store chunked for simulation access
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import xarray as xr
+from opendrift.readers import reader_netCDF_CF_generic
+
+
+class AnalysisStore:
+    """
+    Rewrites the raw NetCDF files downloaded by Fetch into NetCDF4 files chunked by time and space and
+    compressed. Simulations read a few hours at a time over a small bounding box, so with small chunks
+    a reader only decompresses the blocks around the particles instead of whole fields.
+
+    Attributes:
+        store_directory (str): The folder where the converted files are written.
+        time_chunk (int): Number of time steps per chunk.
+        space_chunk (int): Number of grid points per chunk along longitude and latitude.
+        complevel (int): The zlib compression level (1 to 9).
+    """
+    def __init__(self, field_directory: str, time_chunk: int = 6, space_chunk: int = 64, complevel: int = 4):
+        self.store_directory = os.path.join(field_directory, "analysis")
+        self.time_chunk = time_chunk
+        self.space_chunk = space_chunk
+        self.complevel = complevel
+
+
+    def GetStoreFileName(self, source) -> str:
+        """
+        Returns the converted file name of a source: a single file, or a list of tiles named after their folder.
+        """
+        if isinstance(source, (list, tuple)):
+            name = os.path.basename(os.path.dirname(os.path.abspath(source[0])))
+        else:
+            name = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.store_directory, f"{name}.nc")
+
+    def encoding(self, ds: xr.Dataset) -> dict:
+        encoding = {}
+        for var_name, var in ds.data_vars.items():
+            chunksizes = []
+            for dim in var.dims:
+                if dim == "time":
+                    chunksizes.append(min(self.time_chunk, ds.sizes[dim]))
+                elif dim in ("latitude", "longitude"):
+                    chunksizes.append(min(self.space_chunk, ds.sizes[dim]))
+                else:
+                    chunksizes.append(1)
+            encoding[var_name] = {"zlib": True, "complevel": self.complevel, "shuffle": True, "chunksizes": tuple(chunksizes)}
+        return encoding
+
+    def is_converted(self, source) -> bool:
+        """
+        Returns whether the converted file of a source exists and is newer than all the files of the source.
+        """
+        fnames = list(source) if isinstance(source, (list, tuple)) else [source]
+        store_fname = self.GetStoreFileName(source)
+        return os.path.exists(store_fname) and os.path.getmtime(store_fname) >= max(os.path.getmtime(f) for f in fnames)
+
+    def convert(self, source) -> str:
+        """
+        Converts a source unless it was already converted after its last modification.
+
+        Returns:
+            str: The converted file name.
+        """
+        fnames = list(source) if isinstance(source, (list, tuple)) else [source]
+        store_fname = self.GetStoreFileName(source)
+        if self.is_converted(source):
+            return store_fname
+
+        print(f"     Convertendo {os.path.basename(store_fname)} em store chunked (time={self.time_chunk}, espaço={self.space_chunk})...")
+        os.makedirs(self.store_directory, exist_ok=True)
+        ds = xr.open_mfdataset(fnames) if len(fnames) > 1 else xr.open_dataset(fnames[0])
+        with ds:
+            partial_fname = store_fname.replace(".nc", ".part.nc")
+            ds.to_netcdf(partial_fname, format="NETCDF4", encoding=self.encoding(ds))
+        os.replace(partial_fname, store_fname)
+        return store_fname
+
+    def resolve(self, source):
+        """
+        Returns the converted file of a source when it is up to date, or the source itself (a converted file
+        older than the source, downloaded again since, is stale).
+        """
+        return self.GetStoreFileName(source) if self.is_converted(source) else source
+
+
+    @staticmethod
+    def Reader(source):
+        """
+        Opendrift reader adapter for the analysis store. The store is CF-compliant, so the generic NetCDF reader
+        consumes it. The file is opened here without Dask nor in-memory cache, so that each request of the reader only
+        reads and decompresses the chunks it intersects. A source not converted yet (see resolve) is opened as is.
+        """
+        if isinstance(source, (list, tuple)):
+            return reader_netCDF_CF_generic.Reader(source)
+        ds = xr.open_dataset(source, decode_times=False, chunks=None, cache=False)
+        return reader_netCDF_CF_generic.Reader(ds, name=f"analysis_store:{os.path.basename(str(source))}")
@@ -0,0 +1,118 @@
+#@brief Journal of the completed simulations of a sweep, used to resume an interrupted sweep
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import glob
+from datetime import datetime
+import xarray as xr
+
+from src.EnvironmentCatalog import EnvironmentCatalog
+
+
+class CompletionJournal:
+    """
+    Records the outcome of each simulation of a sweep in the `journal/` folder of its results folder, one
+    JSON file per simulation_id. Each record is written atomically by the worker that ran the simulation, so
+    that an interrupted sweep leaves only complete records, and can be resumed by running only the simulations
+    that are missing, failed or whose result file is corrupt.
+
+    A record holds the status ("done" or "failed"), the result file, its size and checksum, the duration
+    of the simulation, its stage timings and resource metrics (see SimulationMetrics) and, for failures,
+    the error message.
+
+    Attributes:
+        journal_directory (str): The folder containing the records.
+    """
+    # Variables every Opendrift result file must contain
+    RESULT_VARIABLES = ["lon", "lat", "status"]
+
+    def __init__(self, result_path: str):
+        self.journal_directory = os.path.join(result_path, "journal")
+
+
+    def GetRecordFileName(self, simulation_id: int) -> str:
+        return os.path.join(self.journal_directory, f"sim_{simulation_id:04d}.json")
+
+    def write(self, record: dict):
+        """
+        Writes a record atomically (temporary file, then rename).
+        """
+        os.makedirs(self.journal_directory, exist_ok=True)
+        record_fname = self.GetRecordFileName(record["simulation_id"])
+        tmp_fname = record_fname + ".tmp"
+        with open(tmp_fname, "w") as f:
+            json.dump(record, f, indent=2)
+        os.replace(tmp_fname, record_fname)
+
+    def record_success(self, simulation_id: int, result_fname: str, duration: float, metrics: dict = None):
+        self.write({
+            "simulation_id": simulation_id,
+            "status"       : "done",
+            "result_path"  : result_fname,
+            "size_bytes"   : os.path.getsize(result_fname),
+            "checksum"     : EnvironmentCatalog.checksum(result_fname),
+            "duration_s"   : duration,
+            "finished_at"  : datetime.now().isoformat(timespec="seconds"),
+            "metrics"      : metrics,
+        })
+
+    def record_failure(self, simulation_id: int, duration: float, error: Exception):
+        self.write({
+            "simulation_id": simulation_id,
+            "status"       : "failed",
+            "duration_s"   : duration,
+            "error"        : f"{type(error).__name__}: {error}",
+            "finished_at"  : datetime.now().isoformat(timespec="seconds"),
+        })
+
+
+    def load(self) -> dict:
+        """
+        Returns the records of the journal, by simulation_id.
+        """
+        records = {}
+        for record_fname in glob.glob(os.path.join(self.journal_directory, "sim_*.json")):
+            with open(record_fname, "r") as f:
+                record = json.load(f)
+            records[record["simulation_id"]] = record
+        return records
+
+    def clear(self):
+        for record_fname in glob.glob(os.path.join(self.journal_directory, "sim_*.json*")):
+            os.remove(record_fname)
+
+
+    @staticmethod
+    def check_result(record: dict, verify_checksum: bool = False) -> bool:
+        """
+        Checks the result file of a completed simulation. Only the header of the file is read: it must open,
+        contain the Opendrift variables and have the size recorded in the journal. With `verify_checksum`,
+        the whole file is also read again to compare its checksum.
+        """
+        result_fname = record.get("result_path")
+        if record.get("status") != "done" or result_fname is None or not os.path.exists(result_fname):
+            return False
+        if os.path.getsize(result_fname) != record["size_bytes"]:
+            return False
+        try:
+            with xr.open_dataset(result_fname, decode_times=False) as ds:
+                if any(var not in ds.variables for var in CompletionJournal.RESULT_VARIABLES) or ds.sizes.get("time", 0) == 0:
+                    return False
+        except (OSError, ValueError):
+            return False
+        return not verify_checksum or EnvironmentCatalog.checksum(result_fname) == record["checksum"]
+
+
+    def pending(self, sim_list, verify_checksum: bool = False) -> list:
+        """
+        Returns the simulations of `sim_list` to run again: those without a record, failed, or with a missing or corrupt result.
+        """
+        records = self.load()
+        pending = []
+        for sim_cfg in sim_list:
+            record = records.get(sim_cfg.simulation_id)
+            if record is None or not CompletionJournal.check_result(record, verify_checksum):
+                pending.append(sim_cfg)
+        return pending
@@ -0,0 +1,210 @@
+#@brief Compact columnar storage of the simulation configuration lists, read back as a stream of records
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import csv
+import json
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+from omegaconf import OmegaConf
+
+
+class ConfigList:
+    """
+    Reads and writes the list of the simulation configurations of a sweep.
+
+    A list whose file name ends in `.csv` is stored as a table, one row per simulation and one column per
+    parameter, after a schema header giving the type of each column:
+
+        # simgen config list v1
+        # schema: simulation_id:int,start_date:str,...,spill_lon:float,...
+        simulation_id,start_date,...
+        0,2024-01-02,...
+
+    Its simulations are read back as SimConfig records, named tuples with the fields of the configuration files
+    (`sim.spill_lon`, `sim["time_step"]`), built one row at a time by iterate: the list never has to be held
+    as OmegaConf nodes, which take several kilobytes per simulation and most of the loading time of a large
+    YAML list. Floats are written with repr, so they are read back exactly.
+
+    Any other file name is a YAML list, as written by the previous versions, which stays readable by the same
+    methods: a YAML list is also used in place of a missing table with the same name (see existing), so that
+    the lists written before the tables keep being found. export_yaml converts a table to a YAML list for inspection.
+    """
+    HEADER = "# simgen config list v1"
+    SCHEMA_PREFIX = "# schema: "
+    PARSERS = {
+        "int"  : int,
+        "float": float,
+        "str"  : str,
+        "bool" : lambda text: text == "True",
+        "json" : json.loads,
+    }
+
+    @staticmethod
+    def is_columnar(fname: str) -> bool:
+        return os.path.splitext(fname)[1].lower() == ".csv"
+
+
+    @staticmethod
+    def existing(fname: str) -> str:
+        """
+        Returns the list file to use for `fname`: itself, or the YAML list with the same name written by the
+        previous versions, when `fname` is a table that doesn't exist.
+        """
+        yaml_fname = os.path.splitext(fname)[0] + ".yaml"
+        if ConfigList.is_columnar(fname) and not os.path.exists(fname) and os.path.exists(yaml_fname):
+            return yaml_fname
+        return fname
+
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def record_type(fields: tuple):
+        """
+        Returns the record class of a list with the columns `fields`.
+        """
+        base = namedtuple("SimConfig", fields)
+
+        class SimConfig(base):
+            __slots__ = ()
+
+            def __getitem__(self, key):
+                return getattr(self, key) if isinstance(key, str) else base.__getitem__(self, key)
+
+            def get(self, key, default=None):
+                return getattr(self, key, default)
+
+        return SimConfig
+
+
+    @staticmethod
+    def column_type(values) -> str:
+        """
+        Returns the schema type of a column (NumPy array, list, or single value shared by all rows).
+        """
+        if isinstance(values, np.ndarray) and values.dtype.kind in "biufU":
+            return {"b": "bool", "i": "int", "u": "int", "f": "float", "U": "str"}[values.dtype.kind]
+        values = values.tolist() if isinstance(values, np.ndarray) else values if isinstance(values, (list, tuple)) else [values]
+        if all(isinstance(value, (bool, np.bool_)) for value in values):
+            return "bool"
+        if all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in values):
+            return "int"
+        if all(isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool) for value in values):
+            return "float"
+        if all(isinstance(value, str) for value in values):
+            return "str"
+        return "json"
+
+    @staticmethod
+    def format_value(value, column_type: str) -> str:
+        if column_type == "float":
+            return repr(float(value))
+        if column_type == "int":
+            return str(int(value))
+        if column_type == "json":
+            return json.dumps(value)
+        return str(value)
+
+
+    @staticmethod
+    def save_columns(columns: dict, nb_records: int, fname: str):
+        """
+        Writes a list given by columns: as a table if `fname` ends in `.csv`, as a YAML list otherwise.
+
+        Args:
+            columns (dict): The values of each parameter, in the order of the columns: a sequence (list, tuple
+                or NumPy array) of `nb_records` values, or a single value shared by all the simulations.
+            nb_records (int): Number of simulations of the list.
+            fname (str): The list file.
+        """
+        if not ConfigList.is_columnar(fname):
+            values = [values.tolist() if isinstance(values, np.ndarray) else values if isinstance(values, (list, tuple)) else [values] * nb_records
+                      for values in columns.values()]
+            OmegaConf.save(config=[dict(zip(columns, row)) for row in zip(*values)], f=fname)
+            return
+        types = {name: ConfigList.column_type(values) for name, values in columns.items()}
+        formatted = []
+        for name, values in columns.items():
+            if isinstance(values, np.ndarray) and values.dtype.kind in "biufU":
+                # Cada valor distinto é formatado uma única vez
+                uniques, inverse = np.unique(values, return_inverse=True)
+                formatted.append(np.array([ConfigList.format_value(value, types[name]) for value in uniques.tolist()], dtype=object)[inverse.ravel()].tolist())
+            elif isinstance(values, (list, tuple, np.ndarray)):
+                formatted.append([ConfigList.format_value(value, types[name]) for value in values])
+            else:
+                # Coluna constante: formatada uma única vez
+                formatted.append([ConfigList.format_value(values, types[name])] * nb_records)
+        with open(fname, "w", newline="") as f:
+            f.write(ConfigList.HEADER + "\n")
+            f.write(ConfigList.SCHEMA_PREFIX + ",".join(f"{name}:{column_type}" for name, column_type in types.items()) + "\n")
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(columns.keys())
+            writer.writerows(zip(*formatted))
+
+    @staticmethod
+    def save(sim_cfgs: list, fname: str):
+        """
+        Writes a list of simulation configurations (DictConfig or dict): as a table if `fname` ends in `.csv`,
+        as a YAML list otherwise.
+        """
+        if not ConfigList.is_columnar(fname):
+            OmegaConf.save(config=list(sim_cfgs), f=fname)
+            return
+        rows = [OmegaConf.to_container(sim_cfg) if OmegaConf.is_config(sim_cfg) else dict(sim_cfg) for sim_cfg in sim_cfgs]
+        fields = list(rows[0]) if rows else []
+        ConfigList.save_columns({field: [row[field] for row in rows] for field in fields}, len(rows), fname)
+
+
+    @staticmethod
+    def read_schema(f) -> list:
+        """
+        Reads the schema header of an open table and returns the (name, type) of its columns.
+        """
+        header = f.readline().rstrip("\n")
+        schema = f.readline().rstrip("\n")
+        if header != ConfigList.HEADER or not schema.startswith(ConfigList.SCHEMA_PREFIX):
+            raise ValueError(f"ConfigList: '{f.name}' is not a configuration list (missing schema header).")
+        return [tuple(column.rsplit(":", 1)) for column in schema[len(ConfigList.SCHEMA_PREFIX):].split(",")]
+
+    @staticmethod
+    def iterate(fname: str):
+        """
+        Yields the simulations of a list one at a time, without loading the whole table.
+        """
+        if not ConfigList.is_columnar(fname):
+            yield from OmegaConf.load(fname)
+            return
+        with open(fname, "r", newline="") as f:
+            schema = ConfigList.read_schema(f)
+            reader = csv.reader(f)
+            names = next(reader)
+            if names != [name for name, _ in schema]:
+                raise ValueError(f"ConfigList: the columns of '{fname}' don't match its schema.")
+            SimConfig = ConfigList.record_type(tuple(names))
+            parsers = [ConfigList.PARSERS[column_type] for _, column_type in schema]
+            for row in reader:
+                yield SimConfig._make([parse(text) for parse, text in zip(parsers, row)])
+
+    @staticmethod
+    def load(fname: str) -> list:
+        """
+        Returns all the simulations of a list.
+        """
+        if not ConfigList.is_columnar(fname):
+            return OmegaConf.load(fname)
+        return list(ConfigList.iterate(fname))
+
+
+    @staticmethod
+    def export_yaml(fname: str, yaml_fname: str = None) -> str:
+        """
+        Writes a table as a YAML list, by default next to it, to inspect it or use it with older versions.
+
+        Returns:
+            str: The YAML file.
+        """
+        yaml_fname = yaml_fname or os.path.splitext(fname)[0] + ".yaml"
+        OmegaConf.save(config=OmegaConf.create([sim._asdict() for sim in ConfigList.iterate(fname)]), f=yaml_fname)
+        return yaml_fname
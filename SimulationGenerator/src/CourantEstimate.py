@@ -0,0 +1,102 @@
+#@brief A-priori Courant number of the downloaded environment fields, and the time step it recommends
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import numpy as np
+import xarray as xr
+
+from src.LogHistogram import LogHistogram
+from src.ErrorStatistics import ErrorStatistics
+
+
+class CourantEstimate:
+    """
+    Scans the current (uo, vo) and wind (eastward_wind, northward_wind) fields downloaded for a simulation, over
+    its bounding box and time window, to recommend a time step before any simulation runs.
+
+    A particle drifts with u = current + wind_drift_factor x wind. Its Courant number over a step dt is
+    max(|u_x| / dx, |u_y| / dy) x dt, dx and dy being the size of the current grid cell at its latitude: the
+    number of cells crossed per step. The crossing rate max(|u_x| / dx, |u_y| / dy) (1/s) is computed at every
+    ocean cell and hour of the window, the wind being interpolated on the current grid, and the time step keeping
+    the chosen quantile of the Courant numbers below the target is recommended.
+
+    The fields are read by chunks of CHUNK_HOURS hours, each reduced to a histogram of the crossing rates (see
+    LogHistogram, within 1.2% of the exact quantiles), so that memory doesn't depend on the length of the window.
+    """
+    CHUNK_HOURS = 24
+    PERCENTILES = (50, 95, 99)
+    WIND_MARGIN_DEG = 0.25
+    HISTOGRAM = LogHistogram(-10, 0, 100)
+
+    def __init__(self, wind_drift_factor: float, chunk_hours: int = CHUNK_HOURS):
+        self.wind_drift_factor = wind_drift_factor
+        self.chunk_hours = chunk_hours
+
+
+    @staticmethod
+    def open_source(source, bbox: tuple, start, end, margin: float = 0.0) -> xr.Dataset:
+        """
+        Lazily opens a source of Fetch (a file or a list of tiles) restricted to the window, widened by `margin`
+        degrees, at the surface.
+        """
+        ds = xr.open_mfdataset(source) if isinstance(source, (list, tuple)) else xr.open_dataset(source)
+        ds = ds.sel(longitude=slice(bbox[0] - margin, bbox[1] + margin), latitude=slice(bbox[2] - margin, bbox[3] + margin), time=slice(start, end))
+        return ds.isel(depth=0) if "depth" in ds.dims else ds
+
+    @staticmethod
+    def cell_sizes(ds: xr.Dataset) -> tuple:
+        """
+        Returns the size (m) of the grid cells along longitude (one per latitude) and latitude.
+        """
+        latitudes = ds["latitude"].values
+        dlon = np.radians(np.abs(np.diff(ds["longitude"].values)).mean())
+        dlat = np.radians(np.abs(np.diff(latitudes)).mean())
+        return ErrorStatistics.EARTH_RADIUS_M * np.cos(np.radians(latitudes)) * dlon, ErrorStatistics.EARTH_RADIUS_M * dlat
+
+
+    def crossing_rates(self, current: xr.Dataset, wind: xr.Dataset) -> np.ndarray:
+        """
+        Returns the crossing rates (1/s) of the ocean cells of a chunk of the current field (land cells are NaN).
+        """
+        wind = wind.interp(time=current["time"], latitude=current["latitude"], longitude=current["longitude"])
+        dx, dy = CourantEstimate.cell_sizes(current)
+        ux = current["uo"].values + self.wind_drift_factor * np.nan_to_num(wind["eastward_wind"].values)
+        uy = current["vo"].values + self.wind_drift_factor * np.nan_to_num(wind["northward_wind"].values)
+        return np.maximum(np.abs(ux) / dx[:, None], np.abs(uy) / dy)
+
+    def scan(self, current_source, wind_source, bbox: tuple, start, end, percentiles: tuple = PERCENTILES) -> dict:
+        """
+        Returns the distribution of the crossing rates (1/s) over the window: "count" of ocean cells x hours,
+        "max", and "p50", "p95"... (see `percentiles`).
+        """
+        current = CourantEstimate.open_source(current_source, bbox, start, end)
+        # Com uma margem, para interpolar o vento (de grade mais grossa) até a borda da grade da correnteza
+        wind = CourantEstimate.open_source(wind_source, bbox, start, end, CourantEstimate.WIND_MARGIN_DEG)
+        histogram = np.zeros(CourantEstimate.HISTOGRAM.nb_bins, dtype=np.int64)
+        maximum = 0.0
+        for first in range(0, current.sizes["time"], self.chunk_hours):
+            rates = self.crossing_rates(current.isel(time=slice(first, first + self.chunk_hours)), wind)
+            rates = rates[np.isfinite(rates)]
+            if rates.size:
+                histogram += CourantEstimate.HISTOGRAM.counts(rates)
+                maximum = max(maximum, float(rates.max()))
+        current.close()
+        wind.close()
+
+        count = int(histogram.sum())
+        statistics = {"count": count, "max": maximum if count else np.nan}
+        for q in percentiles:
+            statistics[f"p{q}"] = float(CourantEstimate.HISTOGRAM.percentile(histogram, q))
+        return statistics
+
+
+    @staticmethod
+    def recommend(rate: float, courant: float, output_time_step: int) -> int:
+        """
+        Returns the largest time step (s) dividing `output_time_step` whose Courant number is at most `courant`
+        at the crossing rate `rate` (1/s).
+        """
+        if not rate > 0:
+            return int(output_time_step)
+        limit = max(int(courant / rate), 1)
+        return max(dt for dt in range(1, min(limit, int(output_time_step)) + 1) if output_time_step % dt == 0)
@@ -0,0 +1,106 @@
+#@brief Pluggable backends serving environment data subsets to Fetch
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import threading
+from abc import ABC, abstractmethod
+import xarray as xr
+import copernicusmarine
+
+
+class DownloadBackend(ABC):
+    """
+    Interface used by Fetch to obtain a spatiotemporal subset of a dataset.
+
+    The arguments of `subset` mirror the ones of `copernicusmarine.subset`, so that
+    the Copernicus Marine toolbox can be swapped by any other source of NetCDF data.
+
+    Fetch downloads its tiles from several threads, while the HDF5 library under NetCDF is not thread-safe:
+    the NetCDF files are read and written locally under NETCDF_LOCK.
+    """
+    NETCDF_LOCK = threading.Lock()
+
+    @abstractmethod
+    def subset(self, dataset_id: str, variables: list, minimum_longitude: float, maximum_longitude: float,
+               minimum_latitude: float, maximum_latitude: float, start_datetime, end_datetime,
+               output_filename: str, output_directory: str, **kwargs):
+        """
+        Writes the requested subset into `output_directory`/`output_filename`.
+
+        Args:
+            dataset_id (str): The identifier of the dataset to subset.
+            variables (list): The variables to keep.
+            minimum_longitude, maximum_longitude, minimum_latitude, maximum_latitude (float):
+                The bounding box of the subset.
+            start_datetime, end_datetime (datetime or str): The (inclusive) time window of the subset.
+            output_filename (str): The name of the NetCDF file to write.
+            output_directory (str): The folder in which the file is written.
+            **kwargs: Backend-specific options (credentials, depth range...).
+        """
+        pass
+
+    @staticmethod
+    def from_cfg(cm_cfg):
+        """
+        Returns the backend chosen by the Copernicus Marine configuration: a LocalFileBackend over its
+        `local_sources` (dataset identifier -> local file) when given, the Copernicus Marine toolbox otherwise.
+        """
+        local_sources = cm_cfg.get("local_sources", None)
+        if local_sources:
+            return LocalFileBackend(dict(local_sources))
+        return CopernicusMarineBackend()
+
+
+class CopernicusMarineBackend(DownloadBackend):
+    """
+    Downloads data from the Copernicus Marine Data Store through the `copernicusmarine` toolbox.
+    """
+    def subset(self, dataset_id, variables, minimum_longitude, maximum_longitude,
+               minimum_latitude, maximum_latitude, start_datetime, end_datetime,
+               output_filename, output_directory, **kwargs):
+        copernicusmarine.subset(
+            dataset_id        = dataset_id,
+            variables         = variables,
+            minimum_longitude = minimum_longitude,
+            maximum_longitude = maximum_longitude,
+            minimum_latitude  = minimum_latitude,
+            maximum_latitude  = maximum_latitude,
+            start_datetime    = start_datetime,
+            end_datetime      = end_datetime,
+            output_filename   = output_filename,
+            output_directory  = output_directory,
+            **kwargs
+        )
+
+
+class LocalFileBackend(DownloadBackend):
+    """
+    Serves subsets from NetCDF files already available on the local file system, typically
+    used as a stand-in of the Copernicus Marine Data Store in tests.
+
+    Attributes:
+        sources (dict): Maps each dataset identifier to the path (or glob pattern) of a local file.
+    """
+    def __init__(self, sources: dict):
+        self.sources = sources
+
+    def subset(self, dataset_id, variables, minimum_longitude, maximum_longitude,
+               minimum_latitude, maximum_latitude, start_datetime, end_datetime,
+               output_filename, output_directory, **kwargs):
+        if dataset_id not in self.sources:
+            raise KeyError(f"LocalFileBackend: no local source registered for dataset '{dataset_id}'")
+        source = self.sources[dataset_id]
+        with DownloadBackend.NETCDF_LOCK:
+            if any(s in str(source) for s in ['*', '?', '[']):
+                ds = xr.open_mfdataset(source)
+            else:
+                ds = xr.open_dataset(source)
+            with ds:
+                subset = ds[variables].sel(
+                    time      = slice(start_datetime, end_datetime),
+                    longitude = slice(minimum_longitude, maximum_longitude),
+                    latitude  = slice(minimum_latitude, maximum_latitude),
+                )
+                os.makedirs(output_directory, exist_ok=True)
+                subset.to_netcdf(os.path.join(output_directory, output_filename))
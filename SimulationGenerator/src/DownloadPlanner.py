@@ -0,0 +1,62 @@
+#@brief Plan the environment data downloads needed by a list of simulations
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+from datetime import datetime, timedelta
+
+
+class DownloadPlanner:
+    """
+    Computes the minimal set of pieces (time window and bounding box) of environment data that a list
+    of simulation configurations needs, instead of the whole date range of the Copernicus Marine configuration.
+
+    Attributes:
+        merge_gap (timedelta): Windows separated by less than this gap are merged into a single piece,
+            to avoid many tiny requests.
+    """
+    def __init__(self, merge_gap_days: float = 0):
+        self.merge_gap = timedelta(days=merge_gap_days)
+
+
+    @staticmethod
+    def simulation_window(sim_cfg) -> tuple:
+        """
+        Returns the (start, end, bbox) needed by one simulation, bbox being (min_lon, max_lon, min_lat, max_lat).
+        """
+        start = datetime.strptime(sim_cfg.start_date, "%Y-%m-%d")
+        end = datetime.strptime(sim_cfg.end_date, "%Y-%m-%d")
+        return start, end, (sim_cfg.min_lon, sim_cfg.max_lon, sim_cfg.min_lat, sim_cfg.max_lat)
+
+    @staticmethod
+    def union_bbox(bbox1: tuple, bbox2: tuple) -> tuple:
+        return (min(bbox1[0], bbox2[0]), max(bbox1[1], bbox2[1]), min(bbox1[2], bbox2[2]), max(bbox1[3], bbox2[3]))
+
+
+    def plan(self, sim_list) -> list:
+        """
+        Merges the windows of all simulations into pieces, sorted by start date.
+
+        Args:
+            sim_list: Iterable of simulation configurations (DictConfig, ConfigList record or any object with the same fields).
+
+        Returns:
+            list: The (start, end, bbox) pieces to download.
+        """
+        windows = sorted((DownloadPlanner.simulation_window(sim_cfg) for sim_cfg in sim_list), key=lambda w: w[0])
+        pieces = []
+        for start, end, bbox in windows:
+            if pieces and start <= pieces[-1][1] + self.merge_gap:
+                last_start, last_end, last_bbox = pieces[-1]
+                pieces[-1] = (last_start, max(last_end, end), DownloadPlanner.union_bbox(last_bbox, bbox))
+            else:
+                pieces.append((start, end, bbox))
+        return pieces
+
+
+    @staticmethod
+    def describe(pieces: list, full_start: datetime, full_end: datetime):
+        planned_days = sum((end - start).total_seconds() for start, end, _ in pieces) / 86400
+        full_days = (full_end - full_start).total_seconds() / 86400
+        print(f"     Plano de download: {len(pieces)} janela(s) somando {planned_days:.0f} dias, em vez de {full_days:.0f} dias do arquivo de configuração Copernicus Marine:")
+        for start, end, bbox in pieces:
+            print(f"       * {start.strftime('%Y-%m-%d')} -> {end.strftime('%Y-%m-%d')} no domínio {bbox}")
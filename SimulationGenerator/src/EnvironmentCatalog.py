@@ -0,0 +1,245 @@
+#@brief Catalog of the environment data files cached on disk
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import glob
+import hashlib
+from datetime import datetime
+import numpy as np
+import xarray as xr
+
+
+class EnvironmentCatalog:
+    """
+    Keeps track of the environment (wind and current) files stored in the field directory, so that a
+    request can be served by any cached file whose coverage contains it, instead of downloading again.
+
+    Each entry of the catalog records the kind of data, its files (relative to the field directory),
+    variables, bounding box, time window, checksums, size and last access time.
+
+    The catalogs loaded by a process are reused (see open), as a Fetch is created for every simulation.
+
+    Attributes:
+        field_directory (str): The folder containing the environment data files.
+        disk_budget_bytes (int): Maximum size of the cached files, 0 for no limit.
+        entries (list): The catalog entries (dict).
+    """
+    CATALOG_FNAME = "catalog.json"
+    # Catálogos carregados pelo processo, por diretório de dados
+    opened = {}
+
+    # Variables identifying the kind of data stored in a file
+    KIND_VARIABLES = {
+        "current": ["uo", "vo"],
+        "wind"   : ["eastward_wind", "northward_wind"],
+    }
+
+    def __init__(self, field_directory: str, disk_budget_gb: float = 0):
+        self.field_directory = field_directory
+        self.disk_budget_bytes = int((disk_budget_gb or 0) * 1024**3)
+        self.entries = []
+        self.load()
+
+    @classmethod
+    def open(cls, field_directory: str, disk_budget_gb: float = 0):
+        """
+        Returns the catalog of a field directory, reusing the one already loaded by the process, which is read
+        again only when another process has written the catalog file since.
+        """
+        key = os.path.normpath(field_directory)
+        catalog = cls.opened.get(key)
+        if catalog is None:
+            catalog = cls.opened[key] = cls(field_directory, disk_budget_gb)
+        else:
+            catalog.disk_budget_bytes = int((disk_budget_gb or 0) * 1024**3)
+            if catalog.loaded_stamp != catalog.stamp():
+                catalog.load()
+        return catalog
+
+
+    def catalog_path(self) -> str:
+        return os.path.join(self.field_directory, EnvironmentCatalog.CATALOG_FNAME)
+
+    def stamp(self):
+        if not os.path.exists(self.catalog_path()):
+            return None
+        stat = os.stat(self.catalog_path())
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def load(self):
+        self.loaded_stamp = self.stamp()
+        if self.loaded_stamp is not None:
+            with open(self.catalog_path(), "r") as f:
+                self.entries = json.load(f)["entries"]
+        else:
+            self.entries = []
+
+    def save(self):
+        """
+        Writes the catalog atomically, so that readers never see a partially written file.
+        """
+        os.makedirs(self.field_directory, exist_ok=True)
+        tmp_path = self.catalog_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.catalog_path())
+        self.loaded_stamp = self.stamp()
+
+
+    @staticmethod
+    def checksum(fname: str) -> str:
+        sha = hashlib.sha256()
+        with open(fname, "rb") as f:
+            for block in iter(lambda: f.read(16 * 1024**2), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def abspaths(self, entry: dict) -> list:
+        return [os.path.join(self.field_directory, f) for f in entry["files"]]
+
+    def entry_exists(self, entry: dict) -> bool:
+        return all(os.path.exists(f) for f in self.abspaths(entry))
+
+    def verify(self, entry: dict) -> bool:
+        """
+        Returns whether the files of an entry still have the checksums recorded when it was registered.
+        """
+        return [EnvironmentCatalog.checksum(f) for f in self.abspaths(entry)] == entry.get("checksums")
+
+
+    def register(self, kind: str, fnames: list, variables: list, bbox: tuple, start: datetime, end: datetime) -> dict:
+        """
+        Adds (or refreshes) the entry describing a set of files covering `bbox` (min_lon, max_lon, min_lat,
+        max_lat) between `start` and `end`. The coverage is the one requested when the files were downloaded.
+        """
+        relpaths = [os.path.relpath(f, self.field_directory) for f in fnames]
+        self.entries = [e for e in self.entries if not set(e["files"]) & set(relpaths)] # An appended store replaces its previous entry
+        entry = {
+            "kind"       : kind,
+            "files"      : relpaths,
+            "variables"  : list(variables),
+            "min_lon"    : float(bbox[0]),
+            "max_lon"    : float(bbox[1]),
+            "min_lat"    : float(bbox[2]),
+            "max_lat"    : float(bbox[3]),
+            "start"      : start.isoformat(),
+            "end"        : end.isoformat(),
+            "checksums"  : [EnvironmentCatalog.checksum(f) for f in fnames],
+            "mtimes"     : [os.path.getmtime(f) for f in fnames],
+            "size_bytes" : sum(os.path.getsize(f) for f in fnames),
+            "last_access": datetime.now().isoformat(),
+        }
+        self.entries.append(entry)
+        self.save()
+        return entry
+
+    def register_file(self, fname: str):
+        """
+        Registers a file found on disk whose download request is unknown, reading its coverage from its
+        coordinates (extended by half a grid cell, as the requested bounding box usually falls between grid points).
+        """
+        with xr.open_dataset(fname) as ds:
+            kind = next((k for k, v in EnvironmentCatalog.KIND_VARIABLES.items() if all(var in ds for var in v)), None)
+            if kind is None:
+                return None
+            lon, lat = ds["longitude"].values, ds["latitude"].values
+            half_dlon = abs(float(lon[1] - lon[0])) / 2 if len(lon) > 1 else 0
+            half_dlat = abs(float(lat[1] - lat[0])) / 2 if len(lat) > 1 else 0
+            bbox = (lon.min() - half_dlon, lon.max() + half_dlon, lat.min() - half_dlat, lat.max() + half_dlat)
+            times = ds["time"].values
+            start = datetime.fromisoformat(str(np.datetime_as_string(times.min(), unit="s")))
+            end = datetime.fromisoformat(str(np.datetime_as_string(times.max(), unit="s")))
+            variables = [v for v in ds.data_vars]
+        return self.register(kind, [fname], variables, bbox, start, end)
+
+    def scan(self):
+        """
+        Synchronizes the catalog with the field directory: forgets deleted files, checks the files modified
+        since they were registered and registers the NetCDF files that are not tracked yet.
+
+        A modified file whose checksum didn't change was only touched, and keeps its entry. Otherwise its content
+        changed outside of the catalog, and the recorded coverage can't be trusted anymore: the file is registered
+        again from its own coordinates.
+        """
+        self.entries = [e for e in self.entries if self.entry_exists(e)]
+        for entry in list(self.entries):
+            fnames = self.abspaths(entry)
+            mtimes = [os.path.getmtime(f) for f in fnames]
+            if mtimes == entry.get("mtimes"):
+                continue
+            if self.verify(entry):
+                entry["mtimes"] = mtimes
+                continue
+            print(f"     Catálogo: conteúdo de {entry['files'][0]} modificado, registrando de novo a partir das suas coordenadas...")
+            self.entries.remove(entry)
+            for fname in fnames:
+                self.register_file(fname)
+        tracked = {f for e in self.entries for f in e["files"]}
+        for fname in sorted(glob.glob(os.path.join(self.field_directory, "*.nc"))):
+            if os.path.relpath(fname, self.field_directory) not in tracked:
+                print(f"     Catálogo: registrando {os.path.basename(fname)}...")
+                self.register_file(fname)
+        self.save()
+
+
+    @staticmethod
+    def covers(entry: dict, kind: str, bbox: tuple, start: datetime, end: datetime) -> bool:
+        return (entry["kind"] == kind and
+                entry["min_lon"] <= bbox[0] and entry["max_lon"] >= bbox[1] and
+                entry["min_lat"] <= bbox[2] and entry["max_lat"] >= bbox[3] and
+                datetime.fromisoformat(entry["start"]) <= start and datetime.fromisoformat(entry["end"]) >= end)
+
+    def find_covering(self, kind: str, bbox: tuple, start: datetime, end: datetime, touch: bool = False):
+        """
+        Returns the smallest cached entry covering the request, or None.
+
+        Args:
+            touch (bool): Whether to update the last access time of the entry (used by the eviction policy).
+                Simulation workers only read the catalog and leave it to False.
+        """
+        candidates = [e for e in self.entries if EnvironmentCatalog.covers(e, kind, bbox, start, end) and self.entry_exists(e)]
+        if not candidates:
+            return None
+        entry = min(candidates, key=lambda e: e["size_bytes"])
+        if touch:
+            entry["last_access"] = datetime.now().isoformat()
+            self.save()
+        return entry
+
+    def find_by_files(self, fnames: list):
+        relpaths = [os.path.relpath(f, self.field_directory) for f in fnames]
+        return next((e for e in self.entries if e["files"] == relpaths), None)
+
+
+    def total_size(self) -> int:
+        return sum(e["size_bytes"] for e in self.entries)
+
+    def evict(self, keep: list = None):
+        """
+        Deletes the least recently used entries until the cached files fit in the disk budget.
+
+        Args:
+            keep (list): Entries that must not be evicted (the ones needed by the current request).
+        """
+        if self.disk_budget_bytes <= 0:
+            return
+        keep_files = [e["files"] for e in (keep or []) if e is not None]
+        for entry in sorted(self.entries, key=lambda e: e["last_access"]):
+            if self.total_size() <= self.disk_budget_bytes:
+                break
+            if entry["files"] in keep_files:
+                continue
+            print(f"     Catálogo: removendo {entry['files'][0]} ({entry['size_bytes']/1024**2:.1f} MB) para respeitar o orçamento de disco...")
+            for fname in self.abspaths(entry):
+                for path in (fname, fname + ".done"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                folder = os.path.dirname(fname)
+                if os.path.abspath(folder) != os.path.abspath(self.field_directory) and os.path.isdir(folder) and not os.listdir(folder):
+                    os.rmdir(folder)
+            self.entries.remove(entry)
+        self.save()
+        if self.total_size() > self.disk_budget_bytes:
+            print(f"     Catálogo: os dados necessários ({self.total_size()/1024**3:.2f} GB) ultrapassam o orçamento de disco.")
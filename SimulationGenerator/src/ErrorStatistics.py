@@ -0,0 +1,131 @@
+#@brief Streaming statistics of the distance between the trajectories of two simulations, computed by chunks of particles
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import numpy as np
+
+from src.LogHistogram import LogHistogram
+
+
+class ErrorStatistics:
+    """
+    The distance between the positions of the same particles in two simulations of a TrajectoryCache, and its
+    statistics over the particles at each output time: mean, maximum and percentiles.
+
+    The particles are processed in chunks of CHUNK_PARTICLES, each read from the memory-mapped cache and reduced
+    to its count, sum, maximum and histogram of distances per output time: the memory used does not depend on
+    the number of particles, and the chunks can be spread over a pool of processes (see compute), whose partial
+    results are merged. The percentiles are read from the merged histogram (see LogHistogram), whose bins are spaced
+    logarithmically from 1 mm to 100 000 km, which keeps them within 0.6% of the exact value.
+
+    As the mean over the particles of the previous versions, the statistics of a time are NaN when a particle has
+    no position (not seeded yet, or deactivated) in either simulation at that time.
+    """
+    EARTH_RADIUS_M = 6378137.0
+    CHUNK_PARTICLES = 65536
+    PERCENTILES = (50, 95)
+    HISTOGRAM = LogHistogram(-3, 8, 200)
+    # Arrays do cache abertos pelo processo, por arquivo
+    arrays = {}
+
+    @staticmethod
+    def haversine(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+        """
+        Great-circle distance (m), with the formula of TimestepEstimator.measure_distance, computed in place in the
+        precision of the positions (float32 in the result files).
+        """
+        lat1, lon1, lat2, lon2 = (np.radians(array) for array in (lat1, lon1, lat2, lon2))
+        a = np.sin((lat2 - lat1) / 2)
+        a *= a
+        b = np.sin((lon2 - lon1) / 2)
+        b *= b
+        b *= np.cos(lat1, out=lat1)
+        b *= np.cos(lat2, out=lat2)
+        a += b
+        c = np.sqrt(a)
+        np.arctan2(c, np.sqrt(1 - a, out=a), out=c)
+        c *= 2 * ErrorStatistics.EARTH_RADIUS_M
+        return c
+
+
+    @staticmethod
+    def open_array(fname: str) -> np.ndarray:
+        # Reaberto quando o cache de trajetórias é reescrito
+        stamp = os.stat(fname).st_mtime_ns
+        cached = ErrorStatistics.arrays.get(fname)
+        if cached is None or cached[0] != stamp:
+            cached = ErrorStatistics.arrays[fname] = (stamp, np.load(fname, mmap_mode="r"))
+        return cached[1]
+
+    @staticmethod
+    def chunk_statistics(args) -> tuple:
+        """
+        Reduces the distances of a chunk of particles between two simulations of the cache.
+
+        Args:
+            args (tuple): The lat and lon array files of the cache, the indices of the reference and current
+                simulations, and the first and last (excluded) particles of the chunk.
+
+        Returns:
+            tuple: The count, sum and maximum of the distances at each time, and their histogram (time x bin).
+        """
+        lat_fname, lon_fname, ref_idx, cur_idx, start, stop = args
+        lat, lon = ErrorStatistics.open_array(lat_fname), ErrorStatistics.open_array(lon_fname)
+        distances = ErrorStatistics.haversine(lat[ref_idx, start:stop], lon[ref_idx, start:stop], lat[cur_idx, start:stop], lon[cur_idx, start:stop])
+        valid = np.isfinite(distances)
+        nb_times, nb_bins = distances.shape[1], ErrorStatistics.HISTOGRAM.nb_bins
+        bins = ErrorStatistics.HISTOGRAM.bin_index(distances[valid])
+        times = np.broadcast_to(np.arange(nb_times), distances.shape)[valid]
+        histogram = np.bincount(times * nb_bins + bins, minlength=nb_times * nb_bins).reshape(nb_times, nb_bins)
+        distances[~valid] = 0.0
+        maximum = distances.max(axis=0, initial=0.0)
+        return valid.sum(axis=0), distances.sum(axis=0, dtype=np.float64), maximum.astype(np.float64), histogram
+
+    @staticmethod
+    def merge(parts: list, nb_particles: int) -> dict:
+        """
+        Merges the reductions of the chunks of `nb_particles` particles into the statistics at each time (NaN where
+        a particle has no position).
+
+        Returns:
+            dict: "mean", "max", and "p50", "p95"... (see PERCENTILES), arrays over the output times.
+        """
+        count = sum(part[0] for part in parts)
+        total = sum(part[1] for part in parts)
+        histogram = sum(part[3] for part in parts)
+        incomplete = count < nb_particles
+        with np.errstate(invalid="ignore", divide="ignore"):
+            statistics = {"mean": np.where(incomplete, np.nan, total / count), "max": np.where(incomplete, np.nan, np.max([part[2] for part in parts], axis=0))}
+        for q in ErrorStatistics.PERCENTILES:
+            statistics[f"p{q}"] = np.where(incomplete, np.nan, ErrorStatistics.HISTOGRAM.percentile(histogram, q))
+        return statistics
+
+
+    @staticmethod
+    def compute(lat_fname: str, lon_fname: str, ref_idx: int, cur_idx: int, pool=None) -> dict:
+        """
+        Returns the statistics of the distance between two simulations of a TrajectoryCache (see merge).
+
+        Args:
+            lat_fname, lon_fname (str): The lat and lon array files of the cache (TrajectoryCache.GetArrayFileName).
+            pool (multiprocessing.Pool): Pool over which the chunks are spread (in this process if None).
+        """
+        nb_particles = ErrorStatistics.open_array(lat_fname).shape[1]
+        chunks = [(lat_fname, lon_fname, ref_idx, cur_idx, start, min(start + ErrorStatistics.CHUNK_PARTICLES, nb_particles))
+                  for start in range(0, nb_particles, ErrorStatistics.CHUNK_PARTICLES)]
+        if pool is None or len(chunks) == 1:
+            return ErrorStatistics.merge([ErrorStatistics.chunk_statistics(chunk) for chunk in chunks], nb_particles)
+        return ErrorStatistics.merge(pool.map(ErrorStatistics.chunk_statistics, chunks), nb_particles)
+
+    @staticmethod
+    def compute_successive(lat_fname: str, lon_fname: str, valid: np.ndarray, pool=None) -> dict:
+        """
+        Returns the statistics (see merge) of each simulation of a TrajectoryCache against the previous one, by index,
+        when both are valid: as in the previous versions, a simulation whose shape doesn't match is skipped along
+        with the next one.
+
+        Args:
+            valid (np.ndarray): Whether each simulation of the cache is valid (TrajectoryCache.valid).
+        """
+        return {idx: ErrorStatistics.compute(lat_fname, lon_fname, idx - 1, idx, pool) for idx in range(1, len(valid)) if valid[idx - 1] and valid[idx]}
@@ -3,10 +3,16 @@
 #@date December 2025
 
 import os
-from datetime import datetime
-import copernicusmarine
-from omegaconf import DictConfig
-from exceptions.CustomExceptions import DownloadCurrentError, DownloadWindError
+import json
+import numpy as np
+import xarray as xr
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from omegaconf import DictConfig, OmegaConf
+from src.DownloadBackend import DownloadBackend
+from src.EnvironmentCatalog import EnvironmentCatalog
+from src.AnalysisStore import AnalysisStore
+from exceptions.CustomExceptions import DownloadEnvironmentDataError, DownloadCurrentError, DownloadWindError
 
 class Fetch:
     """
@@ -18,20 +24,55 @@ class Fetch:
           end_date_datetype (datetime): The final date for data fetching
           user (str): The login username
           pwd (str): The login password
+          backend (DownloadBackend): The source serving the data subsets (Copernicus Marine by default)
+          tile_months (int): Number of months per downloaded time tile (0 downloads the whole range at once)
+          download_workers (int): Maximum number of tiles downloaded concurrently
+          append_mode (bool): Whether new hours are appended to a rolling store of the domain instead of downloading each window under its own name
+          catalog (EnvironmentCatalog): The catalog of the environment files cached in the field directory
+          analysis_store (AnalysisStore): The chunked and compressed copy of the downloaded files, None when disabled
     """
-    def __init__ (self, cm_config_file : DictConfig, login_config_file : DictConfig):
+
+    # Datasets fetched for each kind of environment data
+    DATASETS = {
+      "current": {
+        "label"     : "correnteza",
+        "dataset_id": "cmems_mod_glo_phy_anfc_0.083deg_PT1H-m", #ID do banco de dados no site Copernicus Marine Data Store
+        "variables" : ["uo", "vo"],                             # Sub-conjunto de variáveis presentes nos dados relativos ao ID escolhido
+        "options"   : {},
+        "error"     : DownloadCurrentError,
+      },
+      "wind": {
+        "label"     : "vento",
+        "dataset_id": "cmems_obs-wind_glo_phy_my_l4_0.125deg_PT1H",
+        "variables" : ["eastward_wind", "northward_wind"],
+        "options"   : {"minimum_depth": 0, "maximum_depth": 10},
+        "error"     : DownloadWindError,
+      },
+    }
+
+    def __init__ (self, cm_config_file : DictConfig, login_config_file : DictConfig, backend : DownloadBackend = None, catalog : EnvironmentCatalog = None):
       """
       Initializes the Fetch class
     
       Attributes:
             cm_config_file (DictConfig): The Copernicus Marine configuration object
             login_config_file (DictConfig): The login configuration object
+            backend (DownloadBackend): The source of the data, chosen by the `local_sources` key of the configuration if None
+            catalog (EnvironmentCatalog): The catalog of the field directory, the one loaded by the process if None
         """
       self.cm_data = cm_config_file
       self.start_date_datetype = datetime.strptime(cm_config_file.start_date, "%Y-%m-%d")
       self.end_date_datetype = datetime.strptime(cm_config_file.end_date, "%Y-%m-%d")
       self.user = login_config_file.user
       self.pwd  = login_config_file.password
+      self.backend = backend if backend is not None else DownloadBackend.from_cfg(cm_config_file)
+      self.tile_months = cm_config_file.get("tile_months", 0)
+      self.download_workers = cm_config_file.get("download_workers", 1)
+      self.append_mode = cm_config_file.get("append_mode", False)
+      self.catalog = catalog if catalog is not None else EnvironmentCatalog.open(cm_config_file.field_directory, cm_config_file.get("cache_budget_gb", 0))
+      self.analysis_store = None
+      if cm_config_file.get("analysis_store", False):
+        self.analysis_store = AnalysisStore(cm_config_file.field_directory, cm_config_file.get("analysis_time_chunk", 6), cm_config_file.get("analysis_space_chunk", 64))
 
 
     def set_credentials(self, user: str, pwd: str):
@@ -39,87 +80,345 @@ class Fetch:
       self.pwd  = pwd
 
 
-    #Para baixar a correnteza
-    def DownloadCurrent (self):
-      print(f"Busca de dados de correnteza...\n")
-      try:
-        copernicusmarine.subset(
-        dataset_id="cmems_mod_glo_phy_anfc_0.083deg_PT1H-m", #ID do banco de dados no site Copernicus Marine Data Store, 
-        variables=["uo", "vo"],                              # Sub-conjunto de variáveis presentes nos dados relativos ao ID escolhido
-        username          = self.user,
-        password          = self.pwd,
-        minimum_longitude = self.cm_data.min_lon,
-        maximum_longitude = self.cm_data.max_lon,
-        minimum_latitude  = self.cm_data.min_lat,
-        maximum_latitude  = self.cm_data.max_lat,
-        start_datetime    = self.cm_data.start_date,
-        end_datetime      = self.cm_data.end_date,
-        output_filename   = self.GetCurrentFileName(False),
-        output_directory  = self.cm_data.field_directory
-        )
-      except Exception as e:
-        raise DownloadCurrentError("Failed to download current data") from e
- 
-    #Para baixar vento
-    def DownloadWind (self):
-      print(f"Busca de dados de vento...\n")
+    def set_backend(self, backend: DownloadBackend):
+      self.backend = backend
+
+
+    def Window (self, start : datetime, end : datetime, bbox : tuple):
+      """
+      Returns a Fetch over another spatiotemporal window (bbox being (min_lon, max_lon, min_lat, max_lat)),
+      sharing the credentials, backend, data directory and catalog of this one
+      """
+      cm_window = OmegaConf.merge(self.cm_data, {
+        "start_date": start.strftime("%Y-%m-%d"),
+        "end_date"  : end.strftime("%Y-%m-%d"),
+        "min_lon"   : bbox[0],
+        "max_lon"   : bbox[1],
+        "min_lat"   : bbox[2],
+        "max_lat"   : bbox[3],
+      })
+      return Fetch(cm_window, OmegaConf.create({"user": self.user, "password": self.pwd}), self.backend, self.catalog)
+
+
+    def Download (self, kind, start_datetime, end_datetime, output_filename, output_directory):
+      """
+      Downloads one kind ("current" or "wind") of environment data over the configured domain and the given time window
+      """
+      dataset = Fetch.DATASETS[kind]
       try:
-        copernicusmarine.subset(
-              dataset_id        = "cmems_obs-wind_glo_phy_my_l4_0.125deg_PT1H",
-              variables         = ["eastward_wind", "northward_wind"], # Sub-conjunto de variáveis presentes nos dados relativos ao ID escolhido
+        self.backend.subset(
+              dataset_id        = dataset["dataset_id"],
+              variables         = dataset["variables"],
               username          = self.user,
               password          = self.pwd,
               minimum_longitude = self.cm_data.min_lon,
               maximum_longitude = self.cm_data.max_lon,
               minimum_latitude  = self.cm_data.min_lat,
               maximum_latitude  = self.cm_data.max_lat,
-              start_datetime    = self.cm_data.start_date,
-              end_datetime      = self.cm_data.end_date,
-              minimum_depth     = 0,
-              maximum_depth     = 10,
-              output_filename   = self.GetWindFileName(False),
-              output_directory  = self.cm_data.field_directory
+              start_datetime    = start_datetime,
+              end_datetime      = end_datetime,
+              output_filename   = output_filename,
+              output_directory  = output_directory,
+              **dataset["options"]
         )
       except Exception as e:
-        raise DownloadWindError("Failed to download wind data") from e
+        raise dataset["error"](f"Failed to download {kind} data between {start_datetime} and {end_datetime}") from e
+
+    #Para baixar a correnteza
+    def DownloadCurrent (self):
+      print(f"Busca de dados de correnteza...\n")
+      self.Download("current", self.cm_data.start_date, self.cm_data.end_date, self.GetCurrentFileName(False), self.cm_data.field_directory)
+ 
+    #Para baixar vento
+    def DownloadWind (self):
+      print(f"Busca de dados de vento...\n")
+      self.Download("wind", self.cm_data.start_date, self.cm_data.end_date, self.GetWindFileName(False), self.cm_data.field_directory)
 
     def GetDatetimeStr (self,dt):
       return f"({dt.year}-{dt.month}-{dt.day}-{dt.hour}-{dt.minute}-{dt.second})"
     
-    def GetDomainStr (self):
-      return f"({int(self.cm_data.min_lon)},{int(self.cm_data.max_lon)},{int(self.cm_data.min_lat)},{int(self.cm_data.max_lat)})"
+    def GetDomainStr (self, legacy = False):
+      if legacy:
+        # Nome das versões anteriores, com os limites truncados ao grau
+        return f"({int(self.cm_data.min_lon)},{int(self.cm_data.max_lon)},{int(self.cm_data.min_lat)},{int(self.cm_data.max_lat)})"
+      # Bounding box exata (ao milésimo de grau): dois domínios diferentes não compartilham arquivos, tiles nem store
+      return "(" + ",".join(f"{round(float(x), 3):g}" for x in self.GetBBox()) + ")"
+
+    def GetBBox (self):
+      return (self.cm_data.min_lon, self.cm_data.max_lon, self.cm_data.min_lat, self.cm_data.max_lat)
 
-    def GetSpatiotemporalStr (self):
-      return f"{self.GetDatetimeStr(self.start_date_datetype)}{self.GetDatetimeStr(self.end_date_datetype)}{self.GetDomainStr()}"
+    def GetSpatiotemporalStr (self, legacy = False):
+      return f"{self.GetDatetimeStr(self.start_date_datetype)}{self.GetDatetimeStr(self.end_date_datetype)}{self.GetDomainStr(legacy)}"
 
-    def GetCurrentFileName (self, with_folder = True):
-      fname = f"current_{self.GetSpatiotemporalStr()}.nc" 
+    def GetCurrentFileName (self, with_folder = True, legacy = False):
+      fname = f"current_{self.GetSpatiotemporalStr(legacy)}.nc" 
       if with_folder:
         fname = os.path.join(self.cm_data.field_directory, fname)
       return fname
 
-    def GetWindFileName (self, with_folder = True):
-      fname = f"wind_{self.GetSpatiotemporalStr()}.nc"
+    def GetWindFileName (self, with_folder = True, legacy = False):
+      fname = f"wind_{self.GetSpatiotemporalStr(legacy)}.nc"
       if with_folder:
         fname = os.path.join(self.cm_data.field_directory, fname)
       return fname
 
 
+    ############## TIME TILES ##############
+
+    def GetTimeTiles (self, start = None, end = None):
+      """
+      Splits a date range (the configured one by default) into consecutive tiles aligned on calendar months.
+      Both bounds of a tile are inclusive, so a tile stops one hour before the next one starts.
+      """
+      start = start if start is not None else self.start_date_datetype
+      end = end if end is not None else self.end_date_datetype
+      if self.tile_months <= 0:
+        return [(start, end)]
+      tiles = []
+      tile_start = start
+      while tile_start < end:
+        month_index = tile_start.month - 1 + self.tile_months
+        next_start = datetime(tile_start.year + month_index // 12, month_index % 12 + 1, 1)
+        tiles.append((tile_start, min(next_start - timedelta(hours=1), end)))
+        tile_start = next_start
+      if not tiles:
+        tiles.append((start, end))
+      return tiles
+
+    def GetTileFolder (self, kind):
+      return os.path.join(self.cm_data.field_directory, f"{kind}_{self.GetSpatiotemporalStr()}")
+
+    def GetTileFileName (self, kind, tile_start, tile_end, folder = None):
+      folder = folder if folder is not None else self.GetTileFolder(kind)
+      return os.path.join(folder, f"{kind}_{self.GetDatetimeStr(tile_start)}{self.GetDatetimeStr(tile_end)}.nc")
+
+    @staticmethod
+    def GetTileMarker (tile_fname):
+      return tile_fname + ".done"
+
+    @staticmethod
+    def IsTileComplete (tile_fname):
+      return os.path.exists(tile_fname) and os.path.exists(Fetch.GetTileMarker(tile_fname))
+
+    @staticmethod
+    def ReadTileMarker (tile_fname):
+      """
+      Returns the time range actually contained in a completed tile, as recorded in its marker.
+      """
+      with open(Fetch.GetTileMarker(tile_fname), "r") as marker:
+        content = json.load(marker)
+      return datetime.fromisoformat(content["first_time"]), datetime.fromisoformat(content["last_time"])
+
+    def DownloadTile (self, kind, tile_start, tile_end, tile_fname):
+      """
+      Downloads a single tile into a temporary file, then moves it to its final name and writes its completion marker,
+      which records the time range actually present in the file.
+      An interrupted download therefore never leaves a tile that looks complete.
+      """
+      folder, fname = os.path.split(tile_fname)
+      partial_fname = fname.replace(".nc", ".part.nc")
+      if os.path.exists(os.path.join(folder, partial_fname)):
+        os.remove(os.path.join(folder, partial_fname))
+      print(f"     Busca de dados de {Fetch.DATASETS[kind]['label']} entre {tile_start} e {tile_end}...")
+      self.Download(kind, tile_start, tile_end, partial_fname, folder)
+      with DownloadBackend.NETCDF_LOCK, xr.open_dataset(os.path.join(folder, partial_fname)) as ds:
+        times = ds["time"].values
+        first_time, last_time = (str(np.datetime_as_string(t, unit="s")) for t in (times.min(), times.max()))
+      os.replace(os.path.join(folder, partial_fname), tile_fname)
+      with open(Fetch.GetTileMarker(tile_fname), "w") as marker:
+        json.dump({"completed": datetime.now().isoformat(), "first_time": first_time, "last_time": last_time}, marker)
+      return tile_fname
+
+    def run_tile_downloads (self, tiles):
+      """
+      Downloads the given (kind, tile_start, tile_end, tile_fname) tiles with a bounded pool of workers.
+      The tiles that fail are reported together once the others are completed.
+      """
+      failures = []
+      with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+        futures = {executor.submit(self.DownloadTile, *tile): tile for tile in tiles}
+        for future in as_completed(futures):
+          try:
+            future.result()
+          except DownloadEnvironmentDataError as e:
+            failures.append(e)
+
+      if failures:
+        error_types = {type(e) for e in failures}
+        error_type = error_types.pop() if len(error_types) == 1 else DownloadEnvironmentDataError
+        raise error_type(f"{len(failures)}/{len(tiles)} tiles failed to download (completed tiles are kept): " + "; ".join(str(e) for e in failures)) from failures[0]
+      print(f"     Todos os tiles foram baixados com sucesso.\n")
+
+    def download_tiles (self, kinds = None):
+      """
+      Downloads the missing tiles of the given kinds of data (current and wind by default).
+      Tiles already completed by a previous (possibly interrupted) call are skipped.
+      """
+      missing_tiles = []
+      nb_tiles = 0
+      for kind in (kinds if kinds is not None else Fetch.DATASETS):
+        os.makedirs(self.GetTileFolder(kind), exist_ok=True)
+        for tile_start, tile_end in self.GetTimeTiles():
+          nb_tiles += 1
+          tile_fname = self.GetTileFileName(kind, tile_start, tile_end)
+          if not Fetch.IsTileComplete(tile_fname):
+            missing_tiles.append((kind, tile_start, tile_end, tile_fname))
+
+      if not missing_tiles:
+        return
+      print(f"     {nb_tiles - len(missing_tiles)}/{nb_tiles} tiles já presentes no diretório {self.cm_data.field_directory}. Downloading {len(missing_tiles)} tiles com {self.download_workers} workers...")
+      self.run_tile_downloads(missing_tiles)
+
+
+    ############## APPEND MODE ##############
+
+    def GetRollingFolder (self, kind):
+      """
+      The rolling store of a kind of data only depends on the domain: every update appends its new hours to it.
+      """
+      return os.path.join(self.cm_data.field_directory, f"{kind}_rolling{self.GetDomainStr()}")
+
+    def GetRollingFiles (self, kind):
+      folder = self.GetRollingFolder(kind)
+      if not os.path.isdir(folder):
+        return []
+      fnames = [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".nc") and not f.endswith(".part.nc")]
+      return sorted((f for f in fnames if Fetch.IsTileComplete(f)), key=lambda f: Fetch.ReadTileMarker(f)[0])
+
+    def GetRollingCoverage (self, kind):
+      """
+      Returns the (first, last) timestamps stored in the rolling store, or None if it is empty.
+      """
+      time_ranges = [Fetch.ReadTileMarker(f) for f in self.GetRollingFiles(kind)]
+      if not time_ranges:
+        return None
+      return min(r[0] for r in time_ranges), max(r[1] for r in time_ranges)
+
+    def download_deltas (self, kinds = None):
+      """
+      Detects the timestamps already in the rolling store and downloads only the missing hours before and after them,
+      appending them as new chunks to the store. Previously downloaded chunks are kept unchanged.
+      """
+      missing_tiles = []
+      for kind in (kinds if kinds is not None else Fetch.DATASETS):
+        folder = self.GetRollingFolder(kind)
+        os.makedirs(folder, exist_ok=True)
+        coverage = self.GetRollingCoverage(kind)
+        if coverage is None:
+          windows = [(self.start_date_datetype, self.end_date_datetype)]
+        else:
+          first_time, last_time = coverage
+          print(f"     Dados de {Fetch.DATASETS[kind]['label']} presentes no store de {first_time} a {last_time}.")
+          windows = []
+          if self.start_date_datetype < first_time:
+            windows.append((self.start_date_datetype, first_time - timedelta(hours=1)))
+          if self.end_date_datetype > last_time:
+            windows.append((last_time + timedelta(hours=1), self.end_date_datetype))
+        for window_start, window_end in windows:
+          for tile_start, tile_end in self.GetTimeTiles(window_start, window_end):
+            missing_tiles.append((kind, tile_start, tile_end, self.GetTileFileName(kind, tile_start, tile_end, folder)))
+
+      if not missing_tiles:
+        return
+      print(f"     Downloading {len(missing_tiles)} novo(s) trecho(s) com {self.download_workers} workers...")
+      self.run_tile_downloads(missing_tiles)
+
+    def GetOwnSource (self, kind):
+      """
+      Returns the file, or the list of tiles, downloaded for exactly the configured spatiotemporal domain
+      (or the chunks of the rolling store covering it in append mode).
+      Returns None when the data is not (completely) on disk.
+      """
+      if self.append_mode:
+        coverage = self.GetRollingCoverage(kind)
+        if coverage is None or coverage[0] > self.start_date_datetype or coverage[1] < self.end_date_datetype:
+          return None
+        return self.GetRollingFiles(kind)
+      if self.tile_months <= 0:
+        fname = self.GetCurrentFileName() if kind == "current" else self.GetWindFileName()
+        if not os.path.exists(fname):
+          # Arquivo baixado por uma versão anterior, cujo nome trunca a bounding box ao grau
+          fname = self.GetCurrentFileName(legacy=True) if kind == "current" else self.GetWindFileName(legacy=True)
+        return fname if os.path.exists(fname) else None
+      tile_fnames = [self.GetTileFileName(kind, tile_start, tile_end) for tile_start, tile_end in self.GetTimeTiles()]
+      if not all(Fetch.IsTileComplete(tile_fname) for tile_fname in tile_fnames):
+        return None
+      return tile_fnames
+
+    def GetSource (self, kind):
+      """
+      Returns what an Opendrift reader should open for the given kind of data: the files downloaded for the configured
+      domain or, failing that, the cached files of a larger domain covering it. Opendrift readers only load the blocks
+      they need, so a larger file is subset lazily. Returns None when no file on disk covers the domain.
+      """
+      own_source = self.GetOwnSource(kind)
+      if own_source is not None:
+        return own_source
+      entry = self.catalog.find_covering(kind, self.GetBBox(), self.start_date_datetype, self.end_date_datetype)
+      if entry is None:
+        return None
+      fnames = self.catalog.abspaths(entry)
+      return fnames[0] if len(fnames) == 1 else fnames
+
+    def GetCurrentSource (self):
+      return self.GetSource("current")
+
+    def GetWindSource (self):
+      return self.GetSource("wind")
+
+
     def download_data(self):
-      current_fname = self.GetCurrentFileName(with_folder = True)
-      wind_fname    = self.GetWindFileName(with_folder = True)
+      self.catalog.scan()
+      bbox = self.GetBBox()
 
-      #Caso a correnteza para este dominio espaço-temporal não exista no diretório, vai buscar no site Copernicus os dados associados e salvá-los
-      if not os.path.exists(current_fname):
-          print(f"     Dados de correnteza não encontrados no diretório {self.cm_data.field_directory}. Downloading...")
-          self.DownloadCurrent()
+      missing_kinds = []
+      for kind, dataset in Fetch.DATASETS.items():
+        #Caso os dados para este dominio espaço-temporal não existam no diretório, vai buscar no site Copernicus os dados associados e salvá-los
+        if self.GetOwnSource(kind) is not None:
+          print(f"     Dados de {dataset['label']} já presentes no diretório {self.cm_data.field_directory}")
+          continue
+        entry = self.catalog.find_covering(kind, bbox, self.start_date_datetype, self.end_date_datetype)
+        if entry is not None:
+          print(f"     Dados de {dataset['label']} servidos pelo cache: {entry['files'][0]} cobre o domínio espaço-temporal pedido")
+        else:
+          print(f"     Dados de {dataset['label']} não encontrados no diretório {self.cm_data.field_directory}. Downloading...")
+          missing_kinds.append(kind)
+
+      if self.append_mode:
+        self.download_deltas(missing_kinds)
+      elif self.tile_months > 0:
+        self.download_tiles(missing_kinds)
       else:
-          print(f"     Dados de correnteza já presentes no diretório {self.cm_data.field_directory}")
+        if "current" in missing_kinds:
+          self.DownloadCurrent()
+        if "wind" in missing_kinds:
+          self.DownloadWind()
 
+      # Registra os dados baixados no catálogo e libera espaço em disco se necessário
+      keep = []
+      for kind, dataset in Fetch.DATASETS.items():
+        own_source = self.GetOwnSource(kind)
+        if own_source is not None:
+          fnames = own_source if isinstance(own_source, list) else [own_source]
+          entry = self.catalog.find_by_files(fnames)
+          if entry is None:
+            first_time, last_time = self.GetRollingCoverage(kind) if self.append_mode else (self.start_date_datetype, self.end_date_datetype)
+            entry = self.catalog.register(kind, fnames, dataset["variables"], bbox, first_time, last_time)
+          keep.append(entry)
+        keep.append(self.catalog.find_covering(kind, bbox, self.start_date_datetype, self.end_date_datetype, touch=True))
+      self.catalog.evict(keep)
 
-      #Caso o vento para este dominio espaço-temporal não exista no diretório
-      if not os.path.exists(wind_fname):
-          print(f"     Dados de vento não encontrados no diretório {self.cm_data.field_directory}.  Downloading...\n")
-          self.DownloadWind()
-      else:
-          print(f"     Dados de vento já presentes no diretório {self.cm_data.field_directory}\n")
\ No newline at end of file
+      # Etapa opcional: reescreve os dados em um store chunked por tempo e espaço para a leitura pelas simulações
+      if self.analysis_store is not None:
+        for kind in Fetch.DATASETS:
+          self.analysis_store.convert(self.GetSource(kind))
+      print("")
+
+
+    def download_plan(self, pieces):
+      """
+      Downloads only the pieces (start, end, bbox) planned by a DownloadPlanner instead of the whole configured window.
+      """
+      for idx, (start, end, bbox) in enumerate(pieces):
+        print(f"     Janela {idx+1}/{len(pieces)}: {start.strftime('%Y-%m-%d')} -> {end.strftime('%Y-%m-%d')}")
+        self.Window(start, end, bbox).download_data()
@@ -0,0 +1,166 @@
+#@brief Fast animation of a simulation result: particles rasterized with NumPy over cached background frames
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import xarray as xr
+from matplotlib import colormaps
+from PIL import Image, ImageDraw
+
+
+class FrameRenderer:
+    """
+    Renders the animation of an Opendrift result file without matplotlib: the current speed under the frame of
+    gif_frame_config is resampled onto a fixed image grid and colored with a lookup table, the elements are
+    rasterized onto it with NumPy, and the frames are encoded straight to GIF or WebP with Pillow.
+
+    The background frames only depend on the reader, the output time and the frame, so they are computed once
+    per worker and reused by all the simulations sharing a date window (see background_cache). Land, where the
+    current field is masked, and the part of the frame outside the domain of the reader are drawn in gray.
+
+    Attributes:
+        corners (tuple): (min_lon, max_lon, min_lat, max_lat) of the frame.
+        width (int): Width of the frames (px). The height follows the aspect ratio of the frame at its mean latitude.
+        vmax (float): Current speed (m/s) of the last color of the colormap.
+        marker_size (int): Side (px) of the square drawn for each element.
+    """
+    VARIABLES = ["x_sea_water_velocity", "y_sea_water_velocity"]
+    LAND_COLOR = (190, 190, 190)
+    ACTIVE_COLOR = (0, 0, 0)
+    DEACTIVATED_COLOR = (220, 30, 30)
+    # Frames de fundo já calculados pelo processo, por (reader, instante, quadro)
+    background_cache = OrderedDict()
+    MAX_CACHED_FRAMES = 256
+
+    def __init__(self, corners: tuple, width: int = 600, cmap: str = "Blues", vmax: float = 1.0, marker_size: int = 2):
+        self.corners = tuple(float(corner) for corner in corners)
+        min_lon, max_lon, min_lat, max_lat = self.corners
+        self.width = width
+        self.height = max(int(round(width * (max_lat - min_lat) / ((max_lon - min_lon) * np.cos(np.radians((min_lat + max_lat) / 2))))), 1)
+        self.cmap = cmap
+        self.vmax = vmax
+        self.marker_size = marker_size
+        self.lut = (colormaps[cmap](np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+        # Centro dos pixels, a primeira linha ao norte
+        self.pixel_lons = min_lon + (np.arange(self.width) + 0.5) * (max_lon - min_lon) / self.width
+        self.pixel_lats = max_lat - (np.arange(self.height) + 0.5) * (max_lat - min_lat) / self.height
+
+    @classmethod
+    def from_config(cls, gif_config, animation_cfg):
+        """
+        Builds the renderer of the frame of gif_frame_config, with the settings of the animation section of main.yaml.
+        """
+        return cls((gif_config.min_lon, gif_config.max_lon, gif_config.min_lat, gif_config.max_lat),
+                   animation_cfg.get("frame_width", 600), animation_cfg.get("cmap", "Blues"),
+                   animation_cfg.get("vmax", 1.0), animation_cfg.get("marker_size", 2))
+
+
+    @staticmethod
+    def nearest_indices(axis: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the index of the nearest point of `axis` for each of `values` (-1 outside the axis).
+        """
+        order = np.argsort(axis)
+        sorted_axis = axis[order]
+        idx = np.clip(np.searchsorted(sorted_axis, values), 1, len(axis) - 1)
+        idx -= (values - sorted_axis[idx - 1]) < (sorted_axis[idx] - values)
+        nearest = order[idx]
+        nearest[(values < sorted_axis[0]) | (values > sorted_axis[-1])] = -1
+        return nearest
+
+    def background(self, reader, time) -> np.ndarray:
+        """
+        Returns the background frame (height x width x 3, uint8) of the current speed of `reader` at `time`.
+        """
+        key = (reader.name, time, self.corners, self.width, self.cmap, self.vmax)
+        frame = FrameRenderer.background_cache.get(key)
+        if frame is not None:
+            FrameRenderer.background_cache.move_to_end(key)
+            return frame
+
+        lons, lats = np.meshgrid(self.pixel_lons, self.pixel_lats)
+        x, y = reader.lonlat2xy(lons.ravel(), lats.ravel())
+        # O quadro pode ultrapassar o domínio do reader: só a parte coberta é pedida, o resto fica como terra
+        x_range = np.array([max(x.min(), reader.xmin), min(x.max(), reader.xmax)])
+        y_range = np.array([max(y.min(), reader.ymin), min(y.max(), reader.ymax)])
+        speed = np.full(x.shape, np.nan)
+        if x_range[0] <= x_range[1] and y_range[0] <= y_range[1]:
+            data = reader.get_variables(FrameRenderer.VARIABLES, time, x_range, y_range, None)
+            ix = FrameRenderer.nearest_indices(np.asarray(data["x"], dtype=float), x)
+            iy = FrameRenderer.nearest_indices(np.asarray(data["y"], dtype=float), y)
+            # Campos com profundidade: só a superfície
+            u = np.ma.filled(np.ma.asarray(data[FrameRenderer.VARIABLES[0]], dtype=float), np.nan).reshape(-1, len(data["y"]), len(data["x"]))[0]
+            v = np.ma.filled(np.ma.asarray(data[FrameRenderer.VARIABLES[1]], dtype=float), np.nan).reshape(-1, len(data["y"]), len(data["x"]))[0]
+            inside = (ix >= 0) & (iy >= 0)
+            speed[inside] = np.hypot(u[iy[inside], ix[inside]], v[iy[inside], ix[inside]])
+        land = ~np.isfinite(speed)
+        levels = np.clip(np.nan_to_num(speed) / self.vmax * 255, 0, 255).astype(np.uint8)
+        frame = self.lut[levels]
+        frame[land] = FrameRenderer.LAND_COLOR
+        frame = frame.reshape(self.height, self.width, 3)
+        frame.flags.writeable = False
+
+        FrameRenderer.background_cache[key] = frame
+        if len(FrameRenderer.background_cache) > FrameRenderer.MAX_CACHED_FRAMES:
+            FrameRenderer.background_cache.popitem(last=False)
+        return frame
+
+
+    def draw_elements(self, frame: np.ndarray, lon: np.ndarray, lat: np.ndarray, color: tuple):
+        """
+        Draws a square of marker_size pixels at each position, in place.
+        """
+        min_lon, max_lon, min_lat, max_lat = self.corners
+        cols = np.floor((lon - min_lon) / (max_lon - min_lon) * self.width).astype(int)
+        rows = np.floor((max_lat - lat) / (max_lat - min_lat) * self.height).astype(int)
+        offsets = np.arange(self.marker_size) - self.marker_size // 2
+        rows = (rows[:, None, None] + offsets[None, :, None]).repeat(self.marker_size, axis=2).ravel()
+        cols = (cols[:, None, None] + offsets[None, None, :]).repeat(self.marker_size, axis=1).ravel()
+        inside = (rows >= 0) & (rows < self.height) & (cols >= 0) & (cols < self.width)
+        frame[rows[inside], cols[inside]] = color
+
+    @staticmethod
+    def load_positions(result_fname: str) -> tuple:
+        """
+        Returns the output times, and the positions and activity of the elements at each of them: a deactivated
+        element stays at its last position, as in the Opendrift animations.
+
+        Returns:
+            tuple: The times, the longitudes and latitudes (elements x times) and the masks of the active and
+                deactivated elements (elements x times).
+        """
+        with xr.open_dataset(result_fname) as ds:
+            times = pd.to_datetime(ds.time.values).to_pydatetime()
+            lon = ds.lon.values.astype(float)
+            lat = ds.lat.values.astype(float)
+        valid = np.isfinite(lon) & np.isfinite(lat)
+        # Índice da última posição válida de cada elemento em cada instante
+        last_valid = np.maximum.accumulate(np.where(valid, np.arange(lon.shape[1]), 0), axis=1)
+        rows = np.arange(lon.shape[0])[:, None]
+        seeded = np.cumsum(valid, axis=1) > 0
+        return times, lon[rows, last_valid], lat[rows, last_valid], valid, seeded & ~valid
+
+
+    def render_frames(self, result_fname: str, reader) -> list:
+        """
+        Returns the frames (PIL images) of the animation of a result file, over the current speed of `reader`.
+        """
+        times, lon, lat, active, deactivated = FrameRenderer.load_positions(result_fname)
+        frames = []
+        for i, time in enumerate(times):
+            frame = self.background(reader, time).copy()
+            self.draw_elements(frame, lon[deactivated[:, i], i], lat[deactivated[:, i], i], FrameRenderer.DEACTIVATED_COLOR)
+            self.draw_elements(frame, lon[active[:, i], i], lat[active[:, i], i], FrameRenderer.ACTIVE_COLOR)
+            image = Image.fromarray(frame)
+            ImageDraw.Draw(image).text((4, 4), time.strftime("%Y-%m-%d %H:%M UTC"), fill=(0, 0, 0))
+            frames.append(image)
+        return frames
+
+    def render(self, result_fname: str, reader, animation_fname: str, fps: int = 6):
+        """
+        Writes the animation of a result file to `animation_fname`, as GIF or WebP according to its extension.
+        """
+        frames = self.render_frames(result_fname, reader)
+        frames[0].save(animation_fname, save_all=True, append_images=frames[1:], duration=int(1000 / fps), loop=0)
@@ -5,8 +5,24 @@
 from hydra import initialize, compose
 from omegaconf import OmegaConf
 import os
+import sys
+import json
+import time
+import numpy as np
+import subprocess
 from src.RunASimulation import RunASimulation
 from src.Fetch import Fetch
+from src.ReaderCache import ReaderCache
+from src.DownloadPlanner import DownloadPlanner
+from src.SharedEnvironment import SharedEnvironment
+from src.CompletionJournal import CompletionJournal
+from src.TaskScheduler import TaskScheduler
+from src.SimTask import SimTask
+from src.JobQueue import JobQueue
+from src.TaskGuard import TaskGuard
+from src.SimulationMetrics import SimulationMetrics
+from src.Tracer import Tracer
+from src.ConfigList import ConfigList
 from tqdm import tqdm
 from multiprocessing import Pool
 from abc import abstractmethod
@@ -18,8 +34,8 @@ class GeneralSimulationGeneration:
 
     Attributes:
         config_folder (str): The name of the folder containing all YAML configuration files.
-        configlist_file (str): The name of the YAML configuration file (including  .yaml extension)
-            that lists the parameters for each simulation.
+        configlist_file (str): The name of the file (including its .csv or .yaml extension) that lists
+            the parameters for each simulation (see ConfigList).
         principal_cfg (DictConfig): The main configuration object, which provides paths and
             general simulation information.
         gif_cfg (DictConfig): The configuration object for animation output of Opendrift runs.
@@ -28,6 +44,9 @@ class GeneralSimulationGeneration:
         login_cfg (DictConfig): The login configuration object.
         cm_cfg (DictConfig): The Copernicus Marine configuration object.
     """
+    # Contexto do sweep salvo na pasta de resultados (ver save_sweep_context)
+    SWEEP_CONTEXT_FNAME = "sweep.json"
+
     def __init__ (self, config_folder: str, reference_config_file: str, configlist_file: str):
         """
         Initializes the simulation generator by loading the required YAML configurations.
@@ -37,7 +56,7 @@ class GeneralSimulationGeneration:
             reference_config_file (str): The name of the YAML configuration file (without
                 extension) that identifies the reference configuration used to build
                 `param_cfg`.
-            configlist_file (str): The YAML filename (including .yaml extension) that lists the
+            configlist_file (str): The filename (including its .csv or .yaml extension) that lists the
                 simulation parameters to be generated.
             
         """
@@ -49,8 +68,10 @@ class GeneralSimulationGeneration:
         if not os.path.exists(verifpath):
             raise MainConfigFileNotFound(f"Main configuration file not found in {config_folder}")
         
+        start = Tracer.now_us()
         with initialize(config_path=self.config_folder, version_base=None):
             self.principal_cfg = compose(config_name="main")
+            Tracer.configure(self.principal_cfg.get("profiling", {}))
 
             verifpath = os.path.join(config_folder, self.principal_cfg.configs.gif_config + ".yaml")
             print(verifpath)
@@ -73,6 +94,13 @@ class GeneralSimulationGeneration:
             if not os.path.exists(verifpath):
                 raise CredentialsConfigFileNotFound(f"Copernicus Marine data information configuration file not found in {config_folder}")
             self.cm_cfg = compose(config_name=self.principal_cfg.configs.cm_config)
+        Tracer.record("config composition", start)
+
+        # Uma lista YAML de mesmo nome, escrita por uma versão anterior, é usada no lugar da tabela ausente
+        configlist_path = os.path.join(self.principal_cfg.paths.list_sim_configs_location, configlist_file)
+        if ConfigList.existing(configlist_path) != configlist_path:
+            self.configlist_file = os.path.basename(ConfigList.existing(configlist_path))
+            print(f"A lista de configurações '{configlist_file}' não existe: a lista YAML existente '{self.configlist_file}' é usada no seu lugar.")
 
     
 
@@ -121,60 +149,492 @@ class GeneralSimulationGeneration:
 
 
     @staticmethod
-    def warp_simulate(args):
+    def warp_simulate(cfg):
         """
-        Executes a single simulation (typically used inside a multiprocessing worker).
+        Executes a single simulation (typically used inside a multiprocessing worker). The simulator and the
+        verbose and rk4 flags are the worker context, set once per worker by RunASimulation.init_worker.
 
         Args:
-            args (tuple): A tuple containing:
-                - Simulator: an instance of the simulator class
-                - cfg: the configuration file or object to use
-                - verbose (bool): whether to enable verbose output
-                - rk4 (bool): whether to use the RK4 integration scheme
+            cfg (SimTask): The parameters of the simulation.
         """
-        Simulator, cfg, verbose, rk4 = args
+        Simulator, verbose, rk4 = RunASimulation.worker_context
         Simulator.set_sim_config_file(cfg)
-        Simulator.run_simulation(verbose, rk4)
-        
+        journal = CompletionJournal(Simulator.result_path)
+        start = time.perf_counter()
+        try:
+            with Tracer.span("simulation", "simulation", simulation_id=cfg.simulation_id), Tracer.profile([cfg.simulation_id]):
+                stats = Simulator.run_simulation(verbose, rk4)
+        except Exception as e:
+            journal.record_failure(cfg.simulation_id, time.perf_counter() - start, e)
+            raise
+        journal.record_success(cfg.simulation_id, Simulator.GetRawResultPath(cfg.simulation_id), time.perf_counter() - start, stats)
+        return stats
+
 
-    def generate_simulations(self, number_of_workers: int, verbose: bool, rk4flag: bool, overwrite: bool):
+    @staticmethod
+    def warp_simulate_batch(cfgs):
         """
-        Executes all simulations using multiprocessing.
+        Executes a batch of simulations sharing their dates and domain in a single Opendrift run.
 
         Args:
-            number_of_workers (int): Number of worker processes to use.
-            verbose (bool): Whether to enable verbose output for each simulation.
-            rk4flag (bool): Whether to use the RK4 integration scheme.
+            cfgs (list): The SimTask of the simulations of the batch.
+        """
+        Simulator, verbose, rk4 = RunASimulation.worker_context
+        journal = CompletionJournal(Simulator.result_path)
+        start = time.perf_counter()
+        simulation_ids = [cfg.simulation_id for cfg in cfgs]
+        try:
+            with Tracer.span("batch", "simulation", simulation_ids=simulation_ids), Tracer.profile(simulation_ids):
+                stats = Simulator.run_batch(cfgs, verbose, rk4)
+        except Exception as e:
+            for cfg in cfgs:
+                journal.record_failure(cfg.simulation_id, (time.perf_counter() - start) / len(cfgs), e)
+            raise
+        for cfg, sim_stats in zip(cfgs, stats):
+            journal.record_success(cfg.simulation_id, Simulator.GetRawResultPath(cfg.simulation_id), (time.perf_counter() - start) / len(cfgs), sim_stats)
+        return stats
+
+
+    @staticmethod
+    def warp_simulate_chunk(args):
+        """
+        Executes a chunk of tasks in a row inside a worker.
+
+        Args:
+            args (tuple): The task function (warp_simulate or warp_simulate_batch), the list of its tasks, the time
+                limit (s) of each task, the number of retries of a failing task, and the shared dict and key of
+                the chunk recording which worker runs it (see TaskGuard).
+
+        Returns:
+            tuple: The results of the successful tasks, the failure records of the others and the (worker pid, start, end) timing of the chunk.
+        """
+        simulate, chunk, timeout_s, max_retries, started, key = args
+        TaskGuard.mark_started(started, key)
+        start = time.time()
+        results, failures = [], []
+        for task in chunk:
+            result, failure = TaskGuard.run(simulate, task, timeout_s, max_retries)
+            Tracer.flush()
+            if failure is None:
+                results.append(result)
+            else:
+                failures.append(failure)
+        return results, failures, (os.getpid(), start, time.time())
+
+
+    @staticmethod
+    def warp_render(cfg):
+        """
+        Renders the animation of a completed simulation inside a worker of the animation pool.
+
+        Returns:
+            tuple: The simulation_id, the rendering time (s) (None if it failed) and the error message (None if it succeeded).
+        """
+        Simulator, verbose, _ = RunASimulation.worker_context
+        Simulator.set_sim_config_file(cfg)
+        try:
+            return cfg.simulation_id, Simulator.render_animation(verbose), None
+        except Exception as e:
+            return cfg.simulation_id, None, f"{type(e).__name__}: {e}"
+        finally:
+            Tracer.flush()
+
+
+    @staticmethod
+    def make_batches(sim_list, batch_size: int) -> list:
+        """
+        Groups the simulations that only differ by their spill (same RunASimulation.batch_key), in batches of
+        at most `batch_size` simulations (0 for no limit).
+        """
+        groups = {}
+        for cfg in sim_list:
+            groups.setdefault(RunASimulation.batch_key(cfg), []).append(cfg)
+        batches = []
+        for group in groups.values():
+            size = batch_size if batch_size > 0 else len(group)
+            batches.extend(group[i:i+size] for i in range(0, len(group), size))
+        return batches
+
+
+    @staticmethod
+    def share_environment(windows: list) -> list:
+        """
+        Loads once into shared memory the environment fields of the data windows, so that the pool workers
+        read them without each one keeping its own copy.
+
+        Args:
+            windows (list): The Fetch objects of the downloaded data windows.
+
+        Returns:
+            list: The (source, opener, SharedEnvironment) of each distinct source.
+        """
+        extents = {}
+        for F in windows:
+            current_source, wind_source, opener = RunASimulation.reader_sources(F)
+            for source in (current_source, wind_source):
+                if source is None:
+                    continue
+                key = ReaderCache.key(source, opener)
+                start, end, bbox = F.start_date_datetype, F.end_date_datetype, F.GetBBox()
+                if key in extents:
+                    _, _, last_start, last_end, last_bbox = extents[key]
+                    start, end, bbox = min(start, last_start), max(end, last_end), DownloadPlanner.union_bbox(bbox, last_bbox)
+                extents[key] = (source, opener, start, end, bbox)
+
+        shared_envs = [(source, opener, SharedEnvironment(source, bbox, start, end)) for source, opener, start, end, bbox in extents.values()]
+        total_size = sum(env.nbytes() for _, _, env in shared_envs)
+        print(f"     Campos ambientais compartilhados entre os workers: {total_size/1e6:.1f} MB em memória compartilhada.")
+        return shared_envs
+
+
+    def sweep_context(self, verbose: bool, rk4flag: bool) -> dict:
+        """
+        Returns what another process needs to rebuild this sweep (see from_context): configuration folder and
+        files, results folder, flags and tracing settings.
+        """
+        return {
+            "config_folder"        : self.config_folder.removeprefix("../"),
+            "reference_config_file": self.principal_cfg.configs.base_sim_config,
+            "configlist_file"      : self.configlist_file,
+            "result_path"          : self.principal_cfg.paths.sim_results_location,
+            "verbose"              : verbose,
+            "rk4"                  : rk4flag,
+            "profiling"            : Tracer.settings(),
+        }
+
+    @classmethod
+    def from_context(cls, context: dict):
+        G = cls(context["config_folder"], context["reference_config_file"], context["configlist_file"])
+        G.principal_cfg.paths.sim_results_location = context["result_path"]
+        return G
+
+    def save_sweep_context(self, verbose: bool, rk4flag: bool):
+        """
+        Writes the context of the sweep in the results folder, to render its animations later (see render_animations.py).
         """
         results_relpath = self.principal_cfg.paths.sim_results_location
+        os.makedirs(results_relpath, exist_ok=True)
+        with open(os.path.join(results_relpath, GeneralSimulationGeneration.SWEEP_CONTEXT_FNAME), "w") as f:
+            json.dump(self.sweep_context(verbose, rk4flag), f, indent=2)
+
+    def load_configlist(self):
+        relpath = os.path.join(self.principal_cfg.paths.list_sim_configs_location, self.configlist_file)
+        if not os.path.exists(relpath):
+            raise FileNotFoundError("GeneralSimulationGeneration: Configuration list file doesn't exist: either not found or not created.")
+        return ConfigList.load(relpath)
+
+    def reference_columns(self, nb_sims: int) -> dict:
+        """
+        Returns the parameters of the reference configuration, as the constant columns of a list of `nb_sims`
+        simulations (see ConfigList.save_columns) that the generators override with the values of each simulation.
+        """
+        # Um parâmetro com lista de valores é repetido tal qual em cada simulação, e não distribuído entre elas
+        return {name: [value] * nb_sims if isinstance(value, list) else value for name, value in OmegaConf.to_container(self.param_cfg).items()}
+
+    def save_configlist(self, columns: dict, nb_sims: int, relpath: str):
+        """
+        Saves the configuration list given by columns (see ConfigList.save_columns), and its YAML export when
+        the `config_list` section of main.yaml asks for it.
+        """
+        ConfigList.save_columns(columns, nb_sims, relpath)
+        if ConfigList.is_columnar(relpath) and self.principal_cfg.get("config_list", {}).get("export_yaml", False):
+            print(f"     Exportação YAML da lista salva em '{ConfigList.export_yaml(relpath)}'.")
+
+
+    def GetQueueFileName(self) -> str:
+        queue_fname = self.principal_cfg.get("execution", {}).get("queue_file", None)
+        return queue_fname if queue_fname else os.path.join(self.principal_cfg.paths.sim_results_location, "queue.sqlite")
+
+
+    def run_queue(self, tasks: list, costs: list, number_of_workers: int, verbose: bool, rk4flag: bool):
+        """
+        Loads the simulations into the job queue file, with the context of the sweep, and starts `number_of_workers`
+        local worker processes (queue_worker.py). Workers started on other machines against the same file share the work.
+        """
+        execution_cfg = self.principal_cfg.get("execution", {})
+        for option in ("batch_spills", "shared_memory_fields"):
+            if execution_cfg.get(option, False):
+                print(f"Aviso: a opção execution.{option} não é usada pelo executor \"queue\": cada worker roda as suas simulações uma a uma, com os seus próprios readers.")
+        queue_fname = self.GetQueueFileName()
+        os.makedirs(os.path.dirname(os.path.abspath(queue_fname)), exist_ok=True)
+        sweep = JobQueue.sweep_key(self.principal_cfg.paths.sim_results_location)
+        queue = JobQueue(queue_fname, sweep, execution_cfg.get("lease_seconds", 600), execution_cfg.get("max_attempts", 3))
+        queue.set_context({
+            **self.sweep_context(verbose, rk4flag),
+            "lease_seconds"        : queue.lease_seconds,
+            "max_attempts"         : queue.max_attempts,
+        })
+        queue.fill(tasks, costs)
+        print(f"     Fila '{queue_fname}': {queue.counts()}. Outras máquinas podem participar com: python queue_worker.py {queue_fname} {sweep}")
+
+        worker_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "queue_worker.py")
+        workers = [subprocess.Popen([sys.executable, worker_script, queue_fname, sweep]) for _ in range(number_of_workers)]
+        for worker in workers:
+            worker.wait()
+        counts = queue.counts()
+        print(f"Fila '{queue_fname}' terminada: {counts}.")
+        if counts.get("failed", 0):
+            print(f"Cuidado: {counts['failed']} simulações falharam {queue.max_attempts} vezes, ver a coluna error da tabela jobs.")
+
+
+    def work_queue(self, queue: JobQueue, verbose: bool, rk4: bool):
+        """
+        Worker loop: claims the simulations of the queue one by one and runs them, renewing their lease while they run.
+        Returns when no simulation is pending or running anymore.
+        """
+        Simulator = RunASimulation(self.config_folder, self.principal_cfg)
+        RunASimulation.init_worker([], (), (Simulator, verbose, rk4))
+        worker = JobQueue.worker_id()
+        while True:
+            task = queue.claim(worker)
+            if task is None:
+                if queue.counts().get("running", 0) == 0:
+                    return
+                # Outros workers ainda rodam: espera, caso uma das leases expire
+                time.sleep(min(queue.lease_seconds / 3, 30))
+                continue
+            finished = queue.keep_alive(task.simulation_id, worker)
+            try:
+                with TaskGuard.time_limit(self.principal_cfg.get("execution", {}).get("task_timeout_s", 0), [task.simulation_id]):
+                    self.warp_simulate(task)
+            except Exception as e:
+                print(f"Simulação {task.simulation_id} falhou no worker {worker}: {e}")
+                queue.fail(task.simulation_id, worker, e)
+            else:
+                queue.complete(task.simulation_id, worker)
+            finally:
+                finished.set()
+                Tracer.flush()
+
+
+    def select_animations(self, sim_list) -> list:
+        """
+        Returns the simulations of `sim_list` to animate at the end of the sweep, according to the animation mode
+        of main.yaml: "all", "sample" (`sample_size` simulations spread over the list), "none" or "on_demand" (none).
+        """
+        animation_cfg = self.principal_cfg.get("animation", {})
+        mode = animation_cfg.get("mode", "all")
+        if mode == "all":
+            return list(sim_list)
+        if mode == "sample":
+            sample_size = min(animation_cfg.get("sample_size", 10), len(sim_list))
+            # Amostra espalhada pela lista, para cobrir datas e posições de derramamento diferentes
+            return [sim_list[int(idx)] for idx in np.linspace(0, len(sim_list) - 1, sample_size).round()] if sample_size > 0 else []
+        return []
+
+    def render_animations(self, sim_list, number_of_workers: int, verbose: bool):
+        """
+        Renders, in a pool of its own, the animations of the simulations of `sim_list` completed in the results
+        folder, from their result files. The rendering time is added to their metrics in the completion journal.
+        """
+        results_relpath = self.principal_cfg.paths.sim_results_location
+        journal = CompletionJournal(results_relpath)
+        records = journal.load()
+        tasks = [SimTask.from_cfg(cfg) for cfg in sim_list if records.get(cfg.simulation_id, {}).get("status") == "done"]
+        # Em ordem de datas, para que as simulações de uma mesma janela reaproveitem os fundos já calculados (ver FrameRenderer)
+        tasks.sort(key=lambda task: (task.start_date, task.end_date))
+        if not tasks:
+            return
+        print(f"Renderizando {len(tasks)} animações com {number_of_workers} processos...")
+        Simulator = RunASimulation(self.config_folder, self.principal_cfg)
+        with Tracer.span("animation dispatch", workers=number_of_workers, tasks=len(tasks)), \
+             Pool(processes=number_of_workers, initializer=RunASimulation.init_worker, initargs=([], (), (Simulator, verbose, None), Tracer.settings()),
+                  maxtasksperchild=self.principal_cfg.get("execution", {}).get("max_tasks_per_child", 0) or None) as pool:
+            results = list(tqdm(pool.imap_unordered(self.warp_render, tasks), total=len(tasks)))
+        failed = []
+        for simulation_id, animation_s, error in results:
+            record = records[simulation_id]
+            if error is not None:
+                failed.append(simulation_id)
+                print(f"Animação da simulação {simulation_id} falhou: {error}")
+            elif record.get("metrics"):
+                record["metrics"] = SimulationMetrics.add_animation(record["metrics"], animation_s)
+                journal.write(record)
+        print(f"{len(results) - len(failed)} animações salvas na pasta '{os.path.join(results_relpath, 'gif/')}'.")
+
+    def finish_sweep(self, journal: CompletionJournal, sim_list, number_of_workers: int, verbose: bool):
+        """
+        Post-processing of a sweep: renders its animations, reports its metrics and saves its trace.
+        """
+        animation_cfg = self.principal_cfg.get("animation", {})
+        self.render_animations(self.select_animations(sim_list), animation_cfg.get("workers", 0) or number_of_workers, verbose)
+        if animation_cfg.get("mode", "all") != "all":
+            print(f"Outras animações podem ser renderizadas com: python render_animations.py {self.principal_cfg.paths.sim_results_location} [simulation_id ...]")
+        self.report_metrics(journal, sim_list)
+        Tracer.save(self.principal_cfg.paths.sim_results_location)
+
+
+    def report_metrics(self, journal: CompletionJournal, sim_list):
+        """
+        Writes the metrics table of the results folder from the completion journal, and prints the summary of
+        the simulations of `sim_list` (those run by this sweep).
+        """
+        records = journal.load()
+        if not records:
+            return
+        table_fname = SimulationMetrics.write_table(records, self.principal_cfg.paths.sim_results_location)
+        run_ids = {sim_cfg.simulation_id for sim_cfg in sim_list}
+        SimulationMetrics.summarize([record["metrics"] for simulation_id, record in records.items()
+                                     if simulation_id in run_ids and record.get("status") == "done" and record.get("metrics")])
+        print(f"Métricas por simulação salvas em '{table_fname}'.")
+
+
+    def configlist_exists(self) -> bool:
+        return os.path.exists(os.path.join(self.principal_cfg.paths.list_sim_configs_location, self.configlist_file))
+
+
+    def start_sweep(self, verbose: bool, rk4flag: bool, overwrite: bool, resume: bool) -> tuple:
+        """
+        Prepares the results folder of a sweep: clears it with `overwrite`, keeps it with `resume`, and saves the
+        context of the sweep.
+
+        Returns:
+            tuple: The completion journal of the folder and its records from the previous sweep (to calibrate
+                the cost model).
+        """
+        results_relpath = self.principal_cfg.paths.sim_results_location
+        journal = CompletionJournal(results_relpath)
+        previous_records = journal.load() # Durações medidas em um sweep anterior, para calibrar o modelo de custo
         if os.path.exists(results_relpath):
-            if overwrite:
+            if resume:
+                print(f"Resuming the simulations of existing results folder {results_relpath}.")
+            elif overwrite:
                 print(f"Overwriting existing results folder {results_relpath}.")
+                journal.clear()
             else:
-                raise FileExistsError(f"Results folder '{results_relpath}' already exists. Select the overwrite option or rename the result folder.")
+                raise FileExistsError(f"Results folder '{results_relpath}' already exists. Select the overwrite or resume option or rename the result folder.")
+        if not resume: # Um sweep retomado continua o trace do anterior
+            Tracer.clear(results_relpath)
+        self.save_sweep_context(verbose, rk4flag)
+        return journal, previous_records
 
+    def fetch_environment(self, sim_list) -> list:
+        """
+        Downloads the environment data the simulations of `sim_list` need (only their windows with `plan_downloads`).
 
-        print("\n")
-        print(f"1/3 Fetching Copernicus Data...")
+        Returns:
+            list: The Fetch objects of the downloaded data windows.
+        """
         F = Fetch(self.cm_cfg, self.login_cfg)
-        F.download_data()
-        
-    
-        print("\n")
-        print(f"2/3 Retrieving configuration file list...")
+        if self.cm_cfg.get("plan_downloads", False):
+            # Baixa apenas as janelas de tempo usadas pelas simulações da lista
+            pieces = DownloadPlanner(self.cm_cfg.get("merge_gap_days", 0)).plan(sim_list)
+            DownloadPlanner.describe(pieces, F.start_date_datetype, F.end_date_datetype)
+            with Tracer.span("download_data", windows=len(pieces)):
+                F.download_plan(pieces)
+            return [F.Window(start, end, bbox) for start, end, bbox in pieces]
+        with Tracer.span("download_data"):
+            F.download_data()
+        return [F]
+
+    def open_pool(self, windows: list, shared_envs: list, number_of_workers: int, verbose: bool, rk4flag: bool, max_chunks_per_child: int = None) -> Pool:
+        """
+        Returns a pool whose workers receive the simulator once, and open once the readers of the data windows
+        (or attach to the fields shared in `shared_envs`, see share_environment), reused by all their simulations.
+        """
         Simulator = RunASimulation(self.config_folder, self.principal_cfg)
-        sims_conf_folder = self.principal_cfg.paths.list_sim_configs_location
-        relpath = os.path.join(sims_conf_folder, self.configlist_file)
-        if os.path.exists(relpath):
-            list_all_sims = OmegaConf.load(relpath)
+        shared_fields = [(source, opener, env.metadata) for source, opener, env in shared_envs]
+        return Pool(processes=number_of_workers, initializer=RunASimulation.init_worker, initargs=(windows, shared_fields, (Simulator, verbose, rk4flag), Tracer.settings()),
+                    maxtasksperchild=max_chunks_per_child)
+
+    def run_chunks(self, pool: Pool, simulate, chunks: list, progress: bool = True) -> list:
+        """
+        Runs chunks of tasks (see warp_simulate_chunk) on the pool, in any order. The chunk of a worker that dies
+        outright is reported as failed instead of blocking the sweep (see TaskGuard.dispatch).
+
+        Returns:
+            list: The (results, failures, timing) of each chunk.
+        """
+        execution_cfg = self.principal_cfg.get("execution", {})
+        chunk_args = [(simulate, chunk, execution_cfg.get("task_timeout_s", 0), execution_cfg.get("max_retries", 1)) for chunk in chunks]
+        return TaskGuard.dispatch(pool, self.warp_simulate_chunk, chunk_args, chunks, progress)
+
+
+    def generate_simulations(self, number_of_workers: int, verbose: bool, rk4flag: bool, overwrite: bool, resume: bool = False):
+        """
+        Executes all simulations using multiprocessing.
+
+        Args:
+            number_of_workers (int): Number of worker processes to use.
+            verbose (bool): Whether to enable verbose output for each simulation.
+            rk4flag (bool): Whether to use the RK4 integration scheme.
+            overwrite (bool): Whether to run again all simulations of an existing results folder.
+            resume (bool): Whether to run only the simulations of an existing results folder that are missing,
+                failed or corrupt, according to its completion journal.
+        """
+        results_relpath = self.principal_cfg.paths.sim_results_location
+        journal, previous_records = self.start_sweep(verbose, rk4flag, overwrite, resume)
+
+
+        print("\n")
+        print(f"1/3 Retrieving configuration file list...")
+        list_all_sims = self.load_configlist()
+
+        execution_cfg = self.principal_cfg.get("execution", {})
+        if resume:
+            # Só reexecuta as simulações ausentes, com falha ou com arquivo de resultado corrompido
+            list_to_simulate = journal.pending(list_all_sims, execution_cfg.get("resume_verify_checksum", False))
+            print(f"     {len(list_all_sims) - len(list_to_simulate)} simulações já concluídas, {len(list_to_simulate)} a executar.")
+            if not list_to_simulate:
+                print(f"Todas as simulações da pasta '{results_relpath}' já foram concluídas.")
+                return
         else:
-            raise FileNotFoundError("GeneralSimulationGeneration: YAML Configuration file doesn't exist: either not found or not created.")
-        
-        list_to_simulate = []
-        list_to_simulate = list_all_sims # We execute all simulations
+            list_to_simulate = list_all_sims # We execute all simulations
+
+
+        print("\n")
+        print(f"2/3 Fetching Copernicus Data...")
+        windows = self.fetch_environment(list_to_simulate)
+
         print(f"3/3 Running simulations from all configuration files with {number_of_workers} processors...")
         print("\n")
-        params = [(Simulator, cfg, verbose, rk4flag) for cfg in list_to_simulate]
-        with Pool(processes=number_of_workers) as pool:
-            _ = list(tqdm(pool.imap(self.warp_simulate, params), total=len(params)))
-        print(f"Resultados gerados com sucesso na pasta '{self.principal_cfg.paths.sim_results_location}'.")
\ No newline at end of file
+        scheduler = TaskScheduler(rk4flag)
+        if scheduler.calibrate(previous_records, list_all_sims):
+            print(f"     Modelo de custo calibrado pelo journal: {scheduler.overhead_s:.1f} s + {scheduler.seconds_per_unit*1e6:.3f} s por milhão de passos-partícula.")
+        if execution_cfg.get("executor", "pool") == "queue":
+            # As simulações são executadas por processos independentes a partir de uma fila em arquivo
+            with Tracer.span("queue dispatch", workers=number_of_workers, tasks=len(list_to_simulate)):
+                self.run_queue([SimTask.from_cfg(cfg) for cfg in list_to_simulate], [scheduler.cost(cfg) for cfg in list_to_simulate], number_of_workers, verbose, rk4flag)
+            self.finish_sweep(journal, list_to_simulate, number_of_workers, verbose)
+            return
+        if execution_cfg.get("batch_spills", False):
+            # Os derramamentos com as mesmas datas e domínio são simulados juntos em um único run do Opendrift
+            batches = self.make_batches(list_to_simulate, execution_cfg.get("batch_size", 0))
+            print(f"     {len(list_to_simulate)} simulações agrupadas em {len(batches)} runs do Opendrift.")
+            params = [[SimTask.from_cfg(cfg) for cfg in cfgs] for cfgs in batches]
+            costs = [sum(scheduler.cost(cfg) for cfg in cfgs) for cfgs in batches]
+            simulate = self.warp_simulate_batch
+        else:
+            params = [SimTask.from_cfg(cfg) for cfg in list_to_simulate]
+            costs = [scheduler.cost(cfg) for cfg in list_to_simulate]
+            simulate = self.warp_simulate
+        if execution_cfg.get("longest_first", True):
+            # As simulações mais longas são despachadas primeiro, e as curtas do final agrupadas em chunks
+            chunks = TaskScheduler.make_chunks(params, costs, number_of_workers, execution_cfg.get("chunks_per_worker", 4))
+        else:
+            # Uma simulação por chunk, na ordem da lista
+            chunks = [[task] for task in params]
+        shared_envs = self.share_environment(windows) if execution_cfg.get("shared_memory_fields", False) else []
+        start = time.time()
+        try:
+            # Os workers são recriados após cerca de max_tasks_per_child simulações, para conter vazamentos de memória: o pool conta chunks
+            max_chunks_per_child = TaskScheduler.chunks_per_child(execution_cfg.get("max_tasks_per_child", 0), len(list_to_simulate), len(chunks))
+            with Tracer.span("pool dispatch", workers=number_of_workers, chunks=len(chunks)), \
+                 self.open_pool(windows, shared_envs, number_of_workers, verbose, rk4flag, max_chunks_per_child) as pool:
+                chunk_results = self.run_chunks(pool, simulate, chunks)
+        finally:
+            for _, _, env in shared_envs:
+                env.release()
+        wall_time = time.time() - start
+        sim_stats = [stats for results, _, _ in chunk_results for stats in results]
+        if execution_cfg.get("batch_spills", False):
+            sim_stats = [stats for batch_stats in sim_stats for stats in batch_stats]
+        print(f"Resultados gerados com sucesso na pasta '{self.principal_cfg.paths.sim_results_location}'.")
+        TaskGuard.write_report([failure for _, failures, _ in chunk_results for failure in failures], results_relpath)
+
+        if sim_stats:
+            setup_time = sum(stats["reader_setup_s"] for stats in sim_stats)
+            saved_time = sum(stats["reader_setup_saved_s"] for stats in sim_stats)
+            print(f"Setup dos readers: {setup_time/len(sim_stats):.3f} s por simulação, {saved_time/len(sim_stats):.3f} s economizados por simulação ao reaproveitar os readers de cada worker.")
+        TaskScheduler.report_utilization([timing for _, _, timing in chunk_results], number_of_workers, wall_time)
+        self.finish_sweep(journal, list_to_simulate, number_of_workers, verbose)
@@ -0,0 +1,204 @@
+#@brief File-backed queue of simulations, shared by workers running on one or many machines
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from src.SimTask import SimTask
+
+
+class JobQueue:
+    """
+    Queue of the simulations of a sweep stored in a SQLite file, so that any number of independent worker
+    processes (see queue_worker.py), on one or many machines sharing the file system, can claim and run them.
+
+    A worker claims a simulation with a lease, renewed by a heartbeat while the simulation runs. When a worker
+    dies, its lease expires and the simulation is claimed again by another worker, until it reaches max_attempts
+    runs. The file also stores the context of the sweep (configuration folder and files, results folder, flags),
+    so that a worker only needs the path of the queue.
+
+    Several sweeps can share one file (`execution.queue_file`): the jobs and the context are keyed by the sweep,
+    its results folder.
+
+    The queue uses the default rollback journal of SQLite rather than WAL, which needs shared memory between
+    the processes and does not work over network file systems.
+
+    Attributes:
+        queue_fname (str): The SQLite file.
+        sweep (str): The sweep whose jobs are handled (see sweep_key).
+        lease_seconds (float): Duration of a lease; a running simulation whose lease is not renewed within it is reclaimed.
+        max_attempts (int): Number of runs of a simulation before it is marked as failed.
+    """
+    # Versão do esquema do arquivo: as filas de um esquema anterior são recriadas
+    SCHEMA_VERSION = 2
+
+    def __init__(self, queue_fname: str, sweep: str = "", lease_seconds: float = 600, max_attempts: int = 3):
+        self.queue_fname = queue_fname
+        self.sweep = sweep
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self.transaction() as db:
+            if db.execute("PRAGMA user_version").fetchone()[0] != JobQueue.SCHEMA_VERSION:
+                db.execute("DROP TABLE IF EXISTS jobs")
+                db.execute("DROP TABLE IF EXISTS sweep")
+                db.execute(f"PRAGMA user_version = {JobQueue.SCHEMA_VERSION}")
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                            sweep         TEXT NOT NULL,
+                            simulation_id INTEGER NOT NULL,
+                            task          TEXT NOT NULL,
+                            cost          REAL NOT NULL DEFAULT 0,
+                            status        TEXT NOT NULL DEFAULT 'pending',
+                            worker        TEXT,
+                            lease_expires REAL,
+                            attempts      INTEGER NOT NULL DEFAULT 0,
+                            error         TEXT,
+                            PRIMARY KEY (sweep, simulation_id))""")
+            db.execute("CREATE TABLE IF NOT EXISTS sweep (sweep TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (sweep, key))")
+
+
+    @contextmanager
+    def transaction(self):
+        """
+        Opens a connection inside a write transaction, taking the lock of the file right away (BEGIN IMMEDIATE)
+        so that two workers never claim the same simulation.
+        """
+        # isolation_level=None: the transactions are opened explicitly
+        db = sqlite3.connect(self.queue_fname, timeout=60, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        finally:
+            db.close()
+
+    @classmethod
+    def open(cls, queue_fname: str, sweep: str = None):
+        """
+        Opens a sweep of an existing queue with the lease duration and number of attempts recorded in its context.
+
+        Args:
+            sweep (str): The sweep, which can be left out when the file holds a single one.
+
+        Raises:
+            ValueError: If `sweep` is left out and the file holds several sweeps.
+        """
+        if sweep is None:
+            sweeps = cls(queue_fname).sweeps()
+            if len(sweeps) != 1:
+                raise ValueError(f"A fila '{queue_fname}' contém {len(sweeps)} sweeps: indique um deles ({', '.join(sweeps)}).")
+            sweep = sweeps[0]
+        context = cls(queue_fname, sweep).get_context()
+        return cls(queue_fname, sweep, context.get("lease_seconds", 600), context.get("max_attempts", 3))
+
+    @staticmethod
+    def sweep_key(result_path: str) -> str:
+        return os.path.abspath(os.path.normpath(result_path))
+
+    @staticmethod
+    def worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def sweeps(self) -> list:
+        with self.transaction() as db:
+            return [row[0] for row in db.execute("SELECT DISTINCT sweep FROM sweep ORDER BY sweep")]
+
+
+    def set_context(self, context: dict):
+        with self.transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO sweep (sweep, key, value) VALUES (?, ?, ?)",
+                           [(self.sweep, key, json.dumps(value)) for key, value in context.items()])
+
+    def get_context(self) -> dict:
+        with self.transaction() as db:
+            return {key: json.loads(value) for key, value in db.execute("SELECT key, value FROM sweep WHERE sweep = ?", (self.sweep,))}
+
+    def fill(self, tasks: list, costs: list = None):
+        """
+        Replaces the jobs of the sweep by the simulations to run, all pending: the jobs of a previous run of the
+        sweep (after an overwrite, or those the completion journal found done on resume) are removed.
+        """
+        costs = costs if costs is not None else [0.0] * len(tasks)
+        with self.transaction() as db:
+            db.execute("DELETE FROM jobs WHERE sweep = ?", (self.sweep,))
+            db.executemany("INSERT INTO jobs (sweep, simulation_id, task, cost) VALUES (?, ?, ?, ?)",
+                           [(self.sweep, task.simulation_id, json.dumps(task.__reduce__()[1]), cost) for task, cost in zip(tasks, costs)])
+
+
+    def claim(self, worker: str):
+        """
+        Leases the most expensive pending simulation to `worker`, after reclaiming the expired leases.
+
+        Returns:
+            SimTask: The claimed simulation, or None if no simulation is pending.
+        """
+        with self.transaction() as db:
+            now = time.time()
+            # Uma simulação que derruba o seu worker (memória, segfault) perde a lease: ela falha após max_attempts runs
+            db.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, lease_expires = NULL, "
+                       "error = CASE WHEN attempts >= ? THEN 'Lease expirada: o worker parou durante a simulação' ELSE error END "
+                       "WHERE sweep = ? AND status = 'running' AND lease_expires < ?", (self.max_attempts, self.max_attempts, self.sweep, now))
+            row = db.execute("SELECT simulation_id, task FROM jobs WHERE sweep = ? AND status = 'pending' ORDER BY cost DESC, simulation_id LIMIT 1",
+                             (self.sweep,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE jobs SET status = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE sweep = ? AND simulation_id = ?",
+                           (worker, now + self.lease_seconds, self.sweep, row[0]))
+        return None if row is None else SimTask(*json.loads(row[1]))
+
+    def heartbeat(self, simulation_id: int, worker: str) -> bool:
+        """
+        Renews the lease of a running simulation.
+
+        Returns:
+            bool: False if the lease was lost (expired and claimed by another worker).
+        """
+        with self.transaction() as db:
+            cursor = db.execute("UPDATE jobs SET lease_expires = ? WHERE sweep = ? AND simulation_id = ? AND worker = ? AND status = 'running'",
+                                (time.time() + self.lease_seconds, self.sweep, simulation_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, simulation_id: int, worker: str):
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET status = 'done', lease_expires = NULL, error = NULL WHERE sweep = ? AND simulation_id = ? AND worker = ?",
+                       (self.sweep, simulation_id, worker))
+
+    def fail(self, simulation_id: int, worker: str, error: Exception):
+        """
+        Releases a simulation that raised an error: it is claimed again until it reaches max_attempts runs.
+        """
+        with self.transaction() as db:
+            db.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, lease_expires = NULL, error = ? "
+                       "WHERE sweep = ? AND simulation_id = ? AND worker = ?", (self.max_attempts, f"{type(error).__name__}: {error}", self.sweep, simulation_id, worker))
+
+    def counts(self) -> dict:
+        """
+        Returns the number of simulations by status.
+        """
+        with self.transaction() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs WHERE sweep = ? GROUP BY status", (self.sweep,)).fetchall())
+
+
+    def keep_alive(self, simulation_id: int, worker: str) -> threading.Event:
+        """
+        Starts a thread renewing the lease of a simulation every third of the lease duration.
+
+        Returns:
+            threading.Event: To set once the simulation is finished, which stops the heartbeat.
+        """
+        finished = threading.Event()
+        def beat():
+            while not finished.wait(self.lease_seconds / 3):
+                if not self.heartbeat(simulation_id, worker):
+                    print(f"Aviso: a lease da simulação {simulation_id} foi perdida pelo worker {worker}.")
+                    return
+        threading.Thread(target=beat, daemon=True).start()
+        return finished
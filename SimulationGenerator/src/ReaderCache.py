@@ -0,0 +1,71 @@
+#@brief Keep Opendrift readers open across the simulations run by one process
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import time
+
+
+class ReaderCache:
+    """
+    Per-process cache of opened Opendrift readers, keyed by their source.
+
+    Opening a reader on year-long environment files parses their metadata and sets up the coordinates,
+    which every simulation used to pay again. A pool worker now opens each reader once and reuses it
+    for all its tasks, after resetting the data blocks buffered by the previous simulation.
+
+    Class attributes:
+        readers (dict): The opened readers, by (opener name, source).
+        open_times (dict): The time (s) spent opening each reader, by the same key.
+    """
+    readers = {}
+    open_times = {}
+
+    @staticmethod
+    def key(source, opener) -> tuple:
+        fnames = source if isinstance(source, (list, tuple)) else [source]
+        return (opener.__qualname__, tuple(os.path.normpath(f) for f in fnames))
+
+    @classmethod
+    def clear(cls):
+        cls.readers = {}
+        cls.open_times = {}
+
+    @staticmethod
+    def reset(reader):
+        """
+        Drops the state left by a previous simulation: the buffered data blocks and the reader timers.
+        """
+        reader.var_block_before = {}
+        reader.var_block_after = {}
+        if hasattr(reader, "timing"):
+            reader.timing.clear()
+            reader.timers.clear()
+
+    @classmethod
+    def put(cls, source, opener, reader, open_time: float = 0.0):
+        """
+        Registers a reader opened elsewhere (e.g. over shared memory) as the reader of `source` for `opener`.
+        """
+        key = ReaderCache.key(source, opener)
+        cls.readers[key] = reader
+        cls.open_times[key] = open_time
+
+    @classmethod
+    def get(cls, source, opener) -> tuple:
+        """
+        Returns the reader of a source, opening it with `opener` on first use.
+
+        Returns:
+            tuple: The reader, the time (s) spent getting it and the setup time (s) saved by reusing it.
+        """
+        key = ReaderCache.key(source, opener)
+        start = time.perf_counter()
+        if key in cls.readers:
+            reader = cls.readers[key]
+            ReaderCache.reset(reader)
+            return reader, time.perf_counter() - start, cls.open_times[key]
+        reader = opener(source)
+        cls.readers[key] = reader
+        cls.open_times[key] = time.perf_counter() - start
+        return reader, cls.open_times[key], 0.0
@@ -0,0 +1,76 @@
+#@brief Richardson estimate of the time discretization error left in a ladder of refined simulations
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import numpy as np
+from scipy.optimize import brentq
+
+
+class RichardsonEstimate:
+    """
+    Estimates the error of the finest simulation of a time step ladder from the differences between its
+    successive levels.
+
+    For a scheme of order p, the error of the level of time step h is about C h^p: the difference between two
+    levels of ratio r = h_coarse / h_fine is then C h_fine^p (r^p - 1), and the error left in the finer level is
+    difference / (r^p - 1). The order p is observed on the last three levels h0 > h1 > h2, whose ratios differ
+    (the ladder starts from the time step of the reference configuration, then halves the output time step):
+    it solves d_prev / d_last = r2^p (r1^p - 1) / (r2^p - 1), with r1 = h0 / h1 and r2 = h1 / h2, which reduces
+    to log(d_prev / d_last) / log(r) for a constant ratio. The order is capped by the nominal order of the
+    advection scheme (NOMINAL_ORDER), which keeps the estimate on the safe side when the differences happen to
+    fall faster than the scheme allows.
+
+    Before the differences decrease (levels outside the asymptotic range), the error is unknown and estimated as
+    infinite.
+    """
+    NOMINAL_ORDER = {False: 1, True: 4} # Euler, RK4
+    MIN_LEVELS = 3
+    MIN_ORDER, MAX_ORDER = 1e-3, 16.0 # Intervalo de busca da ordem observada
+
+    @staticmethod
+    def observed_order(differences: list, timesteps: list) -> float:
+        """
+        Returns the order of convergence observed on the last three levels (NaN if the differences don't decrease
+        fast enough for a positive order).
+
+        Args:
+            differences (list): The difference (m) between each level and the previous one (the first is unused).
+            timesteps (list): The time step (s) of each level.
+        """
+        if len(differences) < RichardsonEstimate.MIN_LEVELS:
+            return np.nan
+        d_prev, d_last = differences[-2], differences[-1]
+        r1, r2 = timesteps[-3] / timesteps[-2], timesteps[-2] / timesteps[-1]
+        if not (np.isfinite(d_prev) and np.isfinite(d_last)) or d_last <= 0 or d_prev <= 0 or r1 <= 1 or r2 <= 1:
+            return np.nan
+        # log(r2^p (r1^p - 1) / (r2^p - 1)) cresce com p, a partir de log(log(r1) / log(r2)) em p -> 0
+        def mismatch(order):
+            return order * np.log(r2) + np.log(np.expm1(order * np.log(r1)) / np.expm1(order * np.log(r2))) - np.log(d_prev / d_last)
+        if mismatch(RichardsonEstimate.MIN_ORDER) >= 0:
+            return np.nan # As diferenças não diminuem o bastante para uma ordem positiva
+        if mismatch(RichardsonEstimate.MAX_ORDER) <= 0:
+            return float(RichardsonEstimate.MAX_ORDER)
+        return float(brentq(mismatch, RichardsonEstimate.MIN_ORDER, RichardsonEstimate.MAX_ORDER))
+
+    @staticmethod
+    def remaining_error(differences: list, timesteps: list, rk4: bool) -> tuple:
+        """
+        Returns the estimated error (m) of the last level and the order used (inf and NaN while unknown).
+        """
+        order = RichardsonEstimate.observed_order(differences, timesteps)
+        if np.isnan(order):
+            return np.inf, np.nan
+        order = min(order, RichardsonEstimate.NOMINAL_ORDER[rk4])
+        ratio = timesteps[-2] / timesteps[-1]
+        return float(differences[-1] / (ratio**order - 1)), order
+
+    @staticmethod
+    def levels_to_tolerance(error: float, order: float, ratio: float, tolerance: float) -> int:
+        """
+        Returns the number of further levels of ratio `ratio` after which the error should fall below `tolerance`.
+        """
+        if not np.isfinite(error) or np.isnan(order):
+            return -1
+        if error < tolerance:
+            return 0
+        return int(np.ceil(np.log(error / tolerance) / (order * np.log(ratio))))
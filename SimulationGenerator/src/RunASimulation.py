@@ -3,27 +3,41 @@
 #@date December 2025
 
 import os
+import time
+import numpy as np
+import xarray as xr
 
-from opendrift.models.oceandrift import OceanDrift
 from opendrift.models.openoil import OpenOil
 from opendrift.readers import reader_netCDF_CF_generic # Leitor de dados NetCDF/OPeNDAP
 
 from omegaconf import DictConfig
 from src.Fetch import Fetch
+from src.DownloadPlanner import DownloadPlanner
+from src.AnalysisStore import AnalysisStore
+from src.ReaderCache import ReaderCache
+from src.SharedEnvironment import SharedMemoryReader
+from src.SimulationMetrics import SimulationMetrics
+from src.Tracer import Tracer
+from src.FrameRenderer import FrameRenderer
 from datetime import datetime
 
 from hydra import initialize, compose
 from exceptions.CustomExceptions import CopernicusDateRangeError
 
 class RunASimulation:
+    # (simulator, verbose, rk4) of a pool worker, set once by init_worker instead of being sent with every task
+    worker_context = None
+    # Fração do vento no deslocamento das partículas, sem Stokes drift
+    WIND_DRIFT_FACTOR = 0.035
 
     def __init__(self, config_folder: str, main_cfg: DictConfig):
-        with initialize(config_path=config_folder, version_base=None):
+        with Tracer.span("config composition"), initialize(config_path=config_folder, version_base=None):
             self.cm_data = compose(config_name=main_cfg.configs.cm_config) # DictConfig
             self.gif_config = compose(config_name=main_cfg.configs.gif_config) # DictConfig
             self.credentials = compose(config_name=main_cfg.configs.cm_login) # DictConfig
             self.sim_cfg_file = compose(config_name=main_cfg.configs.base_sim_config) # DictConfig
         self.result_path = main_cfg.paths.sim_results_location # str
+        self.animation_cfg = main_cfg.get("animation", {}) # DictConfig
 
 
 
@@ -35,57 +49,104 @@ class RunASimulation:
     def generate_result_fname(id: int, extension: int):
         if extension == 0:
             return f"result_{id:04d}.nc"
+        elif extension == 2:
+            return f"result_{id:04d}.webp"
         else:
             return f"result_{id:04d}.gif"
     
 
-    def run_simulation(self, verbose, rk4):
+    def GetWindowFetch(self, F_full: Fetch = None) -> Fetch:
+        """
+        Returns a Fetch over the window and domain of the current simulation, from the Fetch `F_full` over the
+        Copernicus Marine configuration (created, with the catalog loaded by the process, if None).
+        """
+        start, end, bbox = DownloadPlanner.simulation_window(self.sim_cfg_file)
+        F_full = F_full if F_full is not None else Fetch(self.cm_data, self.credentials)
+        return F_full.Window(start, end, bbox)
+
+    def GetCoveringFetch(self, simulation_ids: list) -> Fetch:
+        """
+        Returns a Fetch whose data covers the current simulation: its own window (see GetWindowFetch) when the
+        downloaded data covers it or, as before the download planning, the full window and domain of the
+        Copernicus Marine configuration when the simulation dates fall within it.
+
+        Raises:
+            CopernicusDateRangeError: When neither is on disk.
+        """
+        F_full = Fetch(self.cm_data, self.credentials)
+        F = self.GetWindowFetch(F_full)
+        if F.GetCurrentSource() is not None and F.GetWindSource() is not None:
+            return F
+        if self.cm_data.start_date <= self.sim_cfg_file.start_date and self.sim_cfg_file.end_date <= self.cm_data.end_date:
+            if F_full.GetCurrentSource() is not None and F_full.GetWindSource() is not None:
+                print(f"Simulação(ões) {simulation_ids}: dados da janela {F.GetBBox()} ausentes, usando os dados de todo o domínio configurado.")
+                return F_full
+        raise CopernicusDateRangeError(f"The downloaded Copernicus Marine environment data doesn't cover simulation(s) {simulation_ids} ({self.sim_cfg_file.start_date} to {self.sim_cfg_file.end_date} over {F.GetBBox()}).")
 
-        if ((self.sim_cfg_file.start_date < self.cm_data.start_date) or (self.sim_cfg_file.end_date > self.cm_data.end_date)):
-            raise CopernicusDateRangeError(f"The imported Copernicus Marine environment data doesn't contain the simulation date range.")
-        
-        print(f"\n{self.sim_cfg_file.simulation_id+1}a simulação iniciada ...")
 
+    @staticmethod
+    def reader_sources(F: Fetch) -> tuple:
+        """
+        Returns the current source, the wind source and the reader opener of a data window.
+        """
+        current_source = F.GetCurrentSource()
+        wind_source = F.GetWindSource()
+        if F.analysis_store is not None:
+            return F.analysis_store.resolve(current_source), F.analysis_store.resolve(wind_source), AnalysisStore.Reader
+        return current_source, wind_source, reader_netCDF_CF_generic.Reader
 
-        os.makedirs(self.result_path, exist_ok=True)
 
-        o = OpenOil(loglevel=20 if verbose else 50)
+    @staticmethod
+    def open_readers(F: Fetch) -> tuple:
+        """
+        Returns the current and wind readers of a data window, reusing the readers already opened by this process.
 
-        ############## FETCH DATA ##############
-        F = Fetch(self.cm_data, self.credentials)
-        current_fname = F.GetCurrentFileName(with_folder = True)
-        if not os.path.exists(current_fname):
-            print(f"run_simulation: o current path {current_fname} não existe.")
-            return
-        
-        wind_fname = F.GetWindFileName(with_folder = True)
-        if not os.path.exists(wind_fname):
-            print(f"run_simulation: o wind path {wind_fname} não existe.")
-            return
-        
+        Returns:
+            tuple: The current reader, the wind reader, the time (s) spent getting them and the setup time (s) saved by reuse.
+        """
+        current_source, wind_source, opener = RunASimulation.reader_sources(F)
+        reader_current, current_time, current_saved = ReaderCache.get(current_source, opener)
+        reader_wind, wind_time, wind_saved = ReaderCache.get(wind_source, opener)
+        return reader_current, reader_wind, current_time + wind_time, current_saved + wind_saved
 
-        ############## ADD READERS ##############
-        
-        reader_current = reader_netCDF_CF_generic.Reader(current_fname)
-        reader_wind    = reader_netCDF_CF_generic.Reader(wind_fname)
-        o.add_reader([reader_current, reader_wind])
 
-        if verbose:
-            print('Current Reader details:\n')
-            print(reader_current)
+    @staticmethod
+    def init_worker(windows: list, shared_fields: list = (), context: tuple = None, tracing: dict = None):
+        """
+        Pool initializer: opens once, in each worker process, the readers of every data window of the sweep.
+
+        Args:
+            windows (list): The Fetch objects of the downloaded data windows.
+            shared_fields (list): (source, opener, metadata) of the fields shared by the parent process
+                (see SharedEnvironment). Those sources are read from shared memory instead of being opened.
+            context (tuple): The (simulator, verbose, rk4) shared by all the tasks of the worker.
+            tracing (dict): The tracing settings of the sweep (see Tracer.settings).
+        """
+        RunASimulation.worker_context = context
+        if tracing is not None:
+            Tracer.start_worker(tracing, context[0].result_path)
+        ReaderCache.clear()
+        for source, opener, metadata in shared_fields:
+            ReaderCache.put(source, opener, SharedMemoryReader(metadata))
+        for F in windows:
+            if F.GetCurrentSource() is not None and F.GetWindSource() is not None:
+                RunASimulation.open_readers(F)
 
-            print('Wind Reader details:\n')
-            print(reader_wind)
 
+    @staticmethod
+    def configure_model(o, sim_cfg: DictConfig, rk4: bool):
+        """
+        Applies the drift settings shared by all simulations to an OpenOil model.
+        """
         # Desativa particulas fora do dominio
-        o.set_config('drift:deactivate_west_of' , self.sim_cfg_file.min_lon)
-        o.set_config('drift:deactivate_east_of' , self.sim_cfg_file.max_lon)
-        o.set_config('drift:deactivate_south_of', self.sim_cfg_file.min_lat)
-        o.set_config('drift:deactivate_north_of', self.sim_cfg_file.max_lat)
+        o.set_config('drift:deactivate_west_of' , sim_cfg.min_lon)
+        o.set_config('drift:deactivate_east_of' , sim_cfg.max_lon)
+        o.set_config('drift:deactivate_south_of', sim_cfg.min_lat)
+        o.set_config('drift:deactivate_north_of', sim_cfg.max_lat)
 
         if 1: #https://github.com/OpenDrift/opendrift/issues/362
             o.set_config('drift:stokes_drift', False)
-            o.set_config('seed:wind_drift_factor', 0.035) 
+            o.set_config('seed:wind_drift_factor', RunASimulation.WIND_DRIFT_FACTOR)
         else: #Wind by itself is about 3% to 3.5%, but it already includes the StokesDrift (which accounts for 1.5% of these 3.5%). So if we want to add StokesDrif, the wind fraction is reduced to 2%
             o.set_config('drift:stokes_drift', True)
             o.set_config('seed:wind_drift_factor', 0.02) 
@@ -95,43 +156,199 @@ class RunASimulation:
             o.set_config('drift:advection_scheme', 'runge-kutta4')
 
 
-        if verbose:
-            print('Seeding elements.\n')
-        o.seed_elements(lat    = self.sim_cfg_file.spill_lat,
-                        lon    = self.sim_cfg_file.spill_lon,
-                        number = self.sim_cfg_file.num_seed_elements,
-                        radius = self.sim_cfg_file.spill_radius,
-                        time   = datetime.strptime(self.sim_cfg_file.start_date, "%Y-%m-%d"),#.replace(hour=1, minute=45, second=0),
+    @staticmethod
+    def seed_spill(o, sim_cfg: DictConfig, origin_marker: int = None):
+        """
+        Seeds the elements of one spill. When several spills share a run, `origin_marker` tags their elements.
+        """
+        tags = {} if origin_marker is None else {"origin_marker": origin_marker, "origin_marker_name": f"simulation {sim_cfg.simulation_id}"}
+        o.seed_elements(lat    = sim_cfg.spill_lat,
+                        lon    = sim_cfg.spill_lon,
+                        number = sim_cfg.num_seed_elements,
+                        radius = sim_cfg.spill_radius,
+                        time   = datetime.strptime(sim_cfg.start_date, "%Y-%m-%d"),#.replace(hour=1, minute=45, second=0),
                         oil_type = "SOCKEYE SWEET",
+                        **tags,
                         )
-        
 
 
-        ############## RUN SIMULATION ############## 
-        if verbose:
-            print('Simulation started.\n')
+    @staticmethod
+    def batch_key(sim_cfg: DictConfig) -> tuple:
+        """
+        Simulations with the same key only differ by their spill, and can be run together by run_batch.
+        """
+        return (sim_cfg.start_date, sim_cfg.end_date, sim_cfg.min_lon, sim_cfg.max_lon, sim_cfg.min_lat, sim_cfg.max_lat,
+                sim_cfg.time_step, sim_cfg.output_time_step)
 
 
-        result_file = RunASimulation.generate_result_fname(self.sim_cfg_file.simulation_id, 0)
+    def GetRawResultPath(self, simulation_id: int) -> str:
         raw_results_folder = os.path.join(self.result_path, "raw/") 
         os.makedirs(raw_results_folder, exist_ok=True)
-        result_rel_path = os.path.join(raw_results_folder, result_file)  # Path do arquivo onde salvar o resultado da simulação
-
-        o.run(time_step = self.sim_cfg_file.time_step, # Time step para a simulação
-            time_step_output = self.sim_cfg_file.output_time_step, # Time step para ocupar menos espaço de memória
-            end_time = datetime.strptime(self.sim_cfg_file.end_date, "%Y-%m-%d"),
-            outfile = result_rel_path,
-            stop_on_error = True,
-            )
- 
-        result_gif_file = RunASimulation.generate_result_fname(self.sim_cfg_file.simulation_id, 1)
+        return os.path.join(raw_results_folder, RunASimulation.generate_result_fname(simulation_id, 0))  # Path do arquivo onde salvar o resultado da simulação
+
+
+    def GetAnimationPath(self, simulation_id: int, extension: int = 1) -> str:
         gif_results_folder = os.path.join(self.result_path, "gif/") 
         os.makedirs(gif_results_folder, exist_ok=True)
-        gif_rel_path = os.path.join(gif_results_folder, result_gif_file)
-        if ((self.gif_config.min_lon < self.sim_cfg_file.min_lon) or (self.gif_config.min_lat < self.sim_cfg_file.min_lat) or (self.gif_config.max_lon > self.sim_cfg_file.max_lon) or (self.gif_config.max_lat > self.sim_cfg_file.max_lat)):
+        return os.path.join(gif_results_folder, RunASimulation.generate_result_fname(simulation_id, extension))
+
+
+    def save_animation(self, o, sim_cfg: DictConfig):
+        gif_rel_path = self.GetAnimationPath(sim_cfg.simulation_id)
+        if ((self.gif_config.min_lon < sim_cfg.min_lon) or (self.gif_config.min_lat < sim_cfg.min_lat) or (self.gif_config.max_lon > sim_cfg.max_lon) or (self.gif_config.max_lat > sim_cfg.max_lat)):
             print("Cuidado: o gif tem um quadramento maior do que foi simulado, e as particulas foram desativadas fora do domínio.")
         o.animation(filename=str(gif_rel_path), corners = [self.gif_config.min_lon, self.gif_config.max_lon, self.gif_config.min_lat, self.gif_config.max_lat], background=['x_sea_water_velocity', 'y_sea_water_velocity'], vmin=-1, vmax=1, fast=True, fps=6)
 
 
+    def render_animation(self, verbose) -> float:
+        """
+        Renders the animation of the current simulation from its saved result file, over the current fields of its data window,
+        with Opendrift or, with `renderer: "fast"` in the animation section of main.yaml, with FrameRenderer.
+
+        Returns:
+            float: The rendering time (s).
+        """
+        start = time.perf_counter()
+        F = self.GetCoveringFetch([self.sim_cfg_file.simulation_id])
+        reader_current, reader_wind, _, _ = RunASimulation.open_readers(F)
+        if self.animation_cfg.get("renderer", "opendrift") == "fast":
+            with Tracer.span("FrameRenderer.render", "animation", simulation_id=self.sim_cfg_file.simulation_id):
+                extension = 2 if self.animation_cfg.get("format", "gif") == "webp" else 1
+                FrameRenderer.from_config(self.gif_config, self.animation_cfg).render(self.GetRawResultPath(self.sim_cfg_file.simulation_id), reader_current,
+                                                                                      self.GetAnimationPath(self.sim_cfg_file.simulation_id, extension), fps=6)
+            return time.perf_counter() - start
+        o = OpenOil(loglevel=20 if verbose else 50)
+        o.io_import_file(self.GetRawResultPath(self.sim_cfg_file.simulation_id))
+        o.add_reader([reader_current, reader_wind])
+        with Tracer.span("o.animation", "animation", simulation_id=self.sim_cfg_file.simulation_id):
+            self.save_animation(o, self.sim_cfg_file)
+        return time.perf_counter() - start
+
+
+    def run_simulation(self, verbose, rk4):
+
+        ############## FETCH DATA ##############
+        # Busca os dados já baixados (arquivo único, lista de tiles ou arquivo maior do cache) que cobrem a simulação
+        F = self.GetCoveringFetch([self.sim_cfg_file.simulation_id])
+        
+        print(f"\n{self.sim_cfg_file.simulation_id+1}a simulação iniciada ...")
+
+
+        os.makedirs(self.result_path, exist_ok=True)
+
+        metrics = SimulationMetrics()
+        o = OpenOil(loglevel=20 if verbose else 50)
+        
+
+        ############## ADD READERS ##############
+        
+        with metrics.stage("reader_setup"):
+            reader_current, reader_wind, _, reader_setup_saved = RunASimulation.open_readers(F)
+        o.add_reader([reader_current, reader_wind])
+
+        if verbose:
+            print('Current Reader details:\n')
+            print(reader_current)
+
+            print('Wind Reader details:\n')
+            print(reader_wind)
+
+        RunASimulation.configure_model(o, self.sim_cfg_file, rk4)
+
+        if verbose:
+            print('Seeding elements.\n')
+        with metrics.stage("seeding"):
+            RunASimulation.seed_spill(o, self.sim_cfg_file)
+        
+
+
+        ############## RUN SIMULATION ############## 
+        if verbose:
+            print('Simulation started.\n')
+
+
+        result_rel_path = self.GetRawResultPath(self.sim_cfg_file.simulation_id)
+
+        metrics.watch_writing(o)
+        with metrics.stage("integration"):
+            o.run(time_step = self.sim_cfg_file.time_step, # Time step para a simulação
+                time_step_output = self.sim_cfg_file.output_time_step, # Time step para ocupar menos espaço de memória
+                end_time = datetime.strptime(self.sim_cfg_file.end_date, "%Y-%m-%d"),
+                outfile = result_rel_path,
+                stop_on_error = True,
+                )
+
+
         print(f"... simulação {self.sim_cfg_file.simulation_id+1} terminada com sucesso")
-        return 
\ No newline at end of file
+        return {
+            **metrics.record(o, self.sim_cfg_file, result_rel_path),
+            "reader_setup_saved_s": reader_setup_saved,
+        }
+
+
+    @staticmethod
+    def split_batch_result(batch_fname: str, result_fnames: list):
+        """
+        Splits the output of a batched run into one file per spill, the elements of the i-th file being those
+        seeded with origin_marker i. Each file is renumbered as if its spill had been run alone. The batch file is removed.
+        """
+        with xr.open_dataset(batch_fname) as batch:
+            batch_markers = batch.origin_marker.max(dim="time").values
+            for origin_marker, result_fname in enumerate(result_fnames):
+                sim_result = batch.isel(trajectory=np.flatnonzero(batch_markers == origin_marker))
+                sim_result = sim_result.assign_coords(trajectory=np.arange(sim_result.sizes["trajectory"], dtype=batch.trajectory.dtype))
+                sim_result["origin_marker"] = sim_result.origin_marker.where(sim_result.origin_marker.isnull(), 0).assign_attrs(
+                    {**batch.origin_marker.attrs, "flag_values": np.array([0], dtype=np.int32), "flag_meanings": "Seed_0", "minval": 0, "maxval": 0})
+                sim_result.to_netcdf(result_fname)
+        os.remove(batch_fname)
+
+
+    def run_batch(self, sim_cfgs: list, verbose, rk4) -> list:
+        """
+        Runs several spills sharing the same dates and domain (see batch_key) in a single Opendrift run: the
+        elements of each spill are tagged with their own origin_marker, and the output is split afterwards
+        into one result file (and one animation) per simulation_id, as if each had been run separately.
+
+        Args:
+            sim_cfgs (list): The configurations of the simulations of the batch.
+
+        Returns:
+            list: The statistics of each simulation, as returned by run_simulation.
+        """
+        first_cfg = sim_cfgs[0]
+        self.set_sim_config_file(first_cfg)
+        F = self.GetCoveringFetch([sim_cfg.simulation_id for sim_cfg in sim_cfgs])
+
+        print(f"\nSimulações {', '.join(str(sim_cfg.simulation_id+1) for sim_cfg in sim_cfgs)} iniciadas em um único run ...")
+        os.makedirs(self.result_path, exist_ok=True)
+
+        metrics = SimulationMetrics()
+        o = OpenOil(loglevel=20 if verbose else 50)
+        with metrics.stage("reader_setup"):
+            reader_current, reader_wind, _, reader_setup_saved = RunASimulation.open_readers(F)
+        o.add_reader([reader_current, reader_wind])
+        RunASimulation.configure_model(o, first_cfg, rk4)
+        with metrics.stage("seeding"):
+            for origin_marker, sim_cfg in enumerate(sim_cfgs):
+                RunASimulation.seed_spill(o, sim_cfg, origin_marker)
+
+        raw_results_folder = os.path.dirname(self.GetRawResultPath(first_cfg.simulation_id))
+        batch_rel_path = os.path.join(raw_results_folder, f"batch_{first_cfg.simulation_id:04d}.nc")
+        metrics.watch_writing(o)
+        with metrics.stage("integration"):
+            o.run(time_step = first_cfg.time_step,
+                time_step_output = first_cfg.output_time_step,
+                end_time = datetime.strptime(first_cfg.end_date, "%Y-%m-%d"),
+                outfile = batch_rel_path,
+                stop_on_error = True,
+                )
+
+        # Separa o resultado do batch em um arquivo por simulação
+        with metrics.stage("writing"):
+            RunASimulation.split_batch_result(batch_rel_path, [self.GetRawResultPath(sim_cfg.simulation_id) for sim_cfg in sim_cfgs])
+
+        print(f"... simulações {', '.join(str(sim_cfg.simulation_id+1) for sim_cfg in sim_cfgs)} terminadas com sucesso")
+        return [{
+            **metrics.record(o, sim_cfg, self.GetRawResultPath(sim_cfg.simulation_id), len(sim_cfgs)),
+            "reader_setup_saved_s": reader_setup_saved / len(sim_cfgs),
+        } for sim_cfg in sim_cfgs]
@@ -0,0 +1,91 @@
+#@brief Space-filling sampling designs of the spill parameters, and the coverage of the spill area they achieve
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import math
+import numpy as np
+from scipy.stats import qmc
+from scipy.spatial import cKDTree
+
+
+class SamplingDesign:
+    """
+    Chooses the (start date, spill longitude, spill latitude, spill radius) of each run of a sweep within a budget
+    of runs, instead of the full Cartesian product of `n_diff_center_spill_pos` random longitudes and latitudes:
+
+        * "lhs": Latin hypercube, each of the budget runs alone in its slice of every parameter.
+        * "sobol", "halton": scrambled low-discrepancy sequences (Sobol is best balanced with a power of 2 runs).
+        * "grid": every start date and radius crossed with a k x k grid of spill cells, each spill drawn at random
+          within its cell, k as large as the budget allows (k x k x dates x radiuses <= budget).
+
+    The designs draw points in the unit hypercube: longitudes and latitudes are scaled to the spill area, and
+    the start date and radius, which can only take the values of the reference configuration, are the slot of
+    the unit interval the point falls in. A design thus keeps its stratification on the discrete parameters.
+
+    coverage measures how well the spill centers cover the spill area, to compare the designs with the product
+    at equal quality rather than at equal number of runs (see benchmarks/bench_sampling_designs.py).
+    """
+    DESIGNS = ("product", "lhs", "sobol", "halton", "grid")
+    KM_PER_DEGREE = 111.32
+
+    @staticmethod
+    def unit_points(design: str, nb_runs: int, seed=None) -> np.ndarray:
+        """
+        Returns `nb_runs` points of the design in [0, 1)^4, as (start date, longitude, latitude, radius).
+        """
+        if design == "lhs":
+            return qmc.LatinHypercube(d=4, seed=seed).random(nb_runs)
+        if design == "sobol":
+            return qmc.Sobol(d=4, scramble=True, seed=seed).random(nb_runs)
+        if design == "halton":
+            return qmc.Halton(d=4, scramble=True, seed=seed).random(nb_runs)
+        raise ValueError(f"SamplingDesign: unknown design '{design}', expected one of {SamplingDesign.DESIGNS[1:]}.")
+
+    @staticmethod
+    def sample(design: str, nb_runs: int, nb_dates: int, nb_radiuses: int, seed=None) -> tuple:
+        """
+        Draws the runs of a design.
+
+        Returns:
+            tuple: The index of the start date, the longitude and latitude in [0, 1) of the spill area, and the
+                index of the radius of each run.
+        """
+        if design == "grid":
+            rng = np.random.default_rng(seed)
+            nb_cells = math.isqrt(nb_runs // (nb_dates * nb_radiuses))
+            if nb_cells < 1:
+                raise ValueError(f"SamplingDesign: a budget of {nb_runs} runs can't hold the 'grid' design, which needs at least "
+                                 f"{nb_dates} dates x {nb_radiuses} radiuses = {nb_dates * nb_radiuses} runs (a single spill cell).")
+            date_idx, lon_cell, lat_cell, radius_idx = (idx.ravel() for idx in np.meshgrid(
+                np.arange(nb_dates), np.arange(nb_cells), np.arange(nb_cells), np.arange(nb_radiuses), indexing="ij"))
+            return date_idx, (lon_cell + rng.random(len(lon_cell))) / nb_cells, (lat_cell + rng.random(len(lat_cell))) / nb_cells, radius_idx
+        points = SamplingDesign.unit_points(design, nb_runs, seed)
+        return (np.floor(points[:, 0] * nb_dates).astype(int), points[:, 1], points[:, 2],
+                np.floor(points[:, 3] * nb_radiuses).astype(int))
+
+
+    @staticmethod
+    def coverage(lons: np.ndarray, lats: np.ndarray, bounds: tuple, resolution: int = 200) -> dict:
+        """
+        Measures the coverage of the spill area `bounds` (min_lon, max_lon, min_lat, max_lat) by spill centers.
+
+        Returns:
+            dict: "fill_distance_km", the largest distance from a point of the area to its nearest spill center
+                (the smaller, the better covered), "mean_distance_km", the mean of that distance over the area,
+                and "discrepancy", the centered L2 discrepancy of the centers in the area (0 for a perfectly even
+                spread).
+        """
+        min_lon, max_lon, min_lat, max_lat = bounds
+        km_per_lon = SamplingDesign.KM_PER_DEGREE * np.cos(np.radians((min_lat + max_lat) / 2))
+        centers = np.unique(np.column_stack([lons, lats]), axis=0)
+        tree = cKDTree(np.column_stack([centers[:, 0] * km_per_lon, centers[:, 1] * SamplingDesign.KM_PER_DEGREE]))
+        grid_lons, grid_lats = np.meshgrid(np.linspace(min_lon, max_lon, resolution), np.linspace(min_lat, max_lat, resolution))
+        distances, _ = tree.query(np.column_stack([grid_lons.ravel() * km_per_lon, grid_lats.ravel() * SamplingDesign.KM_PER_DEGREE]))
+        unit = np.clip(np.column_stack([(centers[:, 0] - min_lon) / (max_lon - min_lon), (centers[:, 1] - min_lat) / (max_lat - min_lat)]), 0, 1)
+        return {"fill_distance_km": float(distances.max()), "mean_distance_km": float(distances.mean()),
+                "discrepancy": float(qmc.discrepancy(unit)) if len(unit) > 1 else float("nan")}
+
+    @staticmethod
+    def describe(coverage: dict, nb_centers: int):
+        print(f"  *  Cobertura da área de derramamento por {nb_centers} centros distintos: distância de preenchimento "
+              f"{coverage['fill_distance_km']:.1f} km, distância média {coverage['mean_distance_km']:.1f} km, discrepância {coverage['discrepancy']:.4f}.")
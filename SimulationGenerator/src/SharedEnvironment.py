@@ -0,0 +1,110 @@
+#@brief Share environment fields between the pool workers through shared memory
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import sys
+from multiprocessing import shared_memory, resource_tracker
+from datetime import timedelta
+import numpy as np
+import xarray as xr
+from opendrift.readers import reader_netCDF_CF_generic
+
+
+class SharedEnvironment:
+    """
+    Loads a slab (time window and bounding box) of an environment source once, in the parent process,
+    into `multiprocessing.shared_memory` blocks. Workers attach to the blocks through a SharedMemoryReader,
+    so adding workers does not duplicate the fields in memory.
+
+    Attributes:
+        metadata (dict): What a worker needs to attach: the name, shape and dtype of the block of each
+            variable, plus the (small) coordinates and attributes of the dataset. It is picklable.
+        blocks (list): The shared memory blocks owned by the parent process.
+    """
+    # Margin (degrees) kept around the bounding box so that readers can buffer around the particles
+    MARGIN_DEGREES = 0.5
+    # Margin kept around the time window, so that the last time step can still be interpolated
+    MARGIN_TIME = timedelta(days=1)
+    # Number of time steps copied at once into shared memory, to bound the memory used while loading
+    LOAD_CHUNK = 24
+
+    def __init__(self, source, bbox: tuple, start, end):
+        """
+        Copies the slab of `source` (a file or a list of tiles) covering `bbox` (min_lon, max_lon, min_lat, max_lat)
+        between `start` and `end` into shared memory.
+        """
+        self.blocks = []
+        ds = xr.open_mfdataset(source) if isinstance(source, (list, tuple)) else xr.open_dataset(source)
+        with ds:
+            ds = ds.sel(longitude = slice(bbox[0] - SharedEnvironment.MARGIN_DEGREES, bbox[1] + SharedEnvironment.MARGIN_DEGREES),
+                        latitude  = slice(bbox[2] - SharedEnvironment.MARGIN_DEGREES, bbox[3] + SharedEnvironment.MARGIN_DEGREES),
+                        time      = slice(start - SharedEnvironment.MARGIN_TIME, end + SharedEnvironment.MARGIN_TIME))
+            self.metadata = {
+                "name"     : f"shared_memory:{source if isinstance(source, str) else source[0]}",
+                "attrs"    : dict(ds.attrs),
+                "coords"   : {name: (coord.dims, coord.values, dict(coord.attrs)) for name, coord in ds.coords.items()},
+                "variables": {},
+            }
+            for var_name, var in ds.data_vars.items():
+                block = shared_memory.SharedMemory(create=True, size=max(var.nbytes, 1))
+                self.blocks.append(block)
+                array = np.ndarray(var.shape, dtype=var.dtype, buffer=block.buf)
+                for i in range(0, var.sizes["time"], SharedEnvironment.LOAD_CHUNK):
+                    array[i:i+SharedEnvironment.LOAD_CHUNK] = var.isel(time=slice(i, i+SharedEnvironment.LOAD_CHUNK)).values
+                self.metadata["variables"][var_name] = {
+                    "block": block.name,
+                    "shape": var.shape,
+                    "dtype": var.dtype.str,
+                    "dims" : var.dims,
+                    "attrs": dict(var.attrs),
+                }
+
+    def nbytes(self) -> int:
+        return sum(block.size for block in self.blocks)
+
+    def release(self):
+        """
+        Frees the shared memory blocks. Must be called by the parent once the workers are done.
+        """
+        for block in self.blocks:
+            block.close()
+            if sys.version_info < (3, 13):
+                # Os workers desregistram o bloco ao se anexar (ver SharedMemoryReader.attach), no resource tracker que
+                # compartilham com o processo pai: ele é registrado de novo para que unlink o desregistre sem erro
+                resource_tracker.register(block._name, "shared_memory")
+            block.unlink()
+        self.blocks = []
+
+
+class SharedMemoryReader(reader_netCDF_CF_generic.Reader):
+    """
+    In-memory Opendrift reader over the fields shared by a SharedEnvironment. The dataset handed to the
+    generic CF reader wraps the shared blocks without copying them.
+
+    Attributes:
+        blocks (list): The attached shared memory blocks, kept alive as long as the reader.
+    """
+    def __init__(self, metadata: dict):
+        self.blocks = []
+        data_vars = {}
+        for var_name, var in metadata["variables"].items():
+            block = SharedMemoryReader.attach(var["block"])
+            self.blocks.append(block)
+            array = np.ndarray(var["shape"], dtype=np.dtype(var["dtype"]), buffer=block.buf)
+            array.flags.writeable = False
+            data_vars[var_name] = (var["dims"], array, var["attrs"])
+        ds = xr.Dataset(data_vars=data_vars, coords=metadata["coords"], attrs=metadata["attrs"])
+        super().__init__(ds, name=metadata["name"])
+
+    @staticmethod
+    def attach(name: str) -> shared_memory.SharedMemory:
+        """
+        Attaches to a block owned by the parent process without leaving it registered with the resource tracker,
+        which would otherwise unlink it (and warn about a leak) when the worker exits, while other workers still
+        use it. Python 3.13 has track=False for this; before, the block is unregistered right after attaching.
+        """
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
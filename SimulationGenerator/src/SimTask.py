@@ -0,0 +1,33 @@
+#@brief Compact record of the parameters of one simulation, sent to the pool workers
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+
+class SimTask:
+    """
+    The parameters of one simulation, with the same names as in the simulation configuration files, so that
+    RunASimulation reads a SimTask as it reads a DictConfig (`task.spill_lon`, ...).
+
+    A composed DictConfig pickles its whole node tree (keys, metadata, parent references) while a SimTask
+    pickles as a tuple of its values, which keeps the task list small and cheap to dispatch to the workers.
+    """
+    FIELDS = ("simulation_id", "start_date", "end_date", "spill_lon", "spill_lat", "spill_radius",
+              "time_step", "output_time_step", "num_seed_elements", "min_lon", "max_lon", "min_lat", "max_lat")
+    __slots__ = FIELDS
+
+    def __init__(self, *values):
+        for field, value in zip(SimTask.FIELDS, values):
+            setattr(self, field, value)
+
+    @classmethod
+    def from_cfg(cls, sim_cfg):
+        """
+        Builds the task of a simulation configuration (DictConfig, or any object with the same fields).
+        """
+        return cls(*(getattr(sim_cfg, field) for field in SimTask.FIELDS))
+
+    def __reduce__(self):
+        return (SimTask, tuple(getattr(self, field) for field in SimTask.FIELDS))
+
+    def __repr__(self):
+        return f"SimTask({', '.join(f'{field}={getattr(self, field)!r}' for field in SimTask.FIELDS)})"
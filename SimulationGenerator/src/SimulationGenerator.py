@@ -2,14 +2,13 @@
 #@author Louis Pottier, Instituto Tecgraf/PUC-Rio
 #@date December 2025
 
-from hydra import initialize, compose
-from omegaconf import OmegaConf
 import os
 from datetime import datetime, timedelta
-from itertools import product
 import numpy as np
 
 from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+from src.Tracer import Tracer
+from src.SamplingDesign import SamplingDesign
 
 class SimulationGenerator(GeneralSimulationGeneration):
 
@@ -27,7 +26,7 @@ class SimulationGenerator(GeneralSimulationGeneration):
                 if overwrite:
                     print(f"Overwriting existing results folder {relpath}.")
                 else:
-                    raise FileExistsError(f"YAML configuration file '{relpath}' already exists. Select the overwrite option or rename the result folder.")
+                    raise FileExistsError(f"Configuration list file '{relpath}' already exists. Select the overwrite option or rename the result folder.")
 
         ### CUSTOMIZATION OF CONFIGURATION FILES TO BE GENERATED ###
         print("\n")
@@ -42,41 +41,60 @@ class SimulationGenerator(GeneralSimulationGeneration):
         print(f"  *  {self.param_cfg.nb_time_slots} time ranges of {self.param_cfg.duration_days} days each have been configured.")
 
 
-        #Longitude and latitude position of the randomly-chosen oil spill centers
+        #Longitude and latitude position of the oil spill centers
         media_lon =  (self.gif_cfg.min_lon+self.gif_cfg.max_lon)/2 # center longitude of the frame
         media_lat =  (self.gif_cfg.min_lat+self.gif_cfg.max_lat)/2 # center latitude of the frame
         range_lon = (self.gif_cfg.min_lon-self.gif_cfg.max_lon)*self.param_cfg.constrain_rate # dentro de um quadro de tamanho de 50% do quadro inteiro
         range_lat = (self.gif_cfg.min_lat-self.gif_cfg.max_lat)*self.param_cfg.constrain_rate # dentro de um quadro de tamanho de 50% do quadro inteiro
-        spill_lons = []
-        spill_lats = []
-        for _ in range(self.param_cfg.n_diff_center_spill_pos):
-            spill_lons.append(media_lon+np.random.uniform(-range_lon/2, range_lon/2))
-            spill_lats.append(media_lat+np.random.uniform(-range_lat/2, range_lat/2))
-        print(f"  *  {self.param_cfg.n_diff_center_spill_pos} spill center positions randomly chosen between longitude range [{media_lon-range_lon/2}, {media_lon+range_lon/2}] and latitude range [{media_lat-range_lat/2}, {media_lat+range_lat/2}].")
-        
-        #Radius values
-        print(f"  *  {len(self.param_cfg.spill_radius)} spill center radiuses manually chosen.")
-        combinations = list(product(start_date_list, spill_lons, spill_lats, self.param_cfg.spill_radius))
+        spill_radiuses = np.asarray(list(self.param_cfg.spill_radius))
+        sampling_cfg = self.principal_cfg.get("sampling", {})
+        design = sampling_cfg.get("design", "product")
+        if design == "product":
+            spill_lons = []
+            spill_lats = []
+            for _ in range(self.param_cfg.n_diff_center_spill_pos):
+                spill_lons.append(media_lon+np.random.uniform(-range_lon/2, range_lon/2))
+                spill_lats.append(media_lat+np.random.uniform(-range_lat/2, range_lat/2))
+            print(f"  *  {self.param_cfg.n_diff_center_spill_pos} spill center positions randomly chosen between longitude range [{media_lon-range_lon/2}, {media_lon+range_lon/2}] and latitude range [{media_lat-range_lat/2}, {media_lat+range_lat/2}].")
+
+            #Radius values
+            print(f"  *  {len(self.param_cfg.spill_radius)} spill center radiuses manually chosen.")
+            shape = (len(start_date_list), len(spill_lons), len(spill_lats), len(spill_radiuses))
+            nb_sims = int(np.prod(shape))
+            # Produto cartesiano, na ordem de itertools.product
+            date_idx, lon_idx, lat_idx, radius_idx = np.unravel_index(np.arange(nb_sims), shape)
+            run_lons = np.asarray(spill_lons)[lon_idx]
+            run_lats = np.asarray(spill_lats)[lat_idx]
+            summary = f"{len(spill_lons)} x {len(spill_lats)} x {len(self.param_cfg.spill_radius)} x {len(start_date_list)} = {nb_sims}"
+        else:
+            # Plano de amostragem com orçamento de simulações, por padrão o mesmo número que o produto cartesiano
+            nb_runs = sampling_cfg.get("nb_runs", 0) or len(start_date_list) * self.param_cfg.n_diff_center_spill_pos**2 * len(spill_radiuses)
+            date_idx, unit_lons, unit_lats, radius_idx = SamplingDesign.sample(design, nb_runs, len(start_date_list), len(spill_radiuses), sampling_cfg.get("seed", None))
+            run_lons = media_lon + (unit_lons - 0.5) * abs(range_lon)
+            run_lats = media_lat + (unit_lats - 0.5) * abs(range_lat)
+            nb_sims = len(date_idx)
+            print(f"  *  {nb_sims} spills chosen by the '{design}' design between longitude range [{media_lon-abs(range_lon)/2}, {media_lon+abs(range_lon)/2}] and latitude range [{media_lat-abs(range_lat)/2}, {media_lat+abs(range_lat)/2}], among {len(start_date_list)} time ranges and {len(spill_radiuses)} radiuses.")
+            summary = f"Plano '{design}': {nb_sims}"
+        spill_area = (media_lon-abs(range_lon)/2, media_lon+abs(range_lon)/2, media_lat-abs(range_lat)/2, media_lat+abs(range_lat)/2)
+        SamplingDesign.describe(SamplingDesign.coverage(run_lons, run_lats, spill_area), len(np.unique(np.column_stack([run_lons, run_lats]), axis=0)))
 
 
         print("\n")
         print("Creating all configuration files for simulations...")
-        list_sims = []
-        with initialize(config_path=self.config_folder, version_base=None):
-            for idx, (start_date, lon, lat, radius) in enumerate(combinations):
-                overrides = [
-                    f"simulation_id={idx}",
-                    f"start_date={start_date.strftime('%Y-%m-%d')}",
-                    f"end_date={(start_date + timedelta(days=self.param_cfg.duration_days)).strftime('%Y-%m-%d')}",
-                    f"spill_lon={lon}",
-                    f"spill_lat={lat}",
-                    f"spill_radius={radius}",
-                    f"time_step={time_step__corrected}"
-                ]
-                cfg_override = compose(config_name=self.principal_cfg.configs.base_sim_config, overrides=overrides)
-                list_sims.append(cfg_override)
-
-        print("Saving YAML file...")
-        OmegaConf.save(config = list_sims, f = relpath)
-        print(f"{len(spill_lons)} x {len(spill_lats)} x {len(self.param_cfg.spill_radius)} x {len(start_date_list)} = {len(combinations)} arquivos de configuração gerados em '{relpath}'.")
+        with Tracer.span("config composition", configs=nb_sims):
+            # Colunas montadas sobre a configuração de referência, sem passar pelo Hydra
+            columns = self.reference_columns(nb_sims)
+            columns.update({
+                "simulation_id": np.arange(nb_sims),
+                "start_date"   : np.array([start_date.strftime('%Y-%m-%d') for start_date in start_date_list])[date_idx],
+                "end_date"     : np.array([(start_date + timedelta(days=self.param_cfg.duration_days)).strftime('%Y-%m-%d') for start_date in start_date_list])[date_idx],
+                "spill_lon"    : run_lons,
+                "spill_lat"    : run_lats,
+                "spill_radius" : spill_radiuses[radius_idx],
+                "time_step"    : time_step__corrected,
+            })
+
+        print("Saving configuration list...")
+        self.save_configlist(columns, nb_sims, relpath)
+        print(f"{summary} arquivos de configuração gerados em '{relpath}'.")
         return
\ No newline at end of file
@@ -0,0 +1,160 @@
+#@brief Per-simulation timings and resource metrics, written to a table in the results folder
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import csv
+import time
+from contextlib import contextmanager
+
+import psutil
+
+from src.Tracer import Tracer
+
+
+class SimulationMetrics:
+    """
+    Measures where the time of one Opendrift run goes: the wall time of each stage (reader setup, seeding,
+    integration, NetCDF writing), the number of calculation steps, the peak resident memory of the worker and
+    the size of the result file. The animation is rendered afterwards from the result file (see
+    GeneralSimulationGeneration.render_animations), which adds its time to the metrics with add_animation.
+
+    The NetCDF output is written by Opendrift during `o.run`, each time its buffer is full: watch_writing wraps
+    the writing methods of the model so that their time is counted as writing and not as integration.
+
+    The metrics of each simulation are stored in its completion journal record, and gathered by write_table
+    in `metrics.csv` in the results folder, one row per simulation.
+
+    Attributes:
+        times (dict): The wall time (s) of each stage.
+    """
+    STAGES = ("reader_setup", "seeding", "integration", "writing", "animation")
+    COLUMNS = ("simulation_id", "batch_size", *(f"{stage}_s" for stage in STAGES), "total_s",
+               "steps", "steps_per_s", "num_elements", "peak_rss_mb", "output_bytes")
+    METRICS_FNAME = "metrics.csv"
+    # Nome de cada etapa no trace (ver Tracer)
+    SPAN_NAMES = {"integration": "o.run"}
+
+    def __init__(self):
+        self.times = dict.fromkeys(SimulationMetrics.STAGES, 0.0)
+        self.run_writing_s = 0.0 # Escrita feita pelo modelo dentro de o.run
+        self.start = time.perf_counter()
+        SimulationMetrics.reset_peak_rss()
+
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            with Tracer.span(SimulationMetrics.SPAN_NAMES.get(name, name), "simulation"):
+                yield
+        finally:
+            self.times[name] += time.perf_counter() - start
+
+    def watch_writing(self, o):
+        """
+        Counts the time spent by the model `o` writing its output file as the writing stage.
+        """
+        def timed(method):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.run_writing_s += time.perf_counter() - start
+            return wrapper
+        o.io_write_buffer = timed(o.io_write_buffer)
+        o.io_close = timed(o.io_close)
+
+
+    @staticmethod
+    def reset_peak_rss():
+        """
+        Resets the peak resident memory of the process, so that it measures the current simulation only
+        (Linux; elsewhere the peak of the whole process is kept).
+        """
+        try:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+    @staticmethod
+    def peak_rss_mb() -> float:
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss) / 1024**2
+
+
+    def record(self, o, sim_cfg, result_fname: str, batch_size: int = 1) -> dict:
+        """
+        Returns the metrics of the simulation `sim_cfg`, run by the model `o`.
+
+        Args:
+            batch_size (int): Number of simulations run together by `o` (see RunASimulation.run_batch): the times
+                of the shared stages are divided among them.
+        """
+        # A escrita acontece dentro de o.run: ela é descontada da integração
+        integration_s = self.times["integration"] - self.run_writing_s
+        times = {stage: duration / batch_size for stage, duration in self.times.items()}
+        times["integration"] = integration_s / batch_size
+        times["writing"] = (self.times["writing"] + self.run_writing_s) / batch_size
+        return {
+            "simulation_id": sim_cfg.simulation_id,
+            "batch_size"   : batch_size,
+            **{f"{stage}_s": duration for stage, duration in times.items()},
+            "total_s"      : (time.perf_counter() - self.start) / batch_size,
+            "steps"        : o.steps_calculation,
+            "steps_per_s"  : o.steps_calculation / integration_s if integration_s > 0 else 0.0,
+            "num_elements" : sim_cfg.num_seed_elements,
+            "peak_rss_mb"  : SimulationMetrics.peak_rss_mb(),
+            "output_bytes" : os.path.getsize(result_fname),
+        }
+
+
+    @staticmethod
+    def add_animation(metrics: dict, animation_s: float) -> dict:
+        return {**metrics, "animation_s": animation_s, "total_s": metrics["total_s"] - metrics["animation_s"] + animation_s}
+
+
+    @staticmethod
+    def write_table(records: dict, result_path: str) -> str:
+        """
+        Writes the metrics of the completed simulations of the journal `records` to `metrics.csv`.
+
+        Returns:
+            str: The table file.
+        """
+        table_fname = os.path.join(result_path, SimulationMetrics.METRICS_FNAME)
+        with open(table_fname, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SimulationMetrics.COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for simulation_id in sorted(records):
+                metrics = records[simulation_id].get("metrics")
+                if records[simulation_id].get("status") == "done" and metrics:
+                    writer.writerow(metrics)
+        return table_fname
+
+    @staticmethod
+    def summarize(metrics: list):
+        """
+        Prints the share of each stage in the time of the simulations, and their mean throughput and memory.
+        """
+        if not metrics:
+            return
+        total_s = sum(m["total_s"] for m in metrics)
+        print(f"Métricas de {len(metrics)} simulações ({total_s:.1f} s no total, {total_s/len(metrics):.2f} s por simulação):")
+        for stage in SimulationMetrics.STAGES:
+            stage_s = sum(m[f"{stage}_s"] for m in metrics)
+            print(f"     {stage:>12}: {stage_s/len(metrics):8.3f} s por simulação ({100*stage_s/total_s if total_s > 0 else 0:5.1f}%)")
+        other_s = total_s - sum(m[f"{stage}_s"] for m in metrics for stage in SimulationMetrics.STAGES)
+        print(f"     {'outros':>12}: {other_s/len(metrics):8.3f} s por simulação ({100*other_s/total_s if total_s > 0 else 0:5.1f}%)")
+        print(f"     {sum(m['steps_per_s'] for m in metrics)/len(metrics):.1f} passos/s em média, "
+              f"pico de memória de {max(m['peak_rss_mb'] for m in metrics):.0f} MB por worker, "
+              f"{sum(m['output_bytes'] for m in metrics)/1024**2:.1f} MB de resultados.")
@@ -0,0 +1,145 @@
+#@brief Isolate the failures of the simulations of a sweep: timeouts, retries and failure report
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import time
+import signal
+import traceback
+import multiprocessing
+from contextlib import contextmanager
+from tqdm import tqdm
+
+from exceptions.CustomExceptions import SimulationTimeoutError
+
+
+class TaskGuard:
+    """
+    Runs the tasks of a worker so that a failing simulation does not abort the sweep: each task gets a
+    wall-clock time limit and a bounded number of retries, and a task that keeps failing is returned as a
+    failure record (simulation ids, and type, message, traceback and duration of each attempt) instead of
+    raising in the pool. A chunk whose worker dies outright is also returned as a failure (see dispatch).
+    The failure records of the sweep are written to `failures.json` in the results folder.
+    """
+    FAILURE_REPORT_FNAME = "failures.json"
+    # Intervalo entre duas verificações dos workers, e prazo dado ao resultado de um chunk cujo worker terminou
+    POLL_S = 1.0
+    GRACE_S = 5.0
+
+    @staticmethod
+    @contextmanager
+    def time_limit(seconds: float, simulation_ids: list):
+        """
+        Raises SimulationTimeoutError in the block after `seconds` of wall-clock time (0 for no limit).
+        Relies on SIGALRM: on platforms without it (Windows), the block runs without a time limit.
+        """
+        if not seconds or not hasattr(signal, "SIGALRM"):
+            yield
+            return
+        def on_timeout(signum, frame):
+            raise SimulationTimeoutError(f"Simulation(s) {simulation_ids} exceeded the time limit of {seconds} s.")
+        previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+
+    @staticmethod
+    def simulation_ids(task) -> list:
+        return [t.simulation_id for t in task] if isinstance(task, list) else [task.simulation_id]
+
+    @staticmethod
+    def run(simulate, task, timeout_s: float = 0, max_retries: int = 0) -> tuple:
+        """
+        Runs `simulate(task)`, retrying it up to `max_retries` times when it raises or exceeds `timeout_s`.
+
+        Returns:
+            tuple: The result of the task (None if it failed) and its failure record (None if it succeeded).
+        """
+        simulation_ids = TaskGuard.simulation_ids(task)
+        attempts = []
+        for attempt in range(max_retries + 1):
+            start = time.time()
+            try:
+                with TaskGuard.time_limit(timeout_s, simulation_ids):
+                    return simulate(task), None
+            except Exception as e:
+                attempts.append({
+                    "error"     : type(e).__name__,
+                    "message"   : str(e),
+                    "traceback" : traceback.format_exc(),
+                    "duration_s": time.time() - start,
+                    "worker_pid": os.getpid(),
+                })
+                print(f"Simulação(ões) {simulation_ids} falhou(aram) na tentativa {attempt+1}/{max_retries+1}: {type(e).__name__}: {e}")
+        return None, {"simulation_ids": simulation_ids, "attempts": attempts}
+
+
+    @staticmethod
+    def mark_started(started, key):
+        """
+        Records in `started` (see dispatch) the worker running the chunk `key`, and when it started it.
+        """
+        if started is not None:
+            started[key] = (os.getpid(), time.time())
+
+    @staticmethod
+    def dispatch(pool, function, chunk_args: list, chunks: list, progress: bool = True) -> list:
+        """
+        Runs `function` on the pool for each chunk, its arguments followed by a shared dict and the key of the chunk,
+        which the function passes to mark_started.
+
+        A worker that dies outright while running a chunk (segmentation fault in a native library, process killed
+        by the OOM killer), which neither an exception nor SIGALRM can catch, is replaced by the pool but its chunk is
+        lost. Instead of waiting for it forever, the chunk is returned as a failure of all its simulations once its
+        worker is gone and no result came within GRACE_S seconds.
+
+        Returns:
+            list: The (results, failures, timing) of each chunk (see GeneralSimulationGeneration.warp_simulate_chunk), in completion order.
+        """
+        chunk_results = []
+        with multiprocessing.Manager() as manager, tqdm(total=len(chunks), disable=not progress) as progress_bar:
+            started = manager.dict()
+            pending = {key: pool.apply_async(function, (tuple(args) + (started, key),)) for key, args in enumerate(chunk_args)}
+            while pending:
+                next(iter(pending.values())).wait(TaskGuard.POLL_S)
+                for key in [key for key, result in pending.items() if result.ready()]:
+                    chunk_results.append(pending.pop(key).get())
+                    progress_bar.update()
+                alive = {process.pid for process in multiprocessing.active_children()}
+                for key, (pid, start) in dict(started).items():
+                    if key not in pending or pid in alive or pending[key].wait(TaskGuard.GRACE_S):
+                        continue
+                    pending.pop(key)
+                    simulation_ids = [simulation_id for task in chunks[key] for simulation_id in TaskGuard.simulation_ids(task)]
+                    print(f"O worker {pid} terminou sem exceção (segfault, OOM killer...) durante as simulações {simulation_ids}: registradas como falha.")
+                    chunk_results.append(([], [{"simulation_ids": simulation_ids, "attempts": [{
+                        "error"     : "WorkerDied",
+                        "message"   : f"Worker process {pid} died while running the chunk; its simulations without a result can be run again with the resume option.",
+                        "traceback" : "",
+                        "duration_s": time.time() - start,
+                        "worker_pid": pid,
+                    }]}], (pid, start, time.time())))
+                    progress_bar.update()
+        return chunk_results
+
+
+    @staticmethod
+    def write_report(failures: list, result_path: str):
+        """
+        Writes the failure records of a sweep to the results folder, or removes the report of a previous sweep if none failed.
+        """
+        report_fname = os.path.join(result_path, TaskGuard.FAILURE_REPORT_FNAME)
+        if not failures:
+            if os.path.exists(report_fname):
+                os.remove(report_fname)
+            return
+        os.makedirs(result_path, exist_ok=True)
+        with open(report_fname, "w") as f:
+            json.dump(failures, f, indent=2)
+        failed_ids = sorted(simulation_id for failure in failures for simulation_id in failure["simulation_ids"])
+        print(f"Cuidado: {len(failed_ids)} simulações falharam após todas as tentativas: {failed_ids}. Detalhes em '{report_fname}'.")
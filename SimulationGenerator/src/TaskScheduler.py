@@ -0,0 +1,129 @@
+#@brief Order and group the simulations of a sweep by their estimated cost
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import numpy as np
+
+from src.DownloadPlanner import DownloadPlanner
+
+
+class TaskScheduler:
+    """
+    Estimates the cost of each simulation from its parameters, to dispatch the longest simulations first and
+    group the short ones in chunks. Handing out tasks in list order lets long runs (long durations, many
+    particles, small time steps) land at the end of a sweep while most workers are already idle.
+
+    The cost is proportional to the number of element steps (duration / time_step x num_seed_elements, times
+    the number of environment evaluations per step of the advection scheme). Once a completion journal
+    exists, durations measured by previous sweeps calibrate it into seconds.
+
+    Attributes:
+        rk4 (bool): Whether the simulations use the Runge-Kutta 4 scheme.
+        overhead_s (float): Fixed time (s) per simulation (readers, seeding, animation), 0 until calibrated.
+        seconds_per_unit (float): Time (s) per element step, 1 until calibrated (costs are then in element steps).
+    """
+    # Number of environment evaluations per time step of each advection scheme
+    RK4_FACTOR = 4
+    EULER_FACTOR = 1
+    # Minimum number of measured durations to calibrate the model
+    MIN_CALIBRATION_RECORDS = 3
+
+    def __init__(self, rk4: bool):
+        self.rk4 = rk4
+        self.overhead_s = 0.0
+        self.seconds_per_unit = 1.0
+
+
+    def work_units(self, sim_cfg) -> float:
+        """
+        Returns the number of element steps of a simulation, weighted by the advection scheme.
+        """
+        start, end, _ = DownloadPlanner.simulation_window(sim_cfg)
+        duration_s = max((end - start).total_seconds(), sim_cfg.time_step)
+        scheme_factor = TaskScheduler.RK4_FACTOR if self.rk4 else TaskScheduler.EULER_FACTOR
+        return duration_s / sim_cfg.time_step * sim_cfg.num_seed_elements * scheme_factor
+
+    def calibrate(self, records: dict, sim_list) -> bool:
+        """
+        Fits duration = overhead_s + seconds_per_unit x work units on the simulations of `sim_list` completed
+        in a previous sweep.
+
+        Args:
+            records (dict): The completion journal records, by simulation_id.
+
+        Returns:
+            bool: Whether enough durations were available to calibrate the model.
+        """
+        units, durations = [], []
+        for sim_cfg in sim_list:
+            record = records.get(sim_cfg.simulation_id)
+            if record is not None and record.get("status") == "done":
+                units.append(self.work_units(sim_cfg))
+                durations.append(record["duration_s"])
+        if len(units) < TaskScheduler.MIN_CALIBRATION_RECORDS:
+            return False
+        if np.ptp(units) > 0:
+            seconds_per_unit, overhead_s = np.polyfit(units, durations, 1)
+        else: # Todas as simulações têm o mesmo custo: só a média é conhecida
+            seconds_per_unit, overhead_s = 0.0, float(np.mean(durations))
+        self.seconds_per_unit = max(float(seconds_per_unit), 0.0)
+        self.overhead_s = max(float(overhead_s), 0.0)
+        return True
+
+    def cost(self, sim_cfg) -> float:
+        return self.overhead_s + self.seconds_per_unit * self.work_units(sim_cfg)
+
+
+    @staticmethod
+    def make_chunks(items: list, costs: list, number_of_workers: int, chunks_per_worker: int = 4) -> list:
+        """
+        Sorts the items by decreasing cost and groups consecutive items in chunks of about
+        total cost / (number_of_workers x chunks_per_worker): the longest items are dispatched first and alone,
+        while the short items of the tail are grouped to reduce the dispatch overhead.
+
+        Returns:
+            list: The chunks (lists of items), in dispatch order.
+        """
+        order = np.argsort(costs, kind="stable")[::-1]
+        target_cost = sum(costs) / max(number_of_workers * chunks_per_worker, 1)
+        chunks, chunk, chunk_cost = [], [], 0.0
+        for idx in order:
+            if chunk and chunk_cost + costs[idx] > target_cost:
+                chunks.append(chunk)
+                chunk, chunk_cost = [], 0.0
+            chunk.append(items[idx])
+            chunk_cost += costs[idx]
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def chunks_per_child(max_tasks_per_child: int, nb_simulations: int, nb_chunks: int):
+        """
+        Converts a number of simulations after which a worker is restarted into the number of chunks the pool
+        counts (its `maxtasksperchild`), with the mean number of simulations per chunk.
+
+        Returns:
+            int: The number of chunks, at least 1, or None for workers that are never restarted.
+        """
+        if not max_tasks_per_child or not nb_chunks:
+            return None
+        return max(int(round(max_tasks_per_child * nb_chunks / max(nb_simulations, 1))), 1)
+
+
+    @staticmethod
+    def report_utilization(chunk_timings: list, number_of_workers: int, wall_time: float):
+        """
+        Prints the core utilization of a sweep: the time spent running simulations over the time the workers were available.
+
+        Args:
+            chunk_timings (list): The (worker pid, start, end) of each chunk.
+            wall_time (float): The duration (s) of the sweep.
+        """
+        if not chunk_timings or wall_time <= 0:
+            return
+        busy_time = sum(end - start for _, start, end in chunk_timings)
+        # Desde o início da última tarefa, ao menos um worker não tem mais nada a fazer
+        tail_time = max(end for _, _, end in chunk_timings) - max(start for _, start, _ in chunk_timings)
+        print(f"Utilização dos núcleos: {100*busy_time/(number_of_workers*wall_time):.1f}% ({busy_time:.1f} s de simulação em {number_of_workers} workers x {wall_time:.1f} s); "
+              f"a última tarefa começou {tail_time:.1f} s antes do fim do sweep.")
@@ -2,19 +2,29 @@
 #@author Louis Pottier, Instituto Tecgraf/PUC-Rio
 #@date December 2025
 
-from hydra import initialize, compose
-from omegaconf import OmegaConf
 import os
 import numpy as np
+from contextlib import nullcontext
+from multiprocessing import Pool
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import matplotlib
 matplotlib.use("TkAgg")
-import xarray as xr
 import matplotlib.cm as cm
 
 from src.RunASimulation import RunASimulation
 from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+from src.Tracer import Tracer
+from src.ConfigList import ConfigList
+from src.TrajectoryCache import TrajectoryCache
+from src.ErrorStatistics import ErrorStatistics
+from src.RichardsonEstimate import RichardsonEstimate
+from src.TaskScheduler import TaskScheduler
+from src.TaskGuard import TaskGuard
+from src.SimTask import SimTask
+from src.CourantEstimate import CourantEstimate
+from src.DownloadPlanner import DownloadPlanner
+from src.Fetch import Fetch
 
 
 
@@ -47,61 +57,29 @@ class TimestepEstimator(GeneralSimulationGeneration):
                 if overwrite:
                     print(f"     * Overwriting existing results folder {relpath}...")
                 else:
-                    raise FileExistsError(f"YAML configuration file '{relpath}' already exists. Select the overwrite option or rename the result folder.")
+                    raise FileExistsError(f"Configuration list file '{relpath}' already exists. Select the overwrite option or rename the result folder.")
         
         print("\n")
         print("     * Creating all configuration files for simulations...")
-        list_all_sims = []
-        with initialize(config_path=self.config_folder, version_base=None):
-            for idx, timestep in enumerate(ts_list):
-                overrides = [
-                    f"simulation_id={idx}",
-                    f"time_step={timestep}",
-                ]
-                cfg_override = compose(config_name=self.principal_cfg.configs.base_sim_config, overrides=overrides) #self.principal_cfg.configs.base_sim_config is a string
-                list_all_sims.append(cfg_override)
-        OmegaConf.save(config = list_all_sims, f = relpath)
+        with Tracer.span("config composition", configs=len(ts_list)):
+            # Só o id e o time step mudam em relação à configuração de referência
+            columns = self.reference_columns(len(ts_list))
+            columns.update({"simulation_id": np.arange(len(ts_list)), "time_step": np.asarray(ts_list)})
+        self.save_configlist(columns, len(ts_list), relpath)
         print(f"      ... Lista de configurações criada com sucesso em {relpath}.")
         return
 
 
     @staticmethod
     def extrair_lat_lon(folder, number_of_simulations, particleidx = 0, dayslookahead = -1):
-        """Extrai latitude e longitude do dia especificado de cada simulação."""
-        latitudes = []
-        longitudes = []
-
-        # Loop em todos os resultados
-        for i in range(number_of_simulations):
-            arquivo_resultado = f"result_{i:04d}.nc"
-            caminho = f"results/{folder}raw/{arquivo_resultado}"
-
-            ds = xr.open_dataset(caminho, engine="netcdf4")
-            
-            lat_current = ds['lat'].values[particleidx] # For simulation i : [[ part1_day1, part1_day2, ...], [ part2_day1, part2_day2, ...], ...]
-            lon_current = ds['lon'].values[particleidx]
-
-            # Pega o último dia (ou duracao_dias se preferir)
-            latitudes.append(lat_current[dayslookahead])
-            longitudes.append(lon_current[dayslookahead])
-
-            ds.close()
-
-        return np.array(latitudes), np.array(longitudes) # At day i: [[ part1_ts1, part2_ts1, ...], [ part1_ts2, part2_ts2, ...], ...], each vector represents a timestep simulation
+        """Extrai latitude e longitude do dia especificado de cada simulação (do cache de trajetórias da pasta)."""
+        return TrajectoryCache.open(f"results/{folder}", number_of_simulations).positions_at(particleidx, dayslookahead) # At day i: [sim1, sim2, ...], one position per timestep simulation
 
 
     @staticmethod
-    def get_trajectory(folder, simulationidx=1, particleidx = 0):
-        """Extrai toda a trajetória (lat/lon) de uma simulação específica."""
-        arquivo_resultado = f"result_{simulationidx:04d}.nc"
-        caminho = f"results/{folder}raw/{arquivo_resultado}"
-
-        ds = xr.open_dataset(caminho, engine="netcdf4")
-        lat_current = ds['lat'].values[particleidx] # For simulation i : [ partj_day1, partj_day2, ...]
-        lon_current = ds['lon'].values[particleidx]
-        ds.close()
-
-        return lat_current, lon_current
+    def get_trajectory(folder, simulationidx=1, particleidx = 0, number_of_simulations = None):
+        """Extrai toda a trajetória (lat/lon) de uma simulação específica (do cache de trajetórias da pasta)."""
+        return TrajectoryCache.open(f"results/{folder}", number_of_simulations).trajectory(simulationidx, particleidx) # For simulation i : [ partj_day1, partj_day2, ...]
 
     @staticmethod
     def measure_distance(lat1, lon1, lat2, lon2):
@@ -119,68 +97,192 @@ class TimestepEstimator(GeneralSimulationGeneration):
         return d * 1000  # meters
 
 
-    def estimate_timestep(self, number_of_simulations, converging_tolerence, days_lookahead, particle_idx, simulation_idx, rk4flag, connect_final_points, compare_euler_rk4, timestep_folder, timestep_folder2):
-        
+    def recommend_timestep(self) -> int:
+        """
+        Recommends a time step for the reference simulation before running any, from the Courant number of the
+        environment fields over its domain and window (see CourantEstimate and the `courant` section of main.yaml):
+        the largest divisor of `output_time_step` keeping the `quantile` of the Courant numbers below `target`.
+        The fields are downloaded first if they are not on disk.
+
+        Returns:
+            int: The recommended time step (s).
+        """
+        courant_cfg = self.principal_cfg.get("courant", {})
+        target, quantile = courant_cfg.get("target", 1.0), courant_cfg.get("quantile", 99)
+        start, end, bbox = DownloadPlanner.simulation_window(self.param_cfg)
+        F = Fetch(self.cm_cfg, self.login_cfg).Window(start, end, bbox)
+        if F.GetCurrentSource() is None or F.GetWindSource() is None:
+            with Tracer.span("download_data"):
+                F.download_data()
+
+        estimator = CourantEstimate(RunASimulation.WIND_DRIFT_FACTOR, courant_cfg.get("chunk_hours", CourantEstimate.CHUNK_HOURS))
+        percentiles = tuple(sorted({*CourantEstimate.PERCENTILES, quantile}))
+        with Tracer.span("courant estimate"):
+            statistics = estimator.scan(F.GetCurrentSource(), F.GetWindSource(), bbox, start, end, percentiles)
+        if statistics["count"] == 0:
+            print("Nenhuma célula de oceano com dados na janela da simulação: o time step não pode ser recomendado.")
+            return self.param_cfg.time_step
+        best_timestep = CourantEstimate.recommend(statistics[f"p{quantile}"], target, self.param_cfg.output_time_step)
+
+        print("\n\033[1;36m==== COURANT A PRIORI ====\033[0m")
+        print(f"{statistics['count']} células x horas de oceano, fator de vento {RunASimulation.WIND_DRIFT_FACTOR}")
+        print(f"{'':>8} | {'Células/h':>10} | {'C (Δt = ' + str(self.param_cfg.time_step) + ' s)':>18}")
+        for name in [f"p{q}" for q in percentiles] + ["max"]:
+            print(f"{name.upper():>8} | {3600*statistics[name]:>10.3f} | {statistics[name]*self.param_cfg.time_step:>18.3f}")
+        print(f"Time step recomendado (P{quantile} do Courant <= {target})  :   \033[1m{best_timestep} s\033[0m")
+        print("\033[1;36m===============================\n\033[0m")
+        return best_timestep
+
+
+    def error_statistics(self, cache: TrajectoryCache) -> dict:
+        """
+        Computes the statistics of the distance (m) between the particles of each simulation of the cache and of the
+        previous one (see ErrorStatistics.compute_successive), spreading the chunks of particles over a pool of
+        `execution.analysis_workers` processes (all cores if 0) when there are several chunks.
+
+        Returns:
+            dict: The statistics of each simulation but the first whose shape and the previous one's match, by index.
+        """
+        workers = self.principal_cfg.get("execution", {}).get("analysis_workers", 0) or os.cpu_count()
+        parallel = workers > 1 and cache.lat.shape[1] > ErrorStatistics.CHUNK_PARTICLES
+        with Tracer.span("error statistics", particles=cache.lat.shape[1]), (Pool(workers) if parallel else nullcontext()) as pool:
+            return ErrorStatistics.compute_successive(cache.GetArrayFileName("lat"), cache.GetArrayFileName("lon"), cache.valid, pool)
+
+
+    def adaptive_search(self, number_of_workers, verbose, rk4flag, overwrite, resume, converging_tolerence, days_lookahead) -> tuple:
+        """
+        Runs the simulations of the time step list one refinement level at a time, instead of all of them before
+        the analysis, and stops as soon as the Richardson estimate of the error of the last level (see
+        RichardsonEstimate) is below the tolerance: the finest levels, the most expensive ones, are only run when
+        the coarser ones are not accurate enough.
+
+        The difference between two levels is the mean distance between their particles on day `days_lookahead`
+        (see ErrorStatistics). The levels already completed in the results folder are not run again (see the
+        resume option of generate_simulations). The environment is fetched and the pool of workers opened once for
+        the whole ladder, and the animations, metrics and trace are written once, for the levels run, at the end.
+        The trajectory cache is opened once for the whole ladder, and each level only reads its own result into its slot.
+
+        Returns:
+            tuple: The number of levels run (the first simulations of the list, to analyse with estimate_timestep),
+                and the time step (s) of the last one with its Richardson error (m), to pass to estimate_timestep.
+        """
+        results_relpath = self.principal_cfg.paths.sim_results_location
+        journal, _ = self.start_sweep(verbose, rk4flag, overwrite, resume)
+        sim_list = self.load_configlist()
+        ts_list = [sim_cfg.time_step for sim_cfg in sim_list]
+        verify_checksum = self.principal_cfg.get("execution", {}).get("resume_verify_checksum", False)
+        scheduler = TaskScheduler(rk4flag)
+        windows = self.fetch_environment(sim_list)
+        shared_envs = self.share_environment(windows) if self.principal_cfg.get("execution", {}).get("shared_memory_fields", False) else []
+        differences = [np.nan]
+        error = order = np.nan
+        level = 0
+        failures = []
+        try:
+            with self.open_pool(windows, shared_envs, number_of_workers, verbose, rk4flag) as pool:
+                for level, sim_cfg in enumerate(sim_list):
+                    if journal.pending([sim_cfg], verify_checksum):
+                        with Tracer.span("pool dispatch", workers=number_of_workers, level=level):
+                            chunk_results = self.run_chunks(pool, self.warp_simulate, [[SimTask.from_cfg(sim_cfg)]], progress=False)
+                        failures.extend(failure for _, chunk_failures, _ in chunk_results for failure in chunk_failures)
+                    else:
+                        print(f"     Nível {level} (Δt = {ts_list[level]} s) já concluído na pasta de resultados.")
+                    if level == 0:
+                        continue
+                    cache = TrajectoryCache.open(results_relpath, len(sim_list), allow_missing=True)
+                    if not (cache.valid[level - 1] and cache.valid[level]):
+                        differences.append(np.nan)
+                        print(f"     Nível {level} (Δt = {ts_list[level]} s) sem comparação: resultado ausente ou com shape diferente.")
+                        continue
+                    statistics = ErrorStatistics.compute(cache.GetArrayFileName("lat"), cache.GetArrayFileName("lon"), level - 1, level)
+                    differences.append(float(statistics["mean"][days_lookahead]))
+                    error, order = RichardsonEstimate.remaining_error(differences, ts_list[:level + 1], rk4flag)
+                    remaining = RichardsonEstimate.levels_to_tolerance(error, order, ts_list[level - 1] / ts_list[level], converging_tolerence)
+                    if np.isfinite(error):
+                        print(f"     Nível {level} (Δt = {ts_list[level]} s): diferença {differences[-1]:.1f} m, erro estimado {error:.1f} m (ordem {order:.2f})"
+                              + (f", ~{remaining} nível(is) até a tolerância." if remaining > 0 else "."))
+                    else:
+                        print(f"     Nível {level} (Δt = {ts_list[level]} s): diferença {differences[-1]:.1f} m, erro ainda fora do regime assintótico.")
+                    if error < converging_tolerence:
+                        break
+        finally:
+            for _, _, env in shared_envs:
+                env.release()
+        TaskGuard.write_report(failures, results_relpath)
+
+        nb_levels = level + 1
+        total_units = sum(scheduler.work_units(sim_cfg) for sim_cfg in sim_list)
+        saved_units = sum(scheduler.work_units(sim_cfg) for sim_cfg in sim_list[nb_levels:])
+        if error < converging_tolerence:
+            print(f"Convergência estimada em Δt = {ts_list[level]} s (erro de Richardson {error:.1f} m < {converging_tolerence} m).")
+        else:
+            print(f"Não atingiu convergência: o erro estimado com Δt = {ts_list[level]} s é {error:.1f} m.")
+        print(f"{nb_levels} de {len(sim_list)} níveis executados: {len(sim_list) - nb_levels} simulações e "
+              f"{100*saved_units/total_units:.1f}% dos passos-partícula da varredura completa economizados.")
+        self.finish_sweep(journal, sim_list[:nb_levels], number_of_workers, verbose)
+        return nb_levels, (ts_list[level], error)
+
+
+    @Tracer.traced("estimate_timestep")
+    def estimate_timestep(self, number_of_simulations, converging_tolerence, days_lookahead, particle_idx, simulation_idx, rk4flag, connect_final_points, compare_euler_rk4, timestep_folder, timestep_folder2, richardson = None):
+        """
+        Analyses the convergence of the time step ladder and plots it. With `richardson`, the (time step, error)
+        returned by adaptive_search, the convergence is decided by this Richardson error, as in the search,
+        instead of by the difference between successive time steps.
+        """
+
         # Buscar os dados de simulação
         sims_conf_folder = self.principal_cfg.paths.list_sim_configs_location
         relpath = os.path.join(sims_conf_folder, self.configlist_file)
-        sim_list = OmegaConf.load(relpath)
-        ts_list = [sim["time_step"] for sim in sim_list]
+        ts_list = [sim["time_step"] for sim in ConfigList.iterate(relpath)][:number_of_simulations]
 
-        # Load initial datasets
-        arquivo_resultado = RunASimulation.generate_result_fname(0, 0)
+        # Load the trajectories of all simulations, each result file being read once
         try:
-            ds_ref = xr.open_dataset(f"results/{timestep_folder}raw/" + arquivo_resultado, engine="netcdf4")
-        except FileNotFoundError:
-            print("O diretório contendo os resultados de simulações não existe. Verifique o nome do diretório, ou executa as simulações.")
+            cache = TrajectoryCache.open(f"results/{timestep_folder}", number_of_simulations)
+        except FileNotFoundError as e:
+            print(f"{e} Verifique o nome do diretório, ou executa as simulações.")
             return
-        lat_current = ds_ref['lat'].values # Simulation 0 : [[ part1_day1, part1_day2, ...], [ part2_day1, part2_day2, ...], ...]
-        lon_current = ds_ref['lon'].values
+        # Estatísticas do erro de cada simulação em relação à anterior, por blocos de partículas
+        statistics = self.error_statistics(cache)
 
         # Initialize arrays
-        nb_days = lat_current.shape[1]
-        err_array = np.full(lat_current.shape, np.inf)
+        nb_days = cache.lat.shape[2]
         err_matrix = np.zeros((number_of_simulations, nb_days))
         err_atual = np.inf
         i = 1
         # Loop through timesteps
-        print("-----------------------------------------")
-        print(f"{'Time step (s)':>15} | {'Erro (m)':>10}")
-        print("-----------------------------------------")
+        print("------------------------------------------------------------------")
+        print(f"{'Time step (s)':>15} | {'Erro (m)':>10} | {'P50 (m)':>10} | {'P95 (m)':>10} | {'Máx (m)':>10}")
+        print("------------------------------------------------------------------")
         best_timestep = np.inf
         convergiu = False
         while  (i < number_of_simulations): # and (err_atual >= eps_metre)?
-            if not convergiu and (err_atual < converging_tolerence):
+            # Com o erro de Richardson da busca adaptativa, só o resultado dele é impresso (abaixo)
+            if richardson is None and not convergiu and (err_atual < converging_tolerence):
                 best_timestep = ts_list[i]
                 convergiu = True
                 print(f"O timestep ótimo encontrado é {ts_list[i]} (s).")
 
-            lat_ref = lat_current
-            lon_ref = lon_current
-
-            arquivo_resultado = f"result_{i:04d}.nc"
-            try:
-                ds_current = xr.open_dataset(f"results/{timestep_folder}raw/" + arquivo_resultado, engine="netcdf4")
-            except FileNotFoundError:
-                print(f"Arquivo 'result_{i:04d}.nc' não encontrado. Verifique o nome do diretório.")
-                return
-            lat_current = ds_current['lat'].values # For simulation i : [[ part1_day1, part1_day2, ...], [ part2_day1, part2_day2, ...], ...]
-            lon_current = ds_current['lon'].values
-
-            if lat_ref.shape != lat_current.shape or lon_ref.shape != lon_current.shape:
-                print(f"Shape mismatch in file {arquivo_resultado}")
+            if i not in statistics:
+                print(f"Shape mismatch in file result_{i:04d}.nc")
                 i += 1
                 continue
 
-            err_array = TimestepEstimator.measure_distance(lat_ref, lon_ref, lat_current, lon_current)  # 2D-array (nb of particle, number of days)
-            mean_array = err_array.mean(axis=0) #1D array
+            mean_array = statistics[i]["mean"] #1D array: média sobre as partículas de cada dia
             err_matrix[i, :] = mean_array
             err_atual = mean_array[days_lookahead] # Média escalar varrendo todos os dias
-            print(f"{ts_list[i]:>15} | {err_atual:>10.1f}")
+            print(f"{ts_list[i]:>15} | {err_atual:>10.1f} | {statistics[i]['p50'][days_lookahead]:>10.1f} | {statistics[i]['p95'][days_lookahead]:>10.1f} | {statistics[i]['max'][days_lookahead]:>10.1f}")
             i += 1
-        print("-----------------------------------------")
-
-        if (i == number_of_simulations) and (err_atual > converging_tolerence):
+        print("------------------------------------------------------------------")
+
+        if richardson is not None:
+            # Mesmo critério da busca adaptativa: o erro de Richardson do último nível
+            best_timestep, richardson_error = richardson
+            if richardson_error < converging_tolerence:
+                print(f"O timestep ótimo encontrado é {best_timestep} (s): erro de Richardson de {richardson_error:.1f} m.")
+            else:
+                print(f"Não atingiu convergência. O time step de {best_timestep} segundos tem um erro de Richardson de {richardson_error:.1f} m, acima de {converging_tolerence} metros.")
+        elif (i == number_of_simulations) and (err_atual > converging_tolerence):
             i -= 1
             print(f"Não atingiu convergência. O time step de {ts_list[i]} segundos não permitiu alcançar {converging_tolerence} metros de precisão.")
             best_timestep = ts_list[i]
@@ -241,13 +343,13 @@ class TimestepEstimator(GeneralSimulationGeneration):
                 # --- Get trajectories ---
 
                 if rk4flag:
-                    lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = simulation_idx, particleidx = particle_idx)
-                    lat_traj_euler, lon_traj_euler = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = simulation_idx, particleidx = particle_idx)
-                    lat_traj_final, lon_traj_final = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = number_of_simulations-1, particleidx = particle_idx)
+                    lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = simulation_idx, particleidx = particle_idx, number_of_simulations = number_of_simulations)
+                    lat_traj_euler, lon_traj_euler = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = simulation_idx, particleidx = particle_idx, number_of_simulations = number_of_simulations)
+                    lat_traj_final, lon_traj_final = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = number_of_simulations-1, particleidx = particle_idx, number_of_simulations = number_of_simulations)
                 else:
-                    lat_traj_euler, lon_traj_euler = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = simulation_idx, particleidx = particle_idx)
-                    lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = simulation_idx, particleidx = particle_idx)
-                    lat_traj_final, lon_traj_final = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = number_of_simulations-1, particleidx = particle_idx)
+                    lat_traj_euler, lon_traj_euler = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = simulation_idx, particleidx = particle_idx, number_of_simulations = number_of_simulations)
+                    lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder2, simulationidx = simulation_idx, particleidx = particle_idx, number_of_simulations = number_of_simulations)
+                    lat_traj_final, lon_traj_final = TimestepEstimator.get_trajectory(timestep_folder, simulationidx = number_of_simulations-1, particleidx = particle_idx, number_of_simulations = number_of_simulations)
 
                 # Plot the continuous trajectories
                 plt.plot(lon_traj_euler, lat_traj_euler, '-x', color="#851717", label='Euler trajectory')
@@ -278,7 +380,7 @@ class TimestepEstimator(GeneralSimulationGeneration):
         end_lats = []
         end_lons = []
         for simulationindex, color in zip(range(number_of_simulations), colors):
-            lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder, simulationidx=simulationindex, particleidx=particle_idx)
+            lat_traj_rk4, lon_traj_rk4 = TimestepEstimator.get_trajectory(timestep_folder, simulationidx=simulationindex, particleidx=particle_idx, number_of_simulations = number_of_simulations)
             if not connect_final_points:
                 plt.plot(lon_traj_rk4, lat_traj_rk4, '-x', color=color, alpha=0.8,
                         label=f'Δt = {ts_list[simulationindex]} s')
@@ -368,23 +470,21 @@ class TimestepEstimator(GeneralSimulationGeneration):
 
         
         # Calculo do número de Courant associado a este time step
-        arquivo_resultado = f"result_{(number_of_simulations-1):04d}.nc" # Buscando a simulação com o melhor timestep
-        ds_current = xr.open_dataset(f"results/{timestep_folder}raw/" + arquivo_resultado, engine="netcdf4") # Carregando os resultados
-
-        seax = max(ds_current['x_sea_water_velocity'].values[0]) #Velocidade da correnteza na direção horizontal no dia 4 (u_x)
-        seay = max(ds_current['y_sea_water_velocity'].values[0])
-        windx = max(ds_current['x_wind'].values[0]) #Velocidade do maior vento na direção horizontal  (u_x)
-        windy = max(ds_current['y_wind'].values[0]) #Vento na direção vertical (u_y)
-
-        position_lat = ds_current['lat'].values[0][0] # Posição aproximada na surface do globo, considerando uma partícula dada em um instante dado
-        position_lon = ds_current['lon'].values[0][0]
+        # Buscando a simulação com o melhor timestep, no cache de trajetórias
+        seax = max(cache.first_particle['x_sea_water_velocity'][-1]) #Velocidade da correnteza na direção horizontal no dia 4 (u_x)
+        seay = max(cache.first_particle['y_sea_water_velocity'][-1])
+        windx = max(cache.first_particle['x_wind'][-1]) #Velocidade do maior vento na direção horizontal  (u_x)
+        windy = max(cache.first_particle['y_wind'][-1]) #Vento na direção vertical (u_y)
+
+        position_lat = cache.lat[-1, 0, 0] # Posição aproximada na surface do globo, considerando uma partícula dada em um instante dado
+        position_lon = cache.lon[-1, 0, 0]
         resolucao_espacial_lon = 0.083
         resolucao_espacial_lat = 0.083
         distx = TimestepEstimator.measure_distance(position_lat, position_lon, position_lat, position_lon+resolucao_espacial_lon) #Distância percorrida na direção longitudinal/horizontal
         disty = TimestepEstimator.measure_distance(position_lat, position_lon, position_lat+resolucao_espacial_lat, position_lon) #Distância percorrida na direção latitudinal/vertical
 
-        Cx = (seax + 0.03*windx) * best_timestep / distx # ux*deltax / deltat
-        Cy = (seay + 0.03*windy) * best_timestep / disty # uy*deltay / deltat
+        Cx = (seax + RunASimulation.WIND_DRIFT_FACTOR*windx) * best_timestep / distx # ux*deltax / deltat
+        Cy = (seay + RunASimulation.WIND_DRIFT_FACTOR*windy) * best_timestep / disty # uy*deltay / deltat
 
 
         print("\n\033[1;36m==== RESULTADOS ====\033[0m")
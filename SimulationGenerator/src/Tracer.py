@@ -0,0 +1,178 @@
+#@brief Stage-level traces of the pipeline, in the Chrome trace format, and per-simulation profiles
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import glob
+import time
+import socket
+import cProfile
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Records the duration of the stages of the pipeline (configuration composition, data download, pool
+    dispatch, o.run, o.animation, timestep estimation...) in every process of a sweep, and gathers them in
+    `trace.json` in the results folder, in the Chrome trace event format (chrome://tracing, https://ui.perfetto.dev).
+
+    Each process keeps its events in memory and appends them to its own file in the `trace/` folder of the
+    results folder (the workers after each task), so that no lock is shared between the processes. save merges
+    those files into the trace. Optionally, the simulations are run under cProfile and their profiles saved
+    in `profiles/sim_XXXX.prof` (snakeviz, `python -m pstats`).
+
+    The state is held by the class, as each process traces a single pipeline. Nothing is recorded until
+    tracing is enabled by the `profiling` section of main.yaml or by activate.
+    """
+    TRACE_FNAME = "trace.json"
+    active = False
+    profiler = "none"
+    profile_simulations = []
+    # Pasta de resultados do sweep em que o processo grava seus eventos (None enquanto ela não é conhecida)
+    directory = None
+    process_name = "principal"
+    events = []
+
+    @staticmethod
+    def configure(profiling_cfg):
+        """
+        Reads the `profiling` section of main.yaml. Tracing enabled by activate stays enabled.
+        """
+        Tracer.active = Tracer.active or bool(profiling_cfg.get("trace", False))
+        Tracer.profiler = profiling_cfg.get("profiler", "none") or "none"
+        Tracer.profile_simulations = list(profiling_cfg.get("profile_simulations", []) or [])
+
+    @staticmethod
+    def activate():
+        Tracer.active = True
+
+    @staticmethod
+    def settings() -> dict:
+        """
+        Returns the settings to hand to the workers (see start_worker).
+        """
+        return {"trace": Tracer.active, "profiler": Tracer.profiler, "profile_simulations": Tracer.profile_simulations}
+
+    @staticmethod
+    def start_worker(settings: dict, result_path: str):
+        """
+        Sets up the tracing of a worker process, which writes its events to the results folder of the sweep.
+        """
+        Tracer.active = settings.get("trace", False)
+        Tracer.profiler = settings.get("profiler", "none")
+        Tracer.profile_simulations = settings.get("profile_simulations", [])
+        Tracer.directory = result_path
+        Tracer.process_name = "worker"
+        Tracer.events = [] # Um processo criado por fork herda os eventos do processo principal
+
+
+    @staticmethod
+    def now_us() -> int:
+        # Relógio de parede, comum a todos os processos (e máquinas sincronizadas) de um sweep
+        return time.time_ns() // 1000
+
+    @staticmethod
+    def record(name: str, start_us: int, category: str = "stage", **args):
+        """
+        Records a stage that started at `start_us` (see now_us) and ends now.
+        """
+        if Tracer.active:
+            Tracer.events.append({"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": Tracer.now_us() - start_us,
+                                  "pid": os.getpid(), "tid": threading.get_native_id(), "args": args})
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, category: str = "stage", **args):
+        start = Tracer.now_us()
+        try:
+            yield
+        finally:
+            Tracer.record(name, start, category, **args)
+
+    @staticmethod
+    def traced(name: str, category: str = "stage"):
+        """
+        Decorator recording each call of a function as a stage.
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with Tracer.span(name, category):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+    @staticmethod
+    @contextmanager
+    def profile(simulation_ids: list):
+        """
+        Runs the block under cProfile when the profiler is enabled for one of `simulation_ids` (all simulations
+        if `profile_simulations` is empty), and saves the profile under the first simulation_id.
+        """
+        selected = Tracer.profiler == "cprofile" and Tracer.directory is not None and \
+                   (not Tracer.profile_simulations or any(simulation_id in Tracer.profile_simulations for simulation_id in simulation_ids))
+        if not selected:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiles_folder = os.path.join(Tracer.directory, "profiles")
+            os.makedirs(profiles_folder, exist_ok=True)
+            profiler.dump_stats(os.path.join(profiles_folder, f"sim_{simulation_ids[0]:04d}.prof"))
+
+
+    @staticmethod
+    def GetEventsFileName(result_path: str) -> str:
+        return os.path.join(result_path, "trace", f"events_{socket.gethostname()}_{os.getpid()}.jsonl")
+
+    @staticmethod
+    def flush(result_path: str = None):
+        """
+        Appends the events recorded by this process to its events file, in the results folder of the sweep.
+        """
+        result_path = result_path or Tracer.directory
+        if not Tracer.events or result_path is None:
+            return
+        events_fname = Tracer.GetEventsFileName(result_path)
+        os.makedirs(os.path.dirname(events_fname), exist_ok=True)
+        new_file = not os.path.exists(events_fname)
+        with open(events_fname, "a") as f:
+            if new_file:
+                f.write(json.dumps({"name": "process_name", "ph": "M", "pid": os.getpid(),
+                                    "args": {"name": f"{Tracer.process_name} {socket.gethostname()}:{os.getpid()}"}}) + "\n")
+            for event in Tracer.events:
+                f.write(json.dumps(event) + "\n")
+        Tracer.events = []
+
+    @staticmethod
+    def clear(result_path: str):
+        """
+        Removes the events of a previous sweep of the results folder.
+        """
+        for events_fname in glob.glob(os.path.join(result_path, "trace", "events_*.jsonl")):
+            os.remove(events_fname)
+
+    @staticmethod
+    def save(result_path: str):
+        """
+        Merges the events of all the processes of the results folder into its `trace.json`.
+        """
+        if not Tracer.active:
+            return
+        Tracer.flush(result_path)
+        events = []
+        for events_fname in sorted(glob.glob(os.path.join(result_path, "trace", "events_*.jsonl"))):
+            with open(events_fname, "r") as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+        trace_fname = os.path.join(result_path, Tracer.TRACE_FNAME)
+        with open(trace_fname, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Trace de {len(events)} eventos salvo em '{trace_fname}' (abrir em chrome://tracing ou https://ui.perfetto.dev).")
@@ -0,0 +1,176 @@
+#@brief Memory-mapped cache of the trajectories of a folder of simulation results, read once for all the analyses
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+
+import os
+import json
+import numpy as np
+import xarray as xr
+
+from src.RunASimulation import RunASimulation
+
+
+class TrajectoryCache:
+    """
+    The positions of the elements of the simulations `result_0000.nc` ... of a results folder, as memory-mapped
+    (simulation, particle, time) arrays in its `trajectory_cache/` folder.
+
+    Each result file is read once, in chunks of particles, and copied into the cache: the error loop and the
+    plots of TimestepEstimator then slice the arrays they need, which only reads those pages from disk. The cache
+    is kept between analyses and refreshed per simulation, when the size or modification time of its result file
+    changes. Besides the positions, the environment seen by the first particle (see FIRST_PARTICLE_VARIABLES) is
+    kept as (simulation, time) arrays for the Courant number estimate.
+
+    The caches opened by a process are reused (see open), as the GUI analyses the same folders repeatedly.
+
+    Attributes:
+        raw_folder (str): The folder of the result files.
+        lat, lon (np.memmap): The latitude and longitude (simulation x particle x time).
+        first_particle (dict): The FIRST_PARTICLE_VARIABLES found in the results (simulation x time).
+        valid (np.ndarray): Whether each simulation has the (particle, time) shape of the first one: the others
+            are left as NaN.
+    """
+    VARIABLES = ("lat", "lon")
+    FIRST_PARTICLE_VARIABLES = ("x_sea_water_velocity", "y_sea_water_velocity", "x_wind", "y_wind")
+    CHUNK_PARTICLES = 100000
+    INDEX_FNAME = "index.json"
+    # Caches abertos pelo processo, por pasta de resultados
+    opened = {}
+
+    def __init__(self, result_folder: str, number_of_simulations: int, allow_missing: bool = False):
+        """
+        Opens the cache of the first `number_of_simulations` results of `result_folder`, reading the results
+        missing from it or changed since.
+
+        Args:
+            allow_missing (bool): Whether the results not run yet are left as invalid slots, to be read when they
+                appear (the first result must exist). Used by the adaptive time step search, which opens the cache
+                of the whole ladder once and fills it level by level.
+
+        Raises:
+            FileNotFoundError: If one of the result files doesn't exist (the first one, with `allow_missing`).
+        """
+        self.raw_folder = os.path.join(result_folder, "raw")
+        self.cache_folder = os.path.join(result_folder, "trajectory_cache")
+        self.allow_missing = allow_missing
+        sources = [os.path.join(self.raw_folder, RunASimulation.generate_result_fname(idx, 0)) for idx in range(number_of_simulations)]
+        stamps = [TrajectoryCache.stamp(fname, allow_missing and idx > 0) for idx, fname in enumerate(sources)]
+
+        with xr.open_dataset(sources[0], engine="netcdf4") as ds:
+            shape = (number_of_simulations, *ds["lat"].shape)
+            dtype = np.dtype(ds["lat"].dtype).name
+            first_particle = [name for name in TrajectoryCache.FIRST_PARTICLE_VARIABLES if name in ds.variables]
+
+        index = self.load_index()
+        reuse = index.get("shape") == list(shape) and index.get("dtype") == dtype and index.get("first_particle") == first_particle and \
+                all(os.path.exists(self.GetArrayFileName(name)) for name in (*TrajectoryCache.VARIABLES, *first_particle))
+        os.makedirs(self.cache_folder, exist_ok=True)
+        mode = "r+" if reuse else "w+"
+        self.lat = np.lib.format.open_memmap(self.GetArrayFileName("lat"), mode=mode, dtype=dtype, shape=shape)
+        self.lon = np.lib.format.open_memmap(self.GetArrayFileName("lon"), mode=mode, dtype=dtype, shape=shape)
+        self.first_particle = {name: np.lib.format.open_memmap(self.GetArrayFileName(name), mode=mode, dtype=dtype, shape=(shape[0], shape[2]))
+                               for name in first_particle}
+        self.valid = np.array(index.get("valid", [False] * shape[0]) if reuse else [False] * shape[0], dtype=bool)
+
+        cached = index.get("sources", []) if reuse else []
+        stale = [idx for idx in range(number_of_simulations) if idx >= len(cached) or cached[idx] != stamps[idx]]
+        for idx in stale:
+            self.valid[idx] = stamps[idx] is not None and self.read_result(idx, sources[idx])
+        if stale:
+            for array in (self.lat, self.lon, *self.first_particle.values()):
+                array.flush()
+            self.save_index({"shape": list(shape), "dtype": dtype, "first_particle": first_particle,
+                             "sources": stamps, "valid": self.valid.tolist()})
+            print(f"{sum(stamps[idx] is not None for idx in stale)} arquivo(s) de resultado lido(s) no cache de trajetórias '{self.cache_folder}'.")
+
+    @classmethod
+    def open(cls, result_folder: str, number_of_simulations: int = None, allow_missing: bool = False):
+        """
+        Returns the cache of a results folder, reusing the one already opened by the process when it is up to date.
+
+        Args:
+            number_of_simulations (int): Number of simulations to cache. By default, those of the cache already
+                opened, or else all the consecutive result files of the folder.
+            allow_missing (bool): See __init__.
+        """
+        key = os.path.normpath(result_folder)
+        cache = cls.opened.get(key)
+        if number_of_simulations is None:
+            number_of_simulations = cache.lat.shape[0] if cache is not None else TrajectoryCache.count_results(result_folder)
+        if cache is None or cache.lat.shape[0] != number_of_simulations or cache.allow_missing != allow_missing or not cache.up_to_date():
+            cache = cls(result_folder, number_of_simulations, allow_missing)
+            cls.opened[key] = cache
+        return cache
+
+
+    @staticmethod
+    def count_results(result_folder: str) -> int:
+        count = 0
+        while os.path.exists(os.path.join(result_folder, "raw", RunASimulation.generate_result_fname(count, 0))):
+            count += 1
+        return max(count, 1) # Sem resultados, o cache falha ao abrir result_0000.nc
+
+    @staticmethod
+    def stamp(fname: str, allow_missing: bool = False) -> list:
+        if not os.path.exists(fname):
+            if allow_missing:
+                return None
+            raise FileNotFoundError(f"Arquivo '{os.path.basename(fname)}' não encontrado em '{os.path.dirname(fname)}'.")
+        stat = os.stat(fname)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def up_to_date(self) -> bool:
+        index = self.load_index()
+        try:
+            return index.get("sources") == [TrajectoryCache.stamp(os.path.join(self.raw_folder, RunASimulation.generate_result_fname(idx, 0)), self.allow_missing and idx > 0)
+                                            for idx in range(self.lat.shape[0])]
+        except FileNotFoundError:
+            return False
+
+    def GetArrayFileName(self, name: str) -> str:
+        return os.path.join(self.cache_folder, f"{name}.npy")
+
+    def load_index(self) -> dict:
+        index_fname = os.path.join(self.cache_folder, TrajectoryCache.INDEX_FNAME)
+        if not os.path.exists(index_fname):
+            return {}
+        with open(index_fname, "r") as f:
+            return json.load(f)
+
+    def save_index(self, index: dict):
+        with open(os.path.join(self.cache_folder, TrajectoryCache.INDEX_FNAME), "w") as f:
+            json.dump(index, f)
+
+
+    def read_result(self, idx: int, fname: str) -> bool:
+        """
+        Copies a result file into the slot `idx` of the cache, in chunks of CHUNK_PARTICLES particles.
+
+        Returns:
+            bool: False if its shape differs from the cache (the slot is then filled with NaN).
+        """
+        with xr.open_dataset(fname, engine="netcdf4") as ds:
+            if ds["lat"].shape != self.lat.shape[1:]:
+                for array in (self.lat[idx], self.lon[idx], *(array[idx] for array in self.first_particle.values())):
+                    array[...] = np.nan
+                return False
+            for start in range(0, self.lat.shape[1], TrajectoryCache.CHUNK_PARTICLES):
+                stop = min(start + TrajectoryCache.CHUNK_PARTICLES, self.lat.shape[1])
+                self.lat[idx, start:stop] = ds["lat"][start:stop].values
+                self.lon[idx, start:stop] = ds["lon"][start:stop].values
+            for name, array in self.first_particle.items():
+                array[idx] = ds[name][0].values
+        return True
+
+
+    def trajectory(self, simulation_idx: int, particle_idx: int = 0) -> tuple:
+        """
+        Returns the latitudes and longitudes of a particle along the output times of a simulation.
+        """
+        return np.asarray(self.lat[simulation_idx, particle_idx]), np.asarray(self.lon[simulation_idx, particle_idx])
+
+    def positions_at(self, particle_idx: int = 0, time_idx: int = -1) -> tuple:
+        """
+        Returns the latitude and longitude of a particle at an output time, in each simulation.
+        """
+        return np.asarray(self.lat[:, particle_idx, time_idx]), np.asarray(self.lon[:, particle_idx, time_idx])
@@ -0,0 +1,70 @@
+#@brief Tests of the analysis store: conversion of the downloaded files, and fallback to a source downloaded again since
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from src.AnalysisStore import AnalysisStore
+
+
+def write_source(fname: str, value: float, start: str = "2024-01-01"):
+    os.makedirs(os.path.dirname(fname), exist_ok=True)
+    coords = {"time": pd.date_range(start, periods=8, freq="h"), "latitude": np.linspace(-27, -21, 10), "longitude": np.linspace(-46, -37, 12)}
+    xr.Dataset({"uo": (("time", "latitude", "longitude"), np.full((8, 10, 12), value, dtype=np.float32))}, coords=coords).to_netcdf(fname)
+
+def set_mtime(fname: str, mtime: float):
+    os.utime(fname, (mtime, mtime))
+
+
+def test_converted_file_is_chunked_and_holds_the_source(tmp_path):
+    store = AnalysisStore(str(tmp_path), time_chunk=4, space_chunk=5)
+    source = os.path.join(str(tmp_path), "current.nc")
+    write_source(source, 0.3)
+    store_fname = store.convert(source)
+    assert store_fname == os.path.join(str(tmp_path), "analysis", "current.nc")
+    with xr.open_dataset(store_fname) as ds:
+        assert ds["uo"].encoding["chunksizes"] == (4, 5, 5)
+        assert ds["uo"].encoding["zlib"]
+        np.testing.assert_array_equal(ds["uo"].values, np.float32(0.3))
+
+def test_resolve_ignores_a_converted_file_older_than_the_source(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    source = os.path.join(str(tmp_path), "current.nc")
+    write_source(source, 0.3)
+    # Ainda não convertido: a fonte é usada como está
+    assert store.resolve(source) == source
+    store_fname = store.convert(source)
+    assert store.resolve(source) == store_fname
+
+    # Fonte baixada de novo depois da conversão: o arquivo convertido está obsoleto
+    write_source(source, 0.7)
+    set_mtime(store_fname, os.path.getmtime(source) - 10)
+    assert store.resolve(source) == source
+    # Reconvertida, a fonte nova é usada
+    assert store.convert(source) == store_fname
+    assert store.resolve(source) == store_fname
+    with xr.open_dataset(store_fname) as ds:
+        np.testing.assert_array_equal(ds["uo"].values, np.float32(0.7))
+
+def test_tiles_are_converted_together_and_checked_against_the_newest(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    tile_folder = os.path.join(str(tmp_path), "tiles_current")
+    tiles = [os.path.join(tile_folder, f"tile_{idx}.nc") for idx in range(2)]
+    # Tiles consecutivos no tempo, como os baixados por Fetch
+    for tile, start in zip(tiles, ("2024-01-01", "2024-01-02")):
+        write_source(tile, 0.3, start)
+    store_fname = store.convert(tiles)
+    assert store_fname == os.path.join(str(tmp_path), "analysis", "tiles_current.nc")
+    assert store.resolve(tiles) == store_fname
+    with xr.open_dataset(store_fname) as ds:
+        assert ds.sizes["time"] == 16
+    # Um só tile mais novo que a conversão basta para a invalidar
+    set_mtime(tiles[1], os.path.getmtime(store_fname) + 10)
+    assert store.resolve(tiles) == tiles
@@ -0,0 +1,69 @@
+#@brief Tests of the animation stage run after the sweep: selection of the simulations to animate and saved sweep context
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import glob
+import json
+import shutil
+from types import SimpleNamespace
+
+import pytest
+from omegaconf import OmegaConf
+
+from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def config_folder(tmp_path, monkeypatch):
+    """
+    Copy of the configuration folder, relative to the SimulationGenerator folder as the generators expect it.
+    """
+    folder = os.path.join(tmp_path, "conf")
+    os.makedirs(folder)
+    for fname in glob.glob(os.path.join(ROOT, "conf", "*.yaml")):
+        shutil.copy(fname, folder)
+    shutil.copy(os.path.join(folder, "cm_credentials_example.yaml"), os.path.join(folder, "cm_credentials.yaml"))
+    # Configuração de referência, normalmente escrita pela GUI
+    OmegaConf.save(OmegaConf.create({"simulation_id": 0, "start_date": "2024-01-02", "end_date": "2024-01-02"}), os.path.join(folder, "reference_simgen_config.yaml"))
+    monkeypatch.chdir(ROOT)
+    return os.path.relpath(folder, ROOT) + "/"
+
+def make_generator(animation: dict) -> GeneralSimulationGeneration:
+    G = GeneralSimulationGeneration.__new__(GeneralSimulationGeneration)
+    G.principal_cfg = OmegaConf.create({"animation": animation})
+    return G
+
+
+@pytest.mark.parametrize("animation, expected", [
+    ({"mode": "all"}, list(range(10))),
+    ({}, list(range(10))),
+    ({"mode": "sample", "sample_size": 4}, [0, 3, 6, 9]),
+    ({"mode": "sample", "sample_size": 1}, [0]),
+    ({"mode": "sample", "sample_size": 20}, list(range(10))),
+    ({"mode": "sample", "sample_size": 0}, []),
+    ({"mode": "none"}, []),
+    ({"mode": "on_demand"}, []),
+])
+def test_select_animations_follows_the_mode(animation, expected):
+    sim_list = [SimpleNamespace(simulation_id=idx) for idx in range(10)]
+    selected = make_generator(animation).select_animations(sim_list)
+    assert [sim_cfg.simulation_id for sim_cfg in selected] == expected
+
+def test_sweep_is_rebuilt_from_its_saved_context(config_folder, tmp_path):
+    G = GeneralSimulationGeneration(config_folder, "reference_simgen_config", "list.csv")
+    G.principal_cfg.paths.sim_results_location = os.path.join(str(tmp_path), "results")
+    G.save_sweep_context(verbose=True, rk4flag=False)
+
+    with open(os.path.join(str(tmp_path), "results", GeneralSimulationGeneration.SWEEP_CONTEXT_FNAME)) as f:
+        context = json.load(f)
+    assert context["verbose"] is True and context["rk4"] is False
+    rebuilt = GeneralSimulationGeneration.from_context(context)
+    assert rebuilt.config_folder == G.config_folder
+    assert rebuilt.configlist_file == "list.csv"
+    assert rebuilt.principal_cfg.paths.sim_results_location == G.principal_cfg.paths.sim_results_location
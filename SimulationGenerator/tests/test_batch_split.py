@@ -0,0 +1,55 @@
+#@brief Tests of the split of a batched Opendrift run into one result file per spill
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import xarray as xr
+
+from src.RunASimulation import RunASimulation
+
+NB_TIMES = 4
+
+
+def make_batch(fname: str, markers: list):
+    """
+    Writes a batched output in the layout of Opendrift: the element i, seeded by the spill markers[i], is
+    deactivated (NaN) after its first time when its index is a multiple of 3.
+    """
+    nb_elements = len(markers)
+    origin_marker = np.repeat(np.asarray(markers, dtype=np.float32)[:, None], NB_TIMES, axis=1)
+    lat = np.arange(nb_elements, dtype=np.float32)[:, None] + np.zeros(NB_TIMES, dtype=np.float32)
+    deactivated = np.arange(nb_elements) % 3 == 0
+    origin_marker[deactivated, 1:] = np.nan
+    lat[deactivated, 1:] = np.nan
+    xr.Dataset({"lat": (("trajectory", "time"), lat),
+                "origin_marker": (("trajectory", "time"), origin_marker, {"flag_values": np.array([0, 1, 2], dtype=np.int32), "flag_meanings": "Seed_0 Seed_1 Seed_2", "units": "1"})},
+               coords={"trajectory": np.arange(nb_elements, dtype=np.int32), "time": np.arange(NB_TIMES)}).to_netcdf(fname)
+
+
+def test_batch_is_split_by_origin_marker_and_renumbered(tmp_path):
+    batch_fname = os.path.join(tmp_path, "batch_0000.nc")
+    markers = [0, 1, 2, 1, 0, 2, 2, 1, 0]
+    make_batch(batch_fname, markers)
+    result_fnames = [os.path.join(tmp_path, f"result_{idx:04d}.nc") for idx in range(3)]
+    RunASimulation.split_batch_result(batch_fname, result_fnames)
+
+    assert not os.path.exists(batch_fname)
+    for spill, result_fname in enumerate(result_fnames):
+        elements = [idx for idx, marker in enumerate(markers) if marker == spill]
+        with xr.open_dataset(result_fname) as result:
+            # Os elementos do derramamento, na ordem do batch, numerados como num run isolado
+            assert result["trajectory"].values.tolist() == list(range(len(elements)))
+            assert result["lat"].isel(time=0).values.tolist() == elements
+            # Cada arquivo é o seed 0 do seu run, e os elementos desativados continuam NaN
+            marker = result["origin_marker"].values
+            deactivated = np.array([idx % 3 == 0 for idx in elements])
+            assert (marker[:, 0] == 0).all()
+            assert np.isnan(marker[deactivated, 1:]).all() and (marker[~deactivated, 1:] == 0).all()
+            assert np.isnan(result["lat"].values[deactivated, 1:]).all()
+            assert result["origin_marker"].attrs["flag_meanings"] == "Seed_0" and np.atleast_1d(result["origin_marker"].attrs["flag_values"]).tolist() == [0]
+            assert result["origin_marker"].attrs["units"] == "1"
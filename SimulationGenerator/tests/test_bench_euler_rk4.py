@@ -0,0 +1,55 @@
+#@brief Tests of the Euler versus RK4 benchmark: time step ladder, Pareto front and runs with each scheme
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from opendrift.readers import reader_netCDF_CF_generic
+
+from benchmarks.bench_euler_rk4 import OUTPUT_TIME_STEP, make_ladder, make_spill, pareto_front, run
+from src.ErrorStatistics import ErrorStatistics
+
+
+def write_field(fname: str, names: tuple, value: float):
+    # Campo uniforme de `value` m/s para leste, sem componente norte, durante quatro dias
+    coords = {"time": pd.date_range("2024-01-01", periods=17, freq="6h"),
+              "latitude": ("latitude", np.linspace(-27, -21, 13), {"standard_name": "latitude", "units": "degrees_north"}),
+              "longitude": ("longitude", np.linspace(-46, -37, 19), {"standard_name": "longitude", "units": "degrees_east"})}
+    field = np.full((17, 13, 19), value, dtype=np.float32)
+    xr.Dataset({names[0]: (("time", "latitude", "longitude"), field, {"standard_name": names[0], "units": "m s-1"}),
+                names[1]: (("time", "latitude", "longitude"), field * 0, {"standard_name": names[1], "units": "m s-1"})},
+               coords=coords).to_netcdf(fname)
+    return reader_netCDF_CF_generic.Reader(fname)
+
+
+def test_ladder_halves_the_time_step_among_the_divisors_of_the_output_step():
+    ladder = make_ladder(6)
+    # 675 / 2 não divide 21600: o maior divisor abaixo de 337 é 300
+    assert ladder == [10800, 5400, 2700, 1350, 675, 300]
+    assert all(OUTPUT_TIME_STEP % time_step == 0 for time_step in ladder)
+
+def test_pareto_front_keeps_the_points_no_other_beats():
+    points = [{"name": name, "cpu_s": cpu_s, "error_m": error_m}
+              for name, cpu_s, error_m in (("a", 1.0, 500.0), ("b", 2.0, 100.0), ("c", 3.0, 200.0), ("d", 4.0, 10.0), ("e", 1.0, 800.0))]
+    assert [point["name"] for point in pareto_front(points)] == ["a", "b", "d"]
+
+def test_both_schemes_agree_on_a_uniform_current(tmp_path):
+    readers = [write_field(os.path.join(str(tmp_path), "current.nc"), ("eastward_sea_water_velocity", "northward_sea_water_velocity"), 0.2),
+               write_field(os.path.join(str(tmp_path), "wind.nc"), ("x_wind", "y_wind"), 0.0)]
+    sim_cfg = make_spill(readers[0], 1, 20)
+    outfile = os.path.join(str(tmp_path), "result.nc")
+    euler = run(sim_cfg, readers, False, 3600, outfile)
+    rk4 = run(sim_cfg, readers, True, 3600, outfile)
+    assert euler["steps"] == rk4["steps"] == 24
+    # Num campo uniforme os dois esquemas são exatos: a nuvem anda 0.2 m/s x 1 dia para leste. As partículas
+    # diferem individualmente pelos processos aleatórios do OpenOil, só o centro da nuvem é comparado
+    centers = [np.array([np.nanmean(result[name])]) for result in (euler, rk4) for name in ("lat", "lon")]
+    assert ErrorStatistics.haversine(*centers)[0] < 500.0
+    for result in (euler, rk4):
+        np.testing.assert_allclose(np.nanmean(result["lon"]) - sim_cfg.spill_lon, 0.2 * 86400 / (111320 * np.cos(np.radians(sim_cfg.spill_lat))), rtol=0.2)
@@ -0,0 +1,80 @@
+#@brief Tests of the completion journal: which completed simulations a resumed sweep trusts, and which it runs again
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from src.CompletionJournal import CompletionJournal
+
+
+def write_result(fname: str, variables=("lon", "lat", "status"), nb_times: int = 5):
+    # Resultado do Opendrift reduzido às variáveis verificadas
+    xr.Dataset({var: (("trajectory", "time"), np.zeros((10, nb_times), dtype=np.float32)) for var in variables},
+               coords={"time": np.arange(nb_times, dtype=np.float64)}).to_netcdf(fname)
+
+@pytest.fixture
+def journal(tmp_path):
+    return CompletionJournal(str(tmp_path))
+
+def record_of(journal: CompletionJournal, tmp_path, simulation_id: int, **result_options) -> dict:
+    result_fname = os.path.join(tmp_path, f"result_{simulation_id:04d}.nc")
+    write_result(result_fname, **result_options)
+    journal.record_success(simulation_id, result_fname, 1.0)
+    return journal.load()[simulation_id]
+
+
+def test_completed_result_is_accepted(journal, tmp_path):
+    record = record_of(journal, tmp_path, 0)
+    assert CompletionJournal.check_result(record)
+    assert CompletionJournal.check_result(record, verify_checksum=True)
+
+def test_failed_or_missing_results_are_rejected(journal, tmp_path):
+    record = record_of(journal, tmp_path, 0)
+    os.remove(record["result_path"])
+    assert not CompletionJournal.check_result(record)
+    journal.record_failure(1, 2.0, RuntimeError("reader sem dados"))
+    failed = journal.load()[1]
+    assert failed["status"] == "failed" and failed["error"] == "RuntimeError: reader sem dados"
+    assert not CompletionJournal.check_result(failed)
+
+def test_result_rewritten_with_another_size_is_rejected(journal, tmp_path):
+    record = record_of(journal, tmp_path, 0)
+    write_result(record["result_path"], nb_times=50)
+    assert not CompletionJournal.check_result(record)
+
+def test_incomplete_results_are_rejected(journal, tmp_path):
+    # Sem a variável status, ou sem nenhum tempo de saída: o run foi interrompido antes de escrever
+    assert not CompletionJournal.check_result(record_of(journal, tmp_path, 0, variables=("lon", "lat")))
+    assert not CompletionJournal.check_result(record_of(journal, tmp_path, 1, nb_times=0))
+
+def test_corrupt_result_of_the_same_size_is_rejected(journal, tmp_path):
+    record = record_of(journal, tmp_path, 0)
+    size = os.path.getsize(record["result_path"])
+    # Cabeçalho ilegível
+    with open(record["result_path"], "r+b") as f:
+        f.write(b"\0" * 64)
+    assert not CompletionJournal.check_result(record)
+    # Dados alterados depois do cabeçalho: só a verificação do checksum os detecta
+    write_result(record["result_path"])
+    with open(record["result_path"], "r+b") as f:
+        f.seek(size - 16)
+        f.write(b"\xff" * 8)
+    assert os.path.getsize(record["result_path"]) == size
+    assert CompletionJournal.check_result(record)
+    assert not CompletionJournal.check_result(record, verify_checksum=True)
+
+def test_pending_lists_the_simulations_to_run_again(journal, tmp_path):
+    record_of(journal, tmp_path, 0)
+    record = record_of(journal, tmp_path, 1)
+    os.remove(record["result_path"])
+    journal.record_failure(2, 2.0, RuntimeError("timeout"))
+    sim_list = [SimpleNamespace(simulation_id=idx) for idx in range(4)]
+    assert [sim.simulation_id for sim in journal.pending(sim_list)] == [1, 2, 3]
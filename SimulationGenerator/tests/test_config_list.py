@@ -0,0 +1,35 @@
+#@brief Tests of the configuration lists stored as tables, and of the YAML lists of the previous versions
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+from omegaconf import OmegaConf
+
+from src.ConfigList import ConfigList
+
+
+def test_table_is_read_back_exactly(tmp_path):
+    fname = os.path.join(tmp_path, "list.csv")
+    columns = {"simulation_id": np.arange(3), "start_date": np.array(["2024-01-02", "2024-01-04", "2024-01-06"]),
+               "spill_lon": np.array([-39.1, -38.123456789012345, 0.1 + 0.2]), "spill_radius": [[4000.0]] * 3, "time_step": 900}
+    ConfigList.save_columns(columns, 3, fname)
+    sims = list(ConfigList.iterate(fname))
+    assert [sim.simulation_id for sim in sims] == [0, 1, 2]
+    assert [sim["spill_lon"] for sim in sims] == [-39.1, -38.123456789012345, 0.1 + 0.2]
+    assert sims[1].start_date == "2024-01-04" and sims[2].spill_radius == [4000.0] and sims[0].get("time_step") == 900
+
+def test_existing_yaml_list_replaces_a_missing_table(tmp_path):
+    fname = os.path.join(tmp_path, "default_simulations_configs_list.csv")
+    yaml_fname = os.path.join(tmp_path, "default_simulations_configs_list.yaml")
+    assert ConfigList.existing(fname) == fname
+    OmegaConf.save(config=[{"simulation_id": 0, "time_step": 900}, {"simulation_id": 1, "time_step": 450}], f=yaml_fname)
+    assert ConfigList.existing(fname) == yaml_fname
+    assert [sim.time_step for sim in ConfigList.iterate(ConfigList.existing(fname))] == [900, 450]
+    # A tabela, uma vez escrita, tem prioridade
+    ConfigList.save_columns({"simulation_id": np.arange(1), "time_step": 300}, 1, fname)
+    assert ConfigList.existing(fname) == fname
@@ -0,0 +1,82 @@
+#@brief Tests of the catalog of the cached environment files: lookup of covering entries, eviction and reuse per process
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import time
+from datetime import datetime
+
+from src.EnvironmentCatalog import EnvironmentCatalog
+
+DOMAIN = (-46.0, -37.0, -27.0, -21.0)
+INNER = (-44.0, -40.0, -26.0, -23.0)
+
+
+def add_entry(catalog: EnvironmentCatalog, fname: str, size: int, bbox: tuple, start: datetime, end: datetime, kind: str = "current") -> dict:
+    # Arquivo fictício de `size` bytes: o catálogo só lê o seu tamanho e checksum
+    path = os.path.join(catalog.field_directory, fname)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    return catalog.register(kind, [path], EnvironmentCatalog.KIND_VARIABLES[kind], bbox, start, end)
+
+
+def test_find_covering_returns_the_smallest_entry_covering_the_request(tmp_path):
+    catalog = EnvironmentCatalog(str(tmp_path))
+    add_entry(catalog, "year.nc", 4000, DOMAIN, datetime(2024, 1, 1), datetime(2024, 12, 31))
+    add_entry(catalog, "january.nc", 1000, DOMAIN, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    add_entry(catalog, "january_small.nc", 500, INNER, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    add_entry(catalog, "wind.nc", 10, DOMAIN, datetime(2024, 1, 1), datetime(2024, 12, 31), kind="wind")
+
+    assert catalog.find_covering("current", DOMAIN, datetime(2024, 1, 5), datetime(2024, 1, 10))["files"] == ["january.nc"]
+    assert catalog.find_covering("current", INNER, datetime(2024, 1, 5), datetime(2024, 1, 10))["files"] == ["january_small.nc"]
+    assert catalog.find_covering("current", DOMAIN, datetime(2024, 1, 25), datetime(2024, 2, 5))["files"] == ["year.nc"]
+    assert catalog.find_covering("wind", INNER, datetime(2024, 1, 5), datetime(2024, 1, 10))["files"] == ["wind.nc"]
+    # Fora do domínio ou das datas
+    assert catalog.find_covering("current", (-50.0, -40.0, -26.0, -23.0), datetime(2024, 1, 5), datetime(2024, 1, 10)) is None
+    assert catalog.find_covering("current", DOMAIN, datetime(2024, 12, 30), datetime(2025, 1, 2)) is None
+    # Uma entrada cujo arquivo foi apagado não é mais usada
+    os.remove(os.path.join(str(tmp_path), "january.nc"))
+    assert catalog.find_covering("current", DOMAIN, datetime(2024, 1, 5), datetime(2024, 1, 10))["files"] == ["year.nc"]
+
+def test_evict_removes_the_least_recently_used_entries_until_the_budget_fits(tmp_path):
+    catalog = EnvironmentCatalog(str(tmp_path), disk_budget_gb=2500 / 1024**3)
+    old = add_entry(catalog, "old.nc", 1000, DOMAIN, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    needed = add_entry(catalog, "tiles/needed.nc", 1000, DOMAIN, datetime(2024, 2, 1), datetime(2024, 2, 29))
+    open(os.path.join(str(tmp_path), "tiles", "needed.nc.done"), "w").close()
+    recent = add_entry(catalog, "recent.nc", 1000, DOMAIN, datetime(2024, 3, 1), datetime(2024, 3, 31))
+    for entry, last_access in ((old, "2024-01-01T00:00:00"), (needed, "2024-01-02T00:00:00"), (recent, "2024-01-03T00:00:00")):
+        entry["last_access"] = last_access
+
+    # A entrada mais antiga basta para caber no orçamento
+    catalog.evict()
+    assert [e["files"] for e in catalog.entries] == [["tiles/needed.nc"], ["recent.nc"]]
+    assert not os.path.exists(os.path.join(str(tmp_path), "old.nc"))
+
+    # Uma entrada necessária à requisição corrente é mantida, mesmo sendo a mais antiga
+    catalog.disk_budget_bytes = 1500
+    catalog.evict(keep=[needed])
+    assert [e["files"] for e in catalog.entries] == [["tiles/needed.nc"]]
+    assert os.path.exists(os.path.join(str(tmp_path), "tiles", "needed.nc"))
+
+    # Os arquivos, o marcador de conclusão e a pasta vazia do tile são apagados
+    catalog.disk_budget_bytes = 1
+    catalog.evict()
+    assert catalog.entries == []
+    assert not os.path.exists(os.path.join(str(tmp_path), "tiles"))
+    assert EnvironmentCatalog(str(tmp_path)).entries == []
+
+def test_open_reuses_the_catalog_loaded_by_the_process(tmp_path):
+    catalog = EnvironmentCatalog.open(str(tmp_path))
+    add_entry(catalog, "january.nc", 1000, DOMAIN, datetime(2024, 1, 1), datetime(2024, 1, 31))
+    assert EnvironmentCatalog.open(str(tmp_path)) is catalog
+    assert len(catalog.entries) == 1
+    # Escrito por outro processo: recarregado na próxima abertura
+    time.sleep(0.01)
+    other = EnvironmentCatalog(str(tmp_path))
+    add_entry(other, "february.nc", 1000, DOMAIN, datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert EnvironmentCatalog.open(str(tmp_path)) is catalog
+    assert [e["files"] for e in catalog.entries] == [["january.nc"], ["february.nc"]]
@@ -0,0 +1,80 @@
+#@brief Tests of the convergence error statistics computed by chunks of particles, against the computation over whole arrays
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import numpy as np
+import pytest
+import xarray as xr
+
+from src.ErrorStatistics import ErrorStatistics
+from src.TrajectoryCache import TrajectoryCache
+
+NB_PARTICLES, NB_TIMES = 1000, 6
+
+
+def make_positions(nb_simulations: int) -> tuple:
+    # Partículas de cada simulação a cerca de 100 m das da anterior
+    rng = np.random.default_rng(0)
+    lat = -25.0 + rng.random((1, NB_PARTICLES, NB_TIMES)) + np.cumsum(rng.normal(0, 1e-3, (nb_simulations, NB_PARTICLES, NB_TIMES)), axis=0)
+    lon = -40.0 + rng.random((1, NB_PARTICLES, NB_TIMES)) + np.cumsum(rng.normal(0, 1e-3, (nb_simulations, NB_PARTICLES, NB_TIMES)), axis=0)
+    return lat.astype(np.float32), lon.astype(np.float32)
+
+def save_arrays(folder, lat: np.ndarray, lon: np.ndarray) -> tuple:
+    fnames = (os.path.join(folder, "lat.npy"), os.path.join(folder, "lon.npy"))
+    for fname, array in zip(fnames, (lat, lon)):
+        np.save(fname, array)
+    return fnames
+
+def measure_distance(lat1, lon1, lat2, lon2):
+    # Como TimestepEstimator.measure_distance
+    R = 6378.137
+    dLat = np.radians(lat2 - lat1)
+    dLon = np.radians(lon2 - lon1)
+    a = (np.sin(dLat / 2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dLon / 2)**2)
+    return 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)) * R * 1000
+
+def dense_mean(lat: np.ndarray, lon: np.ndarray, ref_idx: int, cur_idx: int) -> np.ndarray:
+    # Cálculo das versões anteriores: distâncias de todas as partículas, e sua média em cada tempo
+    return measure_distance(lat[ref_idx], lon[ref_idx], lat[cur_idx], lon[cur_idx]).mean(axis=0)
+
+
+def test_chunked_statistics_match_the_dense_computation(tmp_path, monkeypatch):
+    lat, lon = make_positions(2)
+    # Partícula desativada no tempo 4 da segunda simulação: o erro desse tempo é NaN, como antes
+    lat[1, 17, 4:] = np.nan
+    lon[1, 17, 4:] = np.nan
+    lat_fname, lon_fname = save_arrays(tmp_path, lat, lon)
+    monkeypatch.setattr(ErrorStatistics, "CHUNK_PARTICLES", 128)
+    ErrorStatistics.arrays.clear()
+    statistics = ErrorStatistics.compute(lat_fname, lon_fname, 0, 1)
+
+    dense = dense_mean(lat, lon, 0, 1)
+    assert np.isnan(dense[4:]).all()
+    np.testing.assert_allclose(statistics["mean"], dense, rtol=1e-4, equal_nan=True)
+    distances = measure_distance(lat[0], lon[0], lat[1], lon[1])[:, :4]
+    # Distâncias de cerca de 100 m em float32: a ordem das operações muda a máxima em até 0.1%
+    np.testing.assert_allclose(statistics["max"][:4], distances.max(axis=0), rtol=1e-3)
+    for q in ErrorStatistics.PERCENTILES:
+        np.testing.assert_allclose(statistics[f"p{q}"][:4], np.percentile(distances, q, axis=0, method="inverted_cdf"), rtol=0.006)
+        assert np.isnan(statistics[f"p{q}"][4:]).all()
+
+def test_each_simulation_is_compared_with_the_previous_file(tmp_path):
+    lat, lon = make_positions(5)
+    raw_folder = os.path.join(tmp_path, "raw")
+    os.makedirs(raw_folder)
+    for idx in range(5):
+        # O resultado 2 tem uma saída a menos: ele e o seguinte são pulados
+        nb_times = NB_TIMES - 1 if idx == 2 else NB_TIMES
+        xr.Dataset({"lat": (("trajectory", "time"), lat[idx, :, :nb_times]), "lon": (("trajectory", "time"), lon[idx, :, :nb_times])}) \
+          .to_netcdf(os.path.join(raw_folder, f"result_{idx:04d}.nc"))
+    cache = TrajectoryCache(str(tmp_path), 5)
+    ErrorStatistics.arrays.clear()
+    statistics = ErrorStatistics.compute_successive(cache.GetArrayFileName("lat"), cache.GetArrayFileName("lon"), cache.valid)
+
+    assert sorted(statistics) == [1, 4]
+    for idx in statistics:
+        np.testing.assert_allclose(statistics[idx]["mean"], dense_mean(lat, lon, idx - 1, idx), rtol=1e-4)
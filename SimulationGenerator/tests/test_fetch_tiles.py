@@ -0,0 +1,139 @@
+#@brief Tests of the file naming and of the tiled, resumable and appended downloads of Fetch, served by a local stand-in of Copernicus Marine
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import glob
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+from omegaconf import OmegaConf
+
+from src.Fetch import Fetch
+from src.DownloadBackend import LocalFileBackend
+from exceptions.CustomExceptions import DownloadCurrentError
+
+BBOX = (-46.0, -37.0, -27.0, -21.0)
+
+
+def make_source(fname: str, variables: list):
+    # Campo horário sintético de 2024-01-01 a 2024-04-01 sobre o domínio
+    times = pd.date_range("2024-01-01", "2024-04-01", freq="h")
+    lons, lats = np.arange(-47.0, -35.5, 1.0), np.arange(-28.0, -19.5, 1.0)
+    shape = (len(times), len(lats), len(lons))
+    ds = xr.Dataset({var: (("time", "latitude", "longitude"), np.full(shape, 0.1, dtype=np.float32)) for var in variables},
+                    coords={"time": times, "latitude": lats, "longitude": lons})
+    ds.to_netcdf(fname)
+
+@pytest.fixture
+def local_sources(tmp_path):
+    sources = {}
+    for kind, dataset in Fetch.DATASETS.items():
+        fname = os.path.join(tmp_path, f"{kind}_source.nc")
+        make_source(fname, dataset["variables"])
+        sources[dataset["dataset_id"]] = fname
+    return sources
+
+def make_fetch(tmp_path, local_sources, start_date: str, end_date: str, **options) -> Fetch:
+    cm_cfg = OmegaConf.create({"start_date": start_date, "end_date": end_date, "min_lon": BBOX[0], "max_lon": BBOX[1],
+                               "min_lat": BBOX[2], "max_lat": BBOX[3], "field_directory": os.path.join(tmp_path, "environment_data"),
+                               "local_sources": local_sources, **options})
+    return Fetch(cm_cfg, OmegaConf.create({"user": "", "password": ""}))
+
+
+class CountingBackend(LocalFileBackend):
+    """
+    Local backend recording the time windows it serves, and failing on the windows starting at `fail_from`.
+    """
+    def __init__(self, sources: dict, fail_from: datetime = None):
+        super().__init__(sources)
+        self.windows = []
+        self.fail_from = fail_from
+
+    def subset(self, dataset_id, variables, minimum_longitude, maximum_longitude, minimum_latitude, maximum_latitude,
+               start_datetime, end_datetime, output_filename, output_directory, **kwargs):
+        if start_datetime == self.fail_from:
+            # Download interrompido: um arquivo parcial fica no disco
+            open(os.path.join(output_directory, output_filename), "w").close()
+            raise ConnectionError("download interrompido")
+        self.windows.append((start_datetime, end_datetime))
+        super().subset(dataset_id, variables, minimum_longitude, maximum_longitude, minimum_latitude, maximum_latitude,
+                       start_datetime, end_datetime, output_filename, output_directory, **kwargs)
+
+
+def test_local_sources_key_selects_the_local_backend(tmp_path, local_sources):
+    assert isinstance(make_fetch(tmp_path, local_sources, "2024-01-01", "2024-01-02").backend, LocalFileBackend)
+
+def test_monthly_tiles_end_one_hour_before_the_next_month(tmp_path, local_sources):
+    F = make_fetch(tmp_path, local_sources, "2024-01-15", "2024-03-10", tile_months=1, download_workers=2)
+    assert F.GetTimeTiles() == [(datetime(2024, 1, 15), datetime(2024, 1, 31, 23)),
+                                (datetime(2024, 2, 1), datetime(2024, 2, 29, 23)),
+                                (datetime(2024, 3, 1), datetime(2024, 3, 10))]
+    F.download_tiles()
+    tiles = F.GetOwnSource("current")
+    assert len(tiles) == 3
+    times = np.concatenate([xr.open_dataset(tile)["time"].values for tile in tiles])
+    # Tiles contíguos, sem hora repetida nem faltando
+    assert (np.diff(times) == np.timedelta64(1, "h")).all()
+    assert times[0] == np.datetime64("2024-01-15T00") and times[-1] == np.datetime64("2024-03-10T00")
+    assert Fetch.ReadTileMarker(tiles[1]) == (datetime(2024, 2, 1), datetime(2024, 2, 29, 23))
+
+def test_interrupted_tile_is_resumed_alone(tmp_path, local_sources):
+    F = make_fetch(tmp_path, local_sources, "2024-01-01", "2024-03-31", tile_months=1)
+    F.set_backend(CountingBackend(local_sources, fail_from=datetime(2024, 2, 1)))
+    with pytest.raises(DownloadCurrentError):
+        F.download_tiles(["current"])
+    february = F.GetTileFileName("current", datetime(2024, 2, 1), datetime(2024, 2, 29, 23))
+    assert not Fetch.IsTileComplete(february) and os.path.exists(february.replace(".nc", ".part.nc"))
+    assert F.GetOwnSource("current") is None
+
+    backend = CountingBackend(local_sources)
+    F.set_backend(backend)
+    F.download_tiles(["current"])
+    assert backend.windows == [(datetime(2024, 2, 1), datetime(2024, 2, 29, 23))]
+    assert Fetch.IsTileComplete(february) and not os.path.exists(february.replace(".nc", ".part.nc"))
+    assert len(F.GetOwnSource("current")) == 3
+
+def test_rolling_store_appends_only_the_missing_hours(tmp_path, local_sources):
+    F = make_fetch(tmp_path, local_sources, "2024-01-05", "2024-01-10", append_mode=True)
+    F.download_deltas(["current"])
+    first_chunk, = F.GetRollingFiles("current")
+    first_mtime = os.path.getmtime(first_chunk)
+
+    F = make_fetch(tmp_path, local_sources, "2024-01-01", "2024-01-20", append_mode=True)
+    backend = CountingBackend(local_sources)
+    F.set_backend(backend)
+    F.download_deltas(["current"])
+    assert backend.windows == [(datetime(2024, 1, 1), datetime(2024, 1, 4, 23)), (datetime(2024, 1, 10, 1), datetime(2024, 1, 20))]
+    assert os.path.getmtime(first_chunk) == first_mtime
+    assert F.GetRollingCoverage("current") == (datetime(2024, 1, 1), datetime(2024, 1, 20))
+    assert len(F.GetOwnSource("current")) == 3
+    assert not glob.glob(os.path.join(F.GetRollingFolder("current"), "*.part.nc"))
+    # Nada a baixar quando o store já cobre a janela
+    backend.windows = []
+    F.download_deltas(["current"])
+    assert backend.windows == []
+
+def test_files_named_by_the_previous_versions_are_still_found(tmp_path, local_sources):
+    F = make_fetch(tmp_path, local_sources, "2024-01-05", "2024-01-10", min_lon=-45.5, max_lat=-21.25)
+    assert F.GetDomainStr() == "(-45.5,-37,-27,-21.25)" and F.GetDomainStr(legacy=True) == "(-45,-37,-27,-21)"
+    # Arquivos baixados com o nome truncado ao grau das versões anteriores
+    os.makedirs(F.cm_data.field_directory)
+    for kind in Fetch.DATASETS:
+        fname = F.GetCurrentFileName(legacy=True) if kind == "current" else F.GetWindFileName(legacy=True)
+        make_source(fname, Fetch.DATASETS[kind]["variables"])
+    assert F.GetCurrentSource() == F.GetCurrentFileName(legacy=True)
+    backend = CountingBackend(local_sources)
+    F.set_backend(backend)
+    F.download_data()
+    assert backend.windows == []
+    # Um domínio inteiro mantém o seu nome
+    G = make_fetch(tmp_path, local_sources, "2024-01-05", "2024-01-10")
+    assert G.GetDomainStr() == G.GetDomainStr(legacy=True) == "(-46,-37,-27,-21)"
+
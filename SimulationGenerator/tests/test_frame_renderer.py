@@ -0,0 +1,81 @@
+#@brief Tests of the fast animation renderer: positions of the elements, cached background frames and encoded animation
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from opendrift.readers import reader_netCDF_CF_generic
+from PIL import Image
+
+from src.FrameRenderer import FrameRenderer
+
+TIMES = pd.date_range("2024-01-01", periods=4, freq="6h")
+
+
+def make_reader(folder: str):
+    # Corrente de 0.5 m/s para leste sobre (-46, -37) x (-27, -21), mascarada (terra) a oeste de -44
+    lons, lats = np.linspace(-46, -37, 19), np.linspace(-27, -21, 13)
+    u = np.full((len(TIMES), len(lats), len(lons)), 0.5, dtype=np.float32)
+    u[:, :, lons < -44] = np.nan
+    coords = {"time": TIMES,
+              "latitude": ("latitude", lats, {"standard_name": "latitude", "units": "degrees_north"}),
+              "longitude": ("longitude", lons, {"standard_name": "longitude", "units": "degrees_east"})}
+    fname = os.path.join(folder, "current.nc")
+    xr.Dataset({"uo": (("time", "latitude", "longitude"), u, {"standard_name": "eastward_sea_water_velocity", "units": "m s-1"}),
+                "vo": (("time", "latitude", "longitude"), u * 0, {"standard_name": "northward_sea_water_velocity", "units": "m s-1"})},
+               coords=coords).to_netcdf(fname)
+    return reader_netCDF_CF_generic.Reader(fname)
+
+def write_result(folder: str) -> str:
+    # Elemento 0 ativo; elemento 1 desativado depois do segundo instante; elemento 2 semeado no terceiro
+    lon = np.array([[-40.0, -39.8, -39.6, -39.4], [-41.0, -41.2, np.nan, np.nan], [np.nan, np.nan, -40.5, -40.4]])
+    lat = np.array([[-24.0, -24.0, -24.0, -24.0], [-25.0, -25.1, np.nan, np.nan], [np.nan, np.nan, -23.0, -23.0]])
+    fname = os.path.join(folder, "result_0000.nc")
+    xr.Dataset({"lon": (("trajectory", "time"), lon), "lat": (("trajectory", "time"), lat)}, coords={"time": TIMES}).to_netcdf(fname)
+    return fname
+
+
+def test_nearest_indices_on_unsorted_axes():
+    axis = np.array([3.0, 1.0, 2.0, 0.0])
+    np.testing.assert_array_equal(FrameRenderer.nearest_indices(axis, np.array([0.2, 0.9, 1.6, 2.4, 3.0, -0.1, 3.5])), [3, 1, 2, 2, 0, -1, -1])
+
+def test_deactivated_elements_stay_at_their_last_position(tmp_path):
+    times, lon, lat, active, deactivated = FrameRenderer.load_positions(write_result(str(tmp_path)))
+    assert len(times) == 4
+    assert active.tolist() == [[True] * 4, [True, True, False, False], [False, False, True, True]]
+    assert deactivated.tolist() == [[False] * 4, [False, False, True, True], [False] * 4]
+    np.testing.assert_array_equal(lon[1], [-41.0, -41.2, -41.2, -41.2])
+    np.testing.assert_array_equal(lat[1], [-25.0, -25.1, -25.1, -25.1])
+
+def test_background_is_colored_by_speed_and_cached(tmp_path):
+    reader = make_reader(str(tmp_path))
+    # Quadro mais largo que o domínio do reader dos dois lados
+    renderer = FrameRenderer((-48.0, -35.0, -27.0, -21.0), width=130, vmax=1.0)
+    FrameRenderer.background_cache.clear()
+    frame = renderer.background(reader, TIMES[1].to_pydatetime())
+    assert frame.shape == (renderer.height, 130, 3)
+    middle = frame[renderer.height // 2]
+    # Fora do domínio e sobre a terra: cinza; sobre o mar: cor de 0.5 m/s
+    assert tuple(middle[5]) == tuple(middle[25]) == tuple(middle[-5]) == FrameRenderer.LAND_COLOR
+    assert tuple(middle[80]) == tuple(renderer.lut[127])
+    assert renderer.background(reader, TIMES[1].to_pydatetime()) is frame
+    assert len(FrameRenderer.background_cache) == 1
+
+def test_animation_has_one_frame_per_output(tmp_path):
+    reader = make_reader(str(tmp_path))
+    renderer = FrameRenderer((-46.0, -37.0, -27.0, -21.0), width=90, marker_size=3)
+    animation_fname = os.path.join(str(tmp_path), "result_0000.gif")
+    renderer.render(write_result(str(tmp_path)), reader, animation_fname)
+    with Image.open(animation_fname) as image:
+        assert image.n_frames == 4
+        assert image.size == (90, renderer.height)
+    # O elemento ativo em (-40, -24) é desenhado em preto sobre o fundo
+    frame = np.asarray(renderer.render_frames(write_result(str(tmp_path)), reader)[0])
+    col, row = int((-40 + 46) / 9 * 90), int((-21 + 24) / 6 * renderer.height)
+    assert tuple(frame[row, col]) == FrameRenderer.ACTIVE_COLOR
@@ -0,0 +1,115 @@
+#@brief Tests of the job queue file, shared by several worker processes of this machine
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import time
+import multiprocessing
+
+import pytest
+
+from src.JobQueue import JobQueue
+from src.SimTask import SimTask
+
+SWEEP = "/results/sweep_a"
+
+
+def make_tasks(nb_tasks: int) -> list:
+    return [SimTask(idx, "2024-01-02", "2024-01-04", -39.0, -25.0, 4000.0, 3600, 86400, 100, -46.0, -37.0, -27.0, -21.0)
+            for idx in range(nb_tasks)]
+
+def work(queue_fname: str, claimed):
+    # Worker: reclama as simulações uma a uma, renovando a lease, até a fila esvaziar
+    queue = JobQueue.open(queue_fname, SWEEP)
+    worker = JobQueue.worker_id()
+    while (task := queue.claim(worker)) is not None:
+        assert queue.heartbeat(task.simulation_id, worker)
+        if task.simulation_id % 5 == 0 and queue.get_context().get("fail_multiples_of_5", False):
+            queue.fail(task.simulation_id, worker, RuntimeError("falha de teste"))
+        else:
+            queue.complete(task.simulation_id, worker)
+        claimed.put(task.simulation_id)
+
+
+@pytest.fixture
+def queue_fname(tmp_path):
+    return os.path.join(tmp_path, "queue.sqlite")
+
+
+def run_workers(queue_fname: str, nb_workers: int = 4) -> list:
+    claimed = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=work, args=(queue_fname, claimed)) for _ in range(nb_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+    ids = []
+    while not claimed.empty():
+        ids.append(claimed.get())
+    return ids
+
+
+def test_each_job_is_claimed_once_by_concurrent_workers(queue_fname):
+    queue = JobQueue(queue_fname, SWEEP)
+    queue.set_context({"lease_seconds": 600, "max_attempts": 3})
+    queue.fill(make_tasks(40), [float(idx % 7) for idx in range(40)])
+    ids = run_workers(queue_fname)
+    assert sorted(ids) == list(range(40))
+    assert queue.counts() == {"done": 40}
+
+def test_failing_jobs_are_retried_up_to_max_attempts_by_concurrent_workers(queue_fname):
+    queue = JobQueue(queue_fname, SWEEP)
+    queue.set_context({"lease_seconds": 600, "max_attempts": 2, "fail_multiples_of_5": True})
+    queue.fill(make_tasks(20))
+    ids = run_workers(queue_fname)
+    assert sorted(ids) == sorted(list(range(20)) + list(range(0, 20, 5)))
+    assert queue.counts() == {"done": 16, "failed": 4}
+
+
+def test_fail_marks_the_job_failed_after_max_attempts(queue_fname):
+    queue = JobQueue(queue_fname, SWEEP, max_attempts=2)
+    queue.fill(make_tasks(1))
+    for _ in range(2):
+        task = queue.claim("w1")
+        queue.fail(task.simulation_id, "w1", RuntimeError("erro"))
+    assert queue.claim("w1") is None
+    assert queue.counts() == {"failed": 1}
+
+def test_expired_lease_is_reclaimed_until_max_attempts(queue_fname):
+    queue = JobQueue(queue_fname, SWEEP, lease_seconds=0.05, max_attempts=2)
+    queue.fill(make_tasks(1))
+    assert queue.claim("w1").simulation_id == 0
+    time.sleep(0.1)
+    # O worker w1 morreu: a lease expira e a simulação é reclamada por w2
+    assert queue.claim("w2").simulation_id == 0
+    assert not queue.heartbeat(0, "w1")
+    time.sleep(0.1)
+    assert queue.claim("w3") is None
+    assert queue.counts() == {"failed": 1}
+
+def test_fill_resets_the_jobs_of_the_sweep(queue_fname):
+    queue = JobQueue(queue_fname, SWEEP)
+    queue.fill(make_tasks(1))
+    queue.complete(queue.claim("w1").simulation_id, "w1")
+    assert queue.counts() == {"done": 1}
+    # Novo run do sweep (overwrite): a simulação é executada de novo
+    queue.fill(make_tasks(1))
+    assert queue.counts() == {"pending": 1}
+    assert queue.claim("w1").simulation_id == 0
+
+def test_sweeps_sharing_a_file_do_not_collide(queue_fname):
+    queue_a, queue_b = JobQueue(queue_fname, SWEEP), JobQueue(queue_fname, "/results/sweep_b")
+    queue_a.set_context({"result_path": "a"})
+    queue_b.set_context({"result_path": "b"})
+    queue_a.fill(make_tasks(2))
+    queue_b.fill(make_tasks(3))
+    queue_a.complete(queue_a.claim("w1").simulation_id, "w1")
+    assert queue_a.counts() == {"done": 1, "pending": 1}
+    assert queue_b.counts() == {"pending": 3}
+    assert queue_b.get_context() == {"result_path": "b"}
+    with pytest.raises(ValueError):
+        JobQueue.open(queue_fname)
@@ -0,0 +1,28 @@
+#@brief Tests of the percentiles read from the logarithmic histograms of ErrorStatistics and CourantEstimate
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import numpy as np
+import pytest
+
+from src.LogHistogram import LogHistogram
+
+
+@pytest.mark.parametrize("log_min, log_max, bins_per_decade, tolerance", [(-3, 8, 200, 0.006), (-10, 0, 100, 0.012)])
+def test_percentiles_are_within_half_a_bin(log_min, log_max, bins_per_decade, tolerance):
+    histogram = LogHistogram(log_min, log_max, bins_per_decade)
+    values = 10 ** np.random.default_rng(0).uniform(log_min + 1, log_max - 1, 100000)
+    # Contagens somadas por blocos, como nos chunks de partículas ou de horas
+    counts = sum(histogram.counts(chunk) for chunk in np.array_split(values, 7))
+    assert np.array_equal(histogram.bin_index(values), np.searchsorted(histogram.edges, values))
+    for q in (50, 95, 99):
+        assert histogram.percentile(counts, q) == pytest.approx(np.percentile(values, q, method="inverted_cdf"), rel=tolerance)
+
+def test_percentiles_per_row_and_of_empty_rows():
+    histogram = LogHistogram(-3, 8, 200)
+    counts = np.stack([histogram.counts(np.array([1.0, 10.0, 100.0])), np.zeros(histogram.nb_bins, dtype=np.int64)])
+    medians = histogram.percentile(counts, 50)
+    assert medians[0] == pytest.approx(10.0, rel=0.006) and np.isnan(medians[1])
@@ -0,0 +1,68 @@
+#@brief Tests of the reuse of the Opendrift readers across the simulations of one process
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from opendrift.readers import reader_netCDF_CF_generic
+
+from src.ReaderCache import ReaderCache
+
+
+def write_current(fname: str):
+    coords = {"time": pd.date_range("2024-01-01", periods=4, freq="6h"),
+              "latitude": ("latitude", np.linspace(-27, -21, 7), {"standard_name": "latitude", "units": "degrees_north"}),
+              "longitude": ("longitude", np.linspace(-46, -37, 10), {"standard_name": "longitude", "units": "degrees_east"})}
+    field = np.full((4, 7, 10), 0.2, dtype=np.float32)
+    xr.Dataset({"uo": (("time", "latitude", "longitude"), field, {"standard_name": "eastward_sea_water_velocity", "units": "m s-1"}),
+                "vo": (("time", "latitude", "longitude"), field, {"standard_name": "northward_sea_water_velocity", "units": "m s-1"})},
+               coords=coords).to_netcdf(fname)
+
+def counting_opener(calls: list):
+    def opener(source):
+        calls.append(source)
+        return reader_netCDF_CF_generic.Reader(source)
+    return opener
+
+
+def test_reader_is_opened_once_and_reset_between_simulations(tmp_path):
+    fname = os.path.join(str(tmp_path), "current.nc")
+    write_current(fname)
+    calls = []
+    opener = counting_opener(calls)
+    ReaderCache.clear()
+    reader, open_time, saved = ReaderCache.get(fname, opener)
+    assert saved == 0.0 and open_time > 0
+    # Blocos de dados deixados pela simulação anterior
+    reader.var_block_before = {"x_sea_water_velocity": object()}
+    reader.var_block_after = {"x_sea_water_velocity": object()}
+
+    reused, _, saved = ReaderCache.get(os.path.join(str(tmp_path), ".", "current.nc"), opener)
+    assert reused is reader
+    assert calls == [fname]
+    assert saved == open_time
+    assert reused.var_block_before == {} and reused.var_block_after == {}
+
+def test_readers_are_kept_by_source_and_opener(tmp_path):
+    fnames = [os.path.join(str(tmp_path), f"current_{idx}.nc") for idx in range(2)]
+    for fname in fnames:
+        write_current(fname)
+    calls, other_calls = [], []
+    ReaderCache.clear()
+    first, _, _ = ReaderCache.get(fnames[0], counting_opener(calls))
+    second, _, _ = ReaderCache.get(fnames[1], counting_opener(calls))
+    assert first is not second
+    # Mesmo nome de abridor: o leitor já aberto é o usado
+    assert ReaderCache.get(fnames[0], counting_opener(other_calls))[0] is first
+    assert other_calls == []
+    # Leitor registrado por outro meio (memória compartilhada), usado sem abrir a fonte
+    ReaderCache.put(fnames[1], reader_netCDF_CF_generic.Reader, first)
+    assert ReaderCache.get(fnames[1], reader_netCDF_CF_generic.Reader)[0] is first
+    ReaderCache.clear()
+    assert ReaderCache.readers == {}
@@ -0,0 +1,44 @@
+#@brief Tests of the Richardson estimate of the error left in a time step ladder
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import numpy as np
+import pytest
+
+from src.RichardsonEstimate import RichardsonEstimate
+
+
+def ladder_differences(timesteps: list, order: float, constant: float = 2.0) -> list:
+    # Níveis sintéticos de erro exato C h^p: a diferença entre dois níveis é C (h_coarse^p - h_fine^p)
+    errors = [constant * h**order for h in timesteps]
+    return [np.nan] + [errors[i - 1] - errors[i] for i in range(1, len(errors))]
+
+
+@pytest.mark.parametrize("order", [1.0, 2.0, 4.0])
+@pytest.mark.parametrize("timesteps", [[1800, 900, 450], [3600, 1800, 900, 450], [1000, 300, 150], [600, 540, 270]])
+def test_observed_order_with_non_uniform_ratios(timesteps, order):
+    scaled = [h / 1000 for h in timesteps]
+    differences = ladder_differences(scaled, order)
+    assert RichardsonEstimate.observed_order(differences, scaled) == pytest.approx(order, rel=1e-6)
+
+def test_remaining_error_is_the_error_of_the_last_level():
+    timesteps = [1.0, 0.3, 0.15]
+    differences = ladder_differences(timesteps, 1.0)
+    error, order = RichardsonEstimate.remaining_error(differences, timesteps, rk4=False)
+    assert order == pytest.approx(1.0)
+    assert error == pytest.approx(2.0 * 0.15)
+
+def test_order_is_capped_by_the_scheme():
+    timesteps = [1.0, 0.5, 0.25]
+    differences = ladder_differences(timesteps, 2.0)
+    error, order = RichardsonEstimate.remaining_error(differences, timesteps, rk4=False)
+    assert order == 1
+    assert error == pytest.approx(differences[-1]) # Ordem 1 e razão 2: diferença / (2 - 1)
+
+def test_differences_not_decreasing_give_an_unknown_error():
+    timesteps = [1.0, 0.5, 0.25]
+    assert np.isnan(RichardsonEstimate.observed_order([np.nan, 1.0, 1.5], timesteps))
+    assert RichardsonEstimate.remaining_error([np.nan, 1.0, 1.5], timesteps, rk4=True)[0] == np.inf
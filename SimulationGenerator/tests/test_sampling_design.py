@@ -0,0 +1,70 @@
+#@brief Tests of the sampling designs of the spill parameters: budget of runs, stratification and coverage of the spill area
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import math
+
+import numpy as np
+import pytest
+
+from src.SamplingDesign import SamplingDesign
+
+AREA = (-39.75, -38.25, -25.5, -24.5)
+
+
+def to_area(unit_lons: np.ndarray, unit_lats: np.ndarray) -> tuple:
+    return AREA[0] + unit_lons * (AREA[1] - AREA[0]), AREA[2] + unit_lats * (AREA[3] - AREA[2])
+
+
+@pytest.mark.parametrize("nb_runs, nb_cells", [(6, 1), (23, 1), (24, 2), (100, 4), (1536, 16), (1700, 16)])
+def test_grid_uses_the_largest_grid_within_the_budget(nb_runs, nb_cells):
+    nb_dates, nb_radiuses = 3, 2
+    date_idx, unit_lons, unit_lats, radius_idx = SamplingDesign.sample("grid", nb_runs, nb_dates, nb_radiuses, seed=0)
+    assert len(date_idx) == nb_dates * nb_cells**2 * nb_radiuses <= nb_runs < nb_dates * (nb_cells + 1)**2 * nb_radiuses
+    # Cada data e raio cruzados uma vez com cada célula, cada derramamento dentro da sua célula
+    cells = np.column_stack([date_idx, np.floor(unit_lons * nb_cells), np.floor(unit_lats * nb_cells), radius_idx])
+    assert len(np.unique(cells, axis=0)) == len(cells)
+    assert ((0 <= unit_lons) & (unit_lons < 1) & (0 <= unit_lats) & (unit_lats < 1)).all()
+
+def test_grid_needs_a_budget_of_one_cell():
+    with pytest.raises(ValueError):
+        SamplingDesign.sample("grid", 5, 3, 2)
+
+@pytest.mark.parametrize("design", ["lhs", "sobol", "halton"])
+def test_designs_draw_the_budget_over_every_date_and_radius(design):
+    date_idx, unit_lons, unit_lats, radius_idx = SamplingDesign.sample(design, 64, 4, 2, seed=0)
+    assert len(date_idx) == len(unit_lons) == len(unit_lats) == len(radius_idx) == 64
+    assert set(date_idx) == {0, 1, 2, 3} and set(radius_idx) == {0, 1}
+    if design == "lhs":
+        # Hipercubo latino: o mesmo número de runs em cada data e raio
+        assert (np.bincount(date_idx) == 16).all() and (np.bincount(radius_idx) == 32).all()
+
+def test_grid_coverage_is_bounded_by_its_cells_and_beats_the_product():
+    nb_cells = 16
+    _, unit_lons, unit_lats, _ = SamplingDesign.sample("grid", nb_cells**2, 1, 1, seed=0)
+    lons, lats = to_area(unit_lons, unit_lats)
+    grid = SamplingDesign.coverage(lons, lats, AREA)
+    # Todo ponto da área está a menos de uma diagonal de célula do derramamento da sua célula
+    km_per_lon = SamplingDesign.KM_PER_DEGREE * math.cos(math.radians((AREA[2] + AREA[3]) / 2))
+    cell_diagonal_km = math.hypot((AREA[1] - AREA[0]) / nb_cells * km_per_lon, (AREA[3] - AREA[2]) / nb_cells * SamplingDesign.KM_PER_DEGREE)
+    assert grid["fill_distance_km"] <= cell_diagonal_km
+    assert grid["mean_distance_km"] <= grid["fill_distance_km"]
+
+    # Produto de 16 longitudes por 16 latitudes sorteadas, com o mesmo número de centros
+    rng = np.random.default_rng(0)
+    product_lons, product_lats = np.meshgrid(*to_area(rng.random(nb_cells), rng.random(nb_cells)))
+    product = SamplingDesign.coverage(product_lons.ravel(), product_lats.ravel(), AREA)
+    assert grid["fill_distance_km"] < product["fill_distance_km"]
+    assert grid["discrepancy"] < product["discrepancy"]
+
+def test_coverage_of_centers_on_a_regular_grid():
+    # Centros no meio de 4 x 4 células: a distância máxima é a meia diagonal de uma célula, num canto da área
+    centers = (np.arange(4) + 0.5) / 4
+    lons, lats = np.meshgrid(*to_area(centers, centers))
+    coverage = SamplingDesign.coverage(lons.ravel(), lats.ravel(), AREA, resolution=401)
+    km_per_lon = SamplingDesign.KM_PER_DEGREE * math.cos(math.radians((AREA[2] + AREA[3]) / 2))
+    half_diagonal_km = math.hypot((AREA[1] - AREA[0]) / 8 * km_per_lon, (AREA[3] - AREA[2]) / 8 * SamplingDesign.KM_PER_DEGREE)
+    assert coverage["fill_distance_km"] == pytest.approx(half_diagonal_km, rel=1e-6)
@@ -0,0 +1,73 @@
+#@brief Tests of the environment fields shared with the pool workers through shared memory
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import sys
+import subprocess
+import textwrap
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda num processo à parte, para que os avisos do resource tracker (processo filho dele) apareçam no seu stderr
+SCENARIO = textwrap.dedent("""
+    import os
+    import sys
+    import multiprocessing as mp
+    from datetime import datetime
+    import numpy as np
+    import pandas as pd
+    import xarray as xr
+    from src.SharedEnvironment import SharedEnvironment, SharedMemoryReader
+
+    def read(metadata):
+        # Worker: abre o reader sobre os blocos compartilhados e lê um valor
+        reader = SharedMemoryReader(metadata)
+        value = float(reader.Dataset["uo"].values[0, 0, 0])
+        for block in reader.blocks:
+            block.close()
+        return value
+
+    if __name__ == "__main__":
+        mp.set_start_method(sys.argv[2])
+        times = pd.date_range("2024-01-01", "2024-01-03", freq="h")
+        lons, lats = np.arange(-46.0, -36.5, 1.0), np.arange(-27.0, -20.5, 1.0)
+        ds = xr.Dataset({var: (("time", "latitude", "longitude"), np.full((len(times), len(lats), len(lons)), 0.25, dtype=np.float32)) for var in ("uo", "vo")},
+                        coords={"time": times, "latitude": lats, "longitude": lons})
+        ds.to_netcdf(sys.argv[1])
+        env = SharedEnvironment(sys.argv[1], (-45.0, -38.0, -26.0, -22.0), datetime(2024, 1, 1, 12), datetime(2024, 1, 2, 12))
+        names = [var["block"] for var in env.metadata["variables"].values()]
+        # Workers recriados a cada tarefa: cada um se anexa aos blocos e termina
+        with mp.Pool(2, maxtasksperchild=1) as pool:
+            assert pool.map(read, [env.metadata] * 6) == [0.25] * 6
+        # Um processo independente se anexa e termina
+        process = mp.get_context("spawn").Process(target=read, args=(env.metadata,))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        # Os blocos continuam no sistema depois que os workers terminaram (sem se anexar de novo, o que os registraria)
+        assert all(os.path.exists(os.path.join("/dev/shm", name)) for name in names)
+        env.release()
+        # Liberados pelo pai: não existem mais
+        assert not any(os.path.exists(os.path.join("/dev/shm", name)) for name in names)
+        print("ok")
+""")
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="the shared memory blocks are listed in /dev/shm on Linux only")
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_shared_blocks_are_neither_unlinked_early_nor_leaked(tmp_path, start_method):
+    script = os.path.join(tmp_path, "scenario.py")
+    with open(script, "w") as f:
+        f.write(SCENARIO)
+    result = subprocess.run([sys.executable, script, os.path.join(tmp_path, "current.nc"), start_method],
+                            cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
+    # Nem vazamento, nem desregistro em excesso no resource tracker
+    assert "leaked" not in result.stderr and "KeyError" not in result.stderr, result.stderr
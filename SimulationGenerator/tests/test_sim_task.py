@@ -0,0 +1,46 @@
+#@brief Tests of the compact task records sent to the pool workers
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import pickle
+from multiprocessing import Pool
+
+from omegaconf import OmegaConf
+
+from src.RunASimulation import RunASimulation
+from src.SimTask import SimTask
+
+SIM_CFG = {
+    "simulation_id": 7, "start_date": "2024-01-02", "end_date": "2024-01-07", "min_lon": -46.0, "max_lon": -37.0,
+    "min_lat": -27.0, "max_lat": -21.0, "duration_days": 5, "nb_time_slots": 5, "spill_lon": -39.0, "spill_lat": -25.0,
+    "spill_radius": 4000.0, "n_diff_center_spill_pos": 2, "constrain_rate": 0.5, "num_seed_elements": 1000,
+    "time_step": 180, "output_time_step": 86400,
+}
+
+
+def read_context(_):
+    return RunASimulation.worker_context
+
+
+def test_task_reads_as_the_simulation_configuration():
+    sim_cfg = OmegaConf.create(SIM_CFG)
+    task = SimTask.from_cfg(sim_cfg)
+    for field in SimTask.FIELDS:
+        assert getattr(task, field) == sim_cfg[field]
+    # Sem atributos além dos campos da simulação
+    assert not hasattr(task, "__dict__")
+
+def test_task_pickles_as_a_small_tuple():
+    sim_cfg = OmegaConf.create(SIM_CFG)
+    task = SimTask.from_cfg(sim_cfg)
+    payload = pickle.dumps(task)
+    copy = pickle.loads(payload)
+    assert repr(copy) == repr(task)
+    assert len(payload) < len(pickle.dumps(sim_cfg)) / 10
+
+def test_workers_receive_the_simulator_once_through_the_initializer():
+    with Pool(2, initializer=RunASimulation.init_worker, initargs=([], (), ("simulator", False, True))) as pool:
+        assert pool.map(read_context, range(4)) == [("simulator", False, True)] * 4
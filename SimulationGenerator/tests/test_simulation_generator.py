@@ -0,0 +1,95 @@
+#@brief Tests of the configuration list of the product design, against the rows composed by Hydra in the previous versions
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import glob
+import shutil
+from datetime import datetime, timedelta
+from itertools import product
+
+import numpy as np
+import pytest
+from hydra import initialize, compose
+from omegaconf import OmegaConf
+
+from src.ConfigList import ConfigList
+from src.SimulationGenerator import SimulationGenerator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE = {
+    "simulation_id": 0, "start_date": "2024-01-02", "end_date": "2024-01-02",
+    "min_lon": -46.0, "max_lon": -37.0, "min_lat": -27.0, "max_lat": -21.0,
+    "duration_days": 2, "nb_time_slots": 3, "spill_lon": -39.0, "spill_lat": -25.0, "spill_radius": [4000.0, 8000.0],
+    "n_diff_center_spill_pos": 3, "constrain_rate": 0.5, "num_seed_elements": 50, "time_step": 1000, "output_time_step": 21600,
+}
+
+
+@pytest.fixture
+def config_folder(tmp_path, monkeypatch):
+    """
+    Configuration folder of the test, relative to the SimulationGenerator folder as the generators expect it
+    (Hydra resolves it from src/).
+    """
+    folder = os.path.join(tmp_path, "conf")
+    os.makedirs(folder)
+    for fname in glob.glob(os.path.join(ROOT, "conf", "*.yaml")):
+        shutil.copy(fname, folder)
+    shutil.copy(os.path.join(folder, "cm_credentials_example.yaml"), os.path.join(folder, "cm_credentials.yaml"))
+    main_cfg = OmegaConf.load(os.path.join(folder, "main.yaml"))
+    main_cfg.paths.list_sim_configs_location = os.path.join(str(tmp_path), "conf_lists")
+    OmegaConf.save(main_cfg, os.path.join(folder, "main.yaml"))
+    OmegaConf.save(OmegaConf.create(REFERENCE), os.path.join(folder, "reference_simgen_config.yaml"))
+    monkeypatch.chdir(ROOT)
+    return os.path.relpath(folder, ROOT) + "/"
+
+
+def hydra_rows(config_folder: str, time_step: int) -> list:
+    """
+    The configuration list of the product design as composed by the previous versions: one Hydra composition of the
+    reference configuration per combination, drawing the spill positions from the global NumPy generator.
+    """
+    param_cfg = OmegaConf.create(REFERENCE)
+    gif_cfg = OmegaConf.load(os.path.join(config_folder, "gif_frame_config.yaml"))
+    start_date_base = datetime.strptime(param_cfg.start_date, "%Y-%m-%d")
+    start_date_list = [start_date_base + timedelta(days=i) for i in range(0, param_cfg.nb_time_slots*param_cfg.duration_days, param_cfg.duration_days)]
+    media_lon, media_lat = (gif_cfg.min_lon+gif_cfg.max_lon)/2, (gif_cfg.min_lat+gif_cfg.max_lat)/2
+    range_lon = (gif_cfg.min_lon-gif_cfg.max_lon)*param_cfg.constrain_rate
+    range_lat = (gif_cfg.min_lat-gif_cfg.max_lat)*param_cfg.constrain_rate
+    spill_lons, spill_lats = [], []
+    for _ in range(param_cfg.n_diff_center_spill_pos):
+        spill_lons.append(media_lon+np.random.uniform(-range_lon/2, range_lon/2))
+        spill_lats.append(media_lat+np.random.uniform(-range_lat/2, range_lat/2))
+    rows = []
+    # Caminho da pasta de configuração relativo a este arquivo, como o Hydra espera
+    with initialize(config_path=os.path.relpath(os.path.join(ROOT, config_folder), os.path.dirname(os.path.abspath(__file__))), version_base=None):
+        for idx, (start_date, lon, lat, radius) in enumerate(product(start_date_list, spill_lons, spill_lats, param_cfg.spill_radius)):
+            overrides = [
+                f"simulation_id={idx}",
+                f"start_date={start_date.strftime('%Y-%m-%d')}",
+                f"end_date={(start_date + timedelta(days=param_cfg.duration_days)).strftime('%Y-%m-%d')}",
+                f"spill_lon={lon}",
+                f"spill_lat={lat}",
+                f"spill_radius={radius}",
+                f"time_step={time_step}"
+            ]
+            rows.append(OmegaConf.to_container(compose(config_name="reference_simgen_config", overrides=overrides)))
+    return rows
+
+
+@pytest.mark.parametrize("configlist_file", ["list.csv", "list.yaml"])
+def test_product_list_matches_the_hydra_rows(config_folder, configlist_file):
+    SG = SimulationGenerator(config_folder, "reference_simgen_config", configlist_file)
+    np.random.seed(7)
+    SG.generate_sim_configs(False)
+    rows = [sim._asdict() if hasattr(sim, "_asdict") else OmegaConf.to_container(sim) for sim in ConfigList.iterate(os.path.join(SG.principal_cfg.paths.list_sim_configs_location, configlist_file))]
+
+    np.random.seed(7)
+    expected = hydra_rows(config_folder, SG.timestep_correction())
+    assert len(rows) == len(expected) == 3 * 3 * 3 * 2
+    assert rows == expected
+    # Time step corrigido para dividir o passo de saída
+    assert rows[0]["time_step"] == 1080
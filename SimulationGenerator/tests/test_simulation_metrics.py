@@ -0,0 +1,85 @@
+#@brief Tests of the per-simulation stage timings and of the metrics table
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import csv
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.SimulationMetrics import SimulationMetrics
+
+
+class Model:
+    """
+    Stand-in for an Opendrift model: its run writes the output buffer twice.
+    """
+    def __init__(self):
+        self.steps_calculation = 0
+
+    def io_write_buffer(self):
+        time.sleep(0.05)
+
+    def io_close(self):
+        time.sleep(0.02)
+
+    def run(self):
+        for _ in range(2):
+            time.sleep(0.05)
+            self.steps_calculation += 10
+            self.io_write_buffer()
+        self.io_close()
+
+
+def test_writing_inside_the_run_is_not_counted_as_integration(tmp_path):
+    result_fname = os.path.join(str(tmp_path), "result_0000.nc")
+    with open(result_fname, "wb") as f:
+        f.write(b"\0" * 1234)
+    o = Model()
+    metrics = SimulationMetrics()
+    metrics.watch_writing(o)
+    with metrics.stage("integration"):
+        o.run()
+    record = metrics.record(o, SimpleNamespace(simulation_id=4, num_seed_elements=50), result_fname)
+
+    assert record["writing_s"] >= 0.12
+    # 0.22 s dentro de o.run, dos quais 0.12 s de escrita
+    assert 0.10 <= record["integration_s"] < 0.17
+    assert record["steps"] == 20
+    assert record["steps_per_s"] == pytest.approx(20 / record["integration_s"])
+    assert record["output_bytes"] == 1234
+    assert record["peak_rss_mb"] > 0
+
+def test_shared_stages_are_divided_among_the_batch(tmp_path):
+    result_fname = os.path.join(str(tmp_path), "result_0000.nc")
+    open(result_fname, "wb").close()
+    metrics = SimulationMetrics()
+    with metrics.stage("seeding"):
+        time.sleep(0.1)
+    record = metrics.record(Model(), SimpleNamespace(simulation_id=0, num_seed_elements=50), result_fname, batch_size=4)
+    assert record["batch_size"] == 4
+    assert 0.025 <= record["seeding_s"] < 0.05
+    # A animação, feita depois, substitui a sua parte no tempo total
+    animated = SimulationMetrics.add_animation(record, 2.0)
+    assert animated["animation_s"] == 2.0
+    assert animated["total_s"] == pytest.approx(record["total_s"] + 2.0)
+
+def test_table_holds_the_completed_simulations(tmp_path):
+    metrics = {column: 1 for column in SimulationMetrics.COLUMNS}
+    records = {
+        2: {"status": "done", "metrics": {**metrics, "simulation_id": 2}},
+        0: {"status": "done", "metrics": {**metrics, "simulation_id": 0, "extra": "ignorada"}},
+        1: {"status": "failed"},
+        3: {"status": "done"},
+    }
+    table_fname = SimulationMetrics.write_table(records, str(tmp_path))
+    assert table_fname == os.path.join(str(tmp_path), "metrics.csv")
+    with open(table_fname, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["simulation_id"] for row in rows] == ["0", "2"]
+    assert list(rows[0]) == list(SimulationMetrics.COLUMNS)
@@ -0,0 +1,46 @@
+#@brief Tests of the failure isolation of the pool: failing tasks and workers that die outright
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+import signal
+from collections import namedtuple
+from multiprocessing import Pool
+
+from src.TaskGuard import TaskGuard
+from src.GeneralSimulationGeneration import GeneralSimulationGeneration
+
+Task = namedtuple("Task", ["simulation_id"])
+
+
+def simulate(task):
+    # Simulação 3: o worker morre sem exceção, como num segfault ou no OOM killer; simulação 5: exceção Python
+    if task.simulation_id == 3:
+        os.kill(os.getpid(), signal.SIGKILL)
+    if task.simulation_id == 5:
+        raise ValueError("campo inválido")
+    return task.simulation_id
+
+
+def test_failing_task_is_retried_then_reported():
+    result, failure = TaskGuard.run(simulate, Task(5), max_retries=2)
+    assert result is None
+    assert failure["simulation_ids"] == [5]
+    assert [attempt["error"] for attempt in failure["attempts"]] == ["ValueError"] * 3
+
+def test_dead_worker_chunk_is_reported_instead_of_hanging():
+    chunks = [[Task(0), Task(1)], [Task(2), Task(3), Task(4)], [Task(5)], [Task(6)]]
+    chunk_args = [(simulate, chunk, 0, 0) for chunk in chunks]
+    # Um alarme interrompe o teste se o pool esperar o chunk perdido
+    with TaskGuard.time_limit(120, "dispatch"), Pool(2) as pool:
+        chunk_results = TaskGuard.dispatch(pool, GeneralSimulationGeneration.warp_simulate_chunk, chunk_args, chunks, progress=False)
+    assert len(chunk_results) == len(chunks)
+    results = sorted(result for results, _, _ in chunk_results for result in results)
+    failures = {failure["attempts"][0]["error"]: failure for _, failures, _ in chunk_results for failure in failures}
+    assert results == [0, 1, 6]
+    assert failures["ValueError"]["simulation_ids"] == [5]
+    # Todo o chunk do worker morto é registrado, inclusive a simulação 2, terminada mas cujo resultado se perdeu com ele
+    assert failures["WorkerDied"]["simulation_ids"] == [2, 3, 4]
@@ -0,0 +1,52 @@
+#@brief Tests of the cost model of the simulations and of their ordering in chunks
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import pytest
+
+from src.SimTask import SimTask
+from src.TaskScheduler import TaskScheduler
+
+
+def make_task(simulation_id: int, duration_days: int = 2, time_step: int = 1800, num_seed_elements: int = 100) -> SimTask:
+    return SimTask(simulation_id, "2024-01-01", f"2024-01-{1 + duration_days:02d}", -39.0, -25.0, 4000.0,
+                   time_step, 21600, num_seed_elements, -46.0, -37.0, -27.0, -21.0)
+
+
+def test_work_units_count_the_element_steps_of_the_scheme():
+    task = make_task(0, duration_days=2, time_step=1800, num_seed_elements=100)
+    assert TaskScheduler(rk4=False).work_units(task) == 96 * 100
+    assert TaskScheduler(rk4=True).work_units(task) == 96 * 100 * TaskScheduler.RK4_FACTOR
+    # Uma simulação mais curta que o passo conta ao menos um passo
+    assert TaskScheduler(rk4=False).work_units(make_task(1, duration_days=0)) == 100
+
+def test_calibration_fits_the_measured_durations():
+    scheduler = TaskScheduler(rk4=False)
+    tasks = [make_task(idx, num_seed_elements=n) for idx, n in enumerate((50, 100, 200, 400))]
+    # Durações de 2 s + 1 ms por passo de elemento; a simulação 3 falhou e não entra no ajuste
+    records = {task.simulation_id: {"status": "done", "duration_s": 2.0 + 1e-3 * scheduler.work_units(task)} for task in tasks}
+    records[3]["status"] = "failed"
+    assert scheduler.calibrate(records, tasks)
+    assert scheduler.overhead_s == pytest.approx(2.0)
+    assert scheduler.seconds_per_unit == pytest.approx(1e-3)
+    assert scheduler.cost(tasks[3]) == pytest.approx(2.0 + 1e-3 * 96 * 400)
+    # Poucas durações: o modelo não é calibrado
+    del records[2]
+    assert not TaskScheduler(rk4=False).calibrate(records, tasks)
+
+def test_chunks_dispatch_the_longest_first_and_group_the_tail():
+    costs = [1, 10, 1, 8, 1, 1, 2, 1, 1, 2]
+    chunks = TaskScheduler.make_chunks(list(range(len(costs))), costs, number_of_workers=2, chunks_per_worker=2)
+    # Custo alvo de 28 / 4 = 7 por chunk: as duas longas sozinhas, depois as curtas agrupadas
+    assert chunks[:2] == [[1], [3]]
+    assert [sum(costs[item] for item in chunk) for chunk in chunks] == [10, 8, 7, 3]
+    assert [costs[item] for item in chunks[2]] == [2, 2, 1, 1, 1]
+    assert sorted(item for chunk in chunks for item in chunk) == list(range(len(costs)))
+
+def test_chunks_per_child_converts_simulations_into_chunks():
+    assert TaskScheduler.chunks_per_child(0, 100, 10) is None
+    assert TaskScheduler.chunks_per_child(20, 100, 10) == 2
+    assert TaskScheduler.chunks_per_child(1, 100, 10) == 1
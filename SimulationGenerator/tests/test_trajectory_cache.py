@@ -0,0 +1,77 @@
+#@brief Tests of the trajectory cache: reuse between analyses and refresh of the results rewritten since
+#@author Louis Pottier, Instituto Tecgraf/PUC-Rio
+#@date October 2026
+#
+# Usage, from the SimulationGenerator folder:
+#   python -m pytest tests
+
+import os
+
+import numpy as np
+import xarray as xr
+
+from src.TrajectoryCache import TrajectoryCache
+
+NB_PARTICLES, NB_TIMES = 20, 5
+
+
+def write_result(result_folder: str, idx: int, offset: float, nb_times: int = NB_TIMES):
+    raw_folder = os.path.join(result_folder, "raw")
+    os.makedirs(raw_folder, exist_ok=True)
+    lat = np.full((NB_PARTICLES, nb_times), -25.0 + offset, dtype=np.float32)
+    variables = {"lat": (("trajectory", "time"), lat), "lon": (("trajectory", "time"), lat - 15.0),
+                 **{name: (("trajectory", "time"), lat * 0 + offset) for name in TrajectoryCache.FIRST_PARTICLE_VARIABLES}}
+    xr.Dataset(variables).to_netcdf(os.path.join(raw_folder, f"result_{idx:04d}.nc"))
+
+def make_folder(tmp_path) -> str:
+    result_folder = str(tmp_path)
+    for idx in range(3):
+        write_result(result_folder, idx, idx * 0.1)
+    return result_folder
+
+def read_counts(capsys) -> str:
+    return capsys.readouterr().out
+
+
+def test_cache_is_reused_until_a_result_changes(tmp_path, capsys):
+    result_folder = make_folder(tmp_path)
+    cache = TrajectoryCache(result_folder, 3)
+    assert "3 arquivo(s)" in read_counts(capsys)
+    assert cache.valid.all()
+    np.testing.assert_allclose(cache.lat[:, 0, 0], [-25.0, -24.9, -24.8])
+    assert cache.first_particle["x_wind"][2, 0] == np.float32(0.2)
+    # Nada mudou: nenhum arquivo relido, e o cache aberto pelo processo é o mesmo
+    TrajectoryCache(result_folder, 3)
+    assert "arquivo(s)" not in read_counts(capsys)
+    TrajectoryCache.opened.clear()
+    assert TrajectoryCache.open(result_folder) is TrajectoryCache.open(result_folder)
+
+def test_result_rewritten_with_another_size_is_read_again(tmp_path, capsys):
+    result_folder = make_folder(tmp_path)
+    cache = TrajectoryCache.open(result_folder, 3)
+    read_counts(capsys)
+    # Resultado 1 reescrito com outra forma: relido e marcado inválido
+    write_result(result_folder, 1, 0.5, nb_times=NB_TIMES - 1)
+    assert not cache.up_to_date()
+    reopened = TrajectoryCache.open(result_folder, 3)
+    assert reopened is not cache
+    assert "1 arquivo(s)" in read_counts(capsys)
+    assert reopened.valid.tolist() == [True, False, True]
+    assert np.isnan(reopened.lat[1]).all()
+
+def test_result_rewritten_with_the_same_size_is_read_again(tmp_path, capsys):
+    result_folder = make_folder(tmp_path)
+    TrajectoryCache(result_folder, 3)
+    read_counts(capsys)
+    fname = os.path.join(result_folder, "raw", "result_0002.nc")
+    size = os.path.getsize(fname)
+    write_result(result_folder, 2, 0.7)
+    # Mesmo tamanho: só a data de modificação muda
+    assert os.path.getsize(fname) == size
+    stat = os.stat(fname)
+    os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    cache = TrajectoryCache(result_folder, 3)
+    assert "1 arquivo(s)" in read_counts(capsys)
+    assert cache.valid.all()
+    assert cache.lat[2, 0, 0] == np.float32(-25.0 + 0.7)
+    assert cache.lat[1, 0, 0] == np.float32(-24.9)